@@ -0,0 +1,87 @@
+"""
+Measures the memory used per simulated hub.
+
+The `__dict__`-based classes below reproduce the layout the device classes had before they gained
+`__slots__`, so both layouts can be measured side by side:
+
+    python benchmarks/memory_per_hub.py [number_of_hubs]
+"""
+import os
+import sys
+import tracemalloc
+
+# Lets the script run from a checkout without installing the package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from spike import PrimeHub
+
+
+class DictButton:
+    def __init__(self, side):
+        self.side = side
+
+
+class DictDevice:
+    def __init__(self):
+        pass
+
+
+class DictPort:
+    def __init__(self, port):
+        self.port = port
+
+
+class DictMotorPair:
+    def __init__(self, port_left, port_right):
+        self.port_left = port_left
+        self.port_right = port_right
+
+
+class DictHub:
+    def __init__(self):
+        self.left_button = DictButton('left')
+        self.right_button = DictButton('right')
+        self.speaker = DictDevice()
+        self.light_matrix = DictDevice()
+        self.status_light = DictDevice()
+        self.motion_sensor = DictDevice()
+
+
+def dict_hub():
+    # Without a registry, every part of the program creates its own device objects.
+    hub = DictHub()
+    devices = [DictPort(port) for port in 'ABCDEF' for _ in range(2)]
+    devices.append(DictMotorPair('B', 'C'))
+    return hub, devices
+
+
+def slotted_hub():
+    hub = PrimeHub()
+    devices = [hub.ports.motor(port) for port in 'ABCD' for _ in range(2)]
+    devices += [hub.ports.color_sensor(port) for port in 'EF' for _ in range(2)]
+    devices.append(hub.ports.motor_pair('B', 'C'))
+    return hub, devices
+
+
+def measure(factory, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    hubs = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del hubs
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print('{:<24}{:>12}{:>12}{:>11}'.format('', '__dict__', '__slots__', 'reduction'))
+    for name, old_factory, new_factory in (('hub only', DictHub, PrimeHub),
+                                           ('hub with 6 devices', dict_hub, slotted_hub)):
+        old = measure(old_factory, count)
+        new = measure(new_factory, count)
+        print('{:<24}{:>10.0f} B{:>10.0f} B{:>11.1%}'.format(name, old, new, 1 - new / old))
+
+
+if __name__ == '__main__':
+    main()
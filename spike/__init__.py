@@ -1,8 +1,9 @@
 from .app import App
-from .primehub import PrimeHub, Button, Speaker, LightMatrix, StatusLight, MotionSensor
+from .primehub import PrimeHub, Button, Speaker, LightMatrix, StatusLight, MotionSensor, PortRegistry
 from .motor import Motor
 from .motorpair import MotorPair
 from .colorsensor import ColorSensor
+from .simulation import Simulation
 
 
 __all__ = [
@@ -13,7 +14,9 @@ __all__ = [
     'LightMatrix',
     'StatusLight',
     'MotionSensor',
+    'PortRegistry',
     'Motor',
     'MotorPair',
     'ColorSensor',
+    'Simulation',
 ]
@@ -0,0 +1,76 @@
+import time
+
+try:
+    from contextvars import ContextVar
+except ImportError:
+    ContextVar = None
+
+_UNSET = object()
+
+# The backend of the current thread or asyncio task, so that concurrent tasks can each run their own
+# simulation. Contexts that never activated a backend fall back to the most recently activated one
+# that is still active.
+_context = ContextVar('spike_backend', default=_UNSET) if ContextVar is not None else None
+_active = []
+
+
+def get_backend():
+    """
+    Retrieves the backend that the device classes currently forward their calls to.
+
+    Returns:
+        object or None: The active backend, or None if no backend is active and the
+        device classes behave as plain dummies.
+    """
+    if _context is not None:
+        backend = _context.get()
+        if backend is not _UNSET:
+            return backend
+    return _active[-1] if _active else None
+
+
+def get_time():
+    """
+    Retrieves the current time of the active backend.
+
+    Returns:
+        float: The simulated time inside a simulation, otherwise a monotonic clock, in seconds.
+    """
+    backend = get_backend()
+    if backend is not None:
+        return backend.time
+    return time.monotonic()
+
+
+def activate(backend):
+    """
+    Makes `backend` the target of all device calls in the current context.
+
+    Args:
+        backend (object): The backend to activate.
+
+    Returns:
+        object: A token to pass to `deactivate()`.
+    """
+    _active.append(backend)
+    return _context.set(backend) if _context is not None else None
+
+
+def deactivate(backend, token):
+    """
+    Deactivates a backend and restores the one that was active before it in the current context.
+
+    Args:
+        backend (object): The backend to deactivate.
+        token (object): The token returned by `activate()`.
+    """
+    for index in range(len(_active) - 1, -1, -1):
+        if _active[index] is backend:
+            del _active[index]
+            break
+    if token is not None:
+        try:
+            _context.reset(token)
+        except ValueError:
+            # Deactivated from another context than the one it was activated in.
+            _context.set(_UNSET)
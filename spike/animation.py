@@ -0,0 +1,248 @@
+import bisect
+import threading
+import time
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+from ._backend import get_backend, get_time
+from .control import wait_until
+from .framebuffer import FrameBuffer, render_image, render_text
+
+# How much earlier than its start a frame may be picked, so that rounding of the clock does not
+# show the previous frame once more.
+_EPSILON = 1e-9
+
+
+class Timeline:
+    """
+    A sequence of Light Matrix frames with their durations, compiled once into rendered frames and
+    start times, so that finding the frame due at any moment is a bisection.
+
+    Example:
+        from spike.animation import Timeline
+
+        blink = Timeline([('HEART', 0.4), ('HEART_SMALL', 0.2)])
+        clock = Timeline.images(['CLOCK{}'.format(hour) for hour in range(1, 13)], 0.1)
+        print(blink.duration, len(clock))
+    """
+
+    __slots__ = ('frames', 'starts', 'duration')
+
+    def __init__(self, steps):
+        """
+        Compiles the Timeline.
+
+        Args:
+            steps (iterable): `(frame, duration)` pairs, where the frame is the name of an image or
+                25 brightness values, and the duration is in seconds.
+
+        Raises:
+            ValueError: If there are no steps, a duration is not positive, or a frame does not hold
+                25 values.
+        """
+        frames = []
+        starts = []
+        duration = 0.0
+        for frame, seconds in steps:
+            if seconds <= 0:
+                raise ValueError('durations must be positive')
+            frame = render_image(frame) if isinstance(frame, str) else bytes(frame)
+            if len(frame) != 25:
+                raise ValueError('a frame must hold 25 values')
+            frames.append(frame)
+            starts.append(duration)
+            duration += seconds
+        if not frames:
+            raise ValueError('a timeline needs at least one frame')
+        self.frames = tuple(frames)
+        self.starts = tuple(starts)
+        self.duration = duration
+
+    def __len__(self):
+        return len(self.frames)
+
+    @classmethod
+    def images(cls, images, interval, brightness=100):
+        """
+        Compiles a Timeline that shows named images one after the other.
+
+        Args:
+            images (list of str): The names of the images.
+            interval (float): How long each image is shown, in seconds.
+            brightness (int, optional): Brightness of the images (0 to 100%). Defaults to 100.
+
+        Returns:
+            Timeline: The compiled timeline.
+        """
+        return cls((render_image(image, brightness), interval) for image in images)
+
+    @classmethod
+    def text(cls, text, interval=0.1, brightness=100):
+        """
+        Compiles a Timeline that scrolls text from right to left.
+
+        Args:
+            text (str): The text.
+            interval (float, optional): The time between steps, in seconds. Defaults to 0.1.
+            brightness (int, optional): Brightness of the text (0 to 100%). Defaults to 100.
+
+        Returns:
+            Timeline: The compiled timeline.
+        """
+        return cls((frame, interval) for frame in render_text(text, brightness))
+
+    def index_at(self, elapsed):
+        """
+        Args:
+            elapsed (float): The time since the start of the timeline, in seconds.
+
+        Returns:
+            int: The index of the frame due at `elapsed`; the last frame after the end.
+        """
+        return max(bisect.bisect_right(self.starts, elapsed + _EPSILON) - 1, 0)
+
+
+class Animation:
+    """
+    Plays a Timeline on the Light Matrix in the background, while the program goes on.
+
+    Each frame is shown at its start time measured from the start of the animation, not from the
+    previous frame, so the animation does not drift. If the player falls behind, it shows the frame
+    due at the current time and counts the frames it skipped in `dropped`, so a late animation
+    catches up at once instead of lagging, and which frames are dropped depends only on the time.
+    Frames go through a `FrameBuffer`, so each costs at most one transfer.
+
+    Inside a simulation, the frames are scheduled on the simulated clock. Otherwise a daemon thread
+    plays them, running in a copy of the caller's context so that it talks to the same backend.
+
+    Example:
+        from spike import Motor
+        from spike.animation import Animation, Timeline
+
+        with Animation(Timeline.images(['ARROW_N', 'ARROW_E', 'ARROW_S', 'ARROW_W'], 0.25), loop=True):
+            Motor('A').run_for_degrees(720)
+    """
+
+    def __init__(self, timeline, frame_buffer=None, loop=False):
+        """
+        Initializes the Animation.
+
+        Args:
+            timeline (Timeline): The frames to play.
+            frame_buffer (FrameBuffer, optional): The frame buffer to draw into. Defaults to a new
+                one on the hub's Light Matrix.
+            loop (bool, optional): Whether to start over at the end until stopped. Defaults to False.
+        """
+        self.timeline = timeline
+        self.frame_buffer = frame_buffer if frame_buffer is not None else FrameBuffer()
+        self.loop = loop
+        self.shown = 0
+        self.dropped = 0
+        self.playing = False
+        self._position = -1
+        self._generation = 0
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _advance(self, elapsed):
+        # Shows the frame due at `elapsed` and returns the time the next frame is due, or None at the end.
+        timeline = self.timeline
+        count = len(timeline.frames)
+        cycle = 0
+        if elapsed >= timeline.duration - _EPSILON:
+            if not self.loop:
+                self._show(count - 1)
+                return None
+            cycle = int((elapsed + _EPSILON) // timeline.duration)
+            elapsed -= cycle * timeline.duration
+        index = timeline.index_at(elapsed)
+        self._show(cycle * count + index)
+        following = timeline.starts[index + 1] if index + 1 < count else timeline.duration
+        return cycle * timeline.duration + following
+
+    def _show(self, position):
+        # `position` counts frames from the start over all cycles.
+        if position <= self._position:
+            return
+        self.dropped += position - self._position - 1
+        self._position = position
+        frame_buffer = self.frame_buffer
+        frame_buffer.pixels[:] = self.timeline.frames[position % len(self.timeline.frames)]
+        frame_buffer.update()
+        self.shown += 1
+
+    # Actions
+
+    def start(self):
+        """
+        Starts playing from the first frame.
+
+        Returns:
+            Animation: The animation itself.
+        """
+        self.stop()
+        self.shown = 0
+        self.dropped = 0
+        self.playing = True
+        self._position = -1
+        self._generation += 1
+        schedule = getattr(get_backend(), 'after', None)
+        if schedule is not None:
+            self._scheduled(schedule, get_time(), self._generation)
+            return self
+        self._stopped.clear()
+        # Without contextvars, all threads share the most recently activated backend anyway.
+        target, args = (self._loop, ()) if contextvars is None else (contextvars.copy_context().run, (self._loop,))
+        self._thread = threading.Thread(target=target, args=args, name='spike-animation', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops playing. The Light Matrix keeps the frame shown last.
+        """
+        self.playing = False
+        self._stopped.set()
+        if self._thread is not None:
+            if self._thread is not threading.current_thread():
+                self._thread.join()
+            self._thread = None
+
+    def wait(self):
+        """
+        Waits until the animation has played to its end. Looping animations have no end, so for
+        them it returns at once.
+        """
+        if not self.loop:
+            wait_until(lambda: not self.playing)
+
+    def _scheduled(self, schedule, begin, generation):
+        # Frames left over from before a stop() and a new start() end their chain here.
+        if not self.playing or generation != self._generation:
+            return
+        elapsed = get_time() - begin
+        following = self._advance(elapsed)
+        if following is None:
+            self.playing = False
+            return
+        schedule(following - elapsed, self._scheduled, schedule, begin, generation)
+
+    def _loop(self):
+        begin = time.monotonic()
+        while not self._stopped.is_set():
+            elapsed = time.monotonic() - begin
+            following = self._advance(elapsed)
+            if following is None:
+                break
+            if self._stopped.wait(max(following - elapsed, 0.0)):
+                break
+        self.playing = False
@@ -1,3 +1,6 @@
+from ._backend import get_backend
+
+
 class App:
     """
     A class to represent the SPIKE Prime App, allowing interaction with the device (tablet or computer).
@@ -71,7 +74,9 @@ class App:
             app = App()
             app.play_sound('Cat Meow 1')
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.app().play_sound(name, volume)
 
     def start_sound(self, name, volume=100):
         """
@@ -98,4 +103,21 @@ class App:
             app = App()
             app.start_sound('Cat Meow 1')
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.app().start_sound(name, volume)
+
+    # Awaitables
+
+    async def play_sound_async(self, name, volume=100):
+        """
+        Plays a sound from the device and waits until it has finished.
+
+        Awaitable counterpart of `play_sound()`.
+
+        Example:
+            await app.play_sound_async('Cat Meow 1')
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.app().play_sound_async(name, volume)
@@ -0,0 +1,187 @@
+from ._backend import activate, deactivate, get_backend
+
+# The commands that are queued instead of being sent right away.
+BATCHED = {
+    'motor': ('start', 'start_at_power', 'stop'),
+    'motor_pair': ('start_tank', 'start_tank_at_power', 'stop'),
+}
+
+
+class CommandBatch:
+    """
+    Queues the speed commands of motors and motor pairs and sends them to the hub together.
+
+    Inside the batch, `Motor.start()`, `Motor.start_at_power()`, `MotorPair.start_tank()`,
+    `MotorPair.start_tank_at_power()` and the `stop()` of both are queued instead of being sent. A
+    command replaces the queued commands it overrides, so only the last one per port goes out. The
+    queue is sent in one write when the batch ends, before any other call to a device, such as a
+    `Speaker.beep()` or a `ColorSensor.wait_until_color()` that blocks, and before waiting, so the
+    commands take effect in the order they were given.
+
+    A control loop that waits once per tick therefore sends one write per tick, however many commands
+    it gives.
+
+    Example:
+        from spike import Motor, MotorPair
+        from spike.batch import CommandBatch
+        from spike.control import wait_for_seconds
+
+        pair = MotorPair('B', 'C')
+        arm = Motor('A')
+        with CommandBatch() as batch:
+            for tick in range(100):
+                pair.start_tank(30, 40)
+                pair.start_tank(35, 40)
+                arm.start(tick % 20)
+                wait_for_seconds(0.01)
+        print(batch.commands, batch.writes)
+    """
+
+    def __init__(self, backend=None):
+        """
+        Initializes the CommandBatch.
+
+        Args:
+            backend (object, optional): The backend that receives the commands. Defaults to the backend
+                active when the batch is started.
+        """
+        self.backend = backend
+        self.commands = 0
+        self.writes = 0
+        self._queue = {}
+        self._token = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def start(self):
+        """
+        Starts queueing commands.
+
+        Returns:
+            CommandBatch: The batch itself.
+
+        Raises:
+            RuntimeError: If there is no backend to send the commands to.
+        """
+        if self.backend is None:
+            self.backend = get_backend()
+            if self.backend is None:
+                raise RuntimeError('there is no active backend to send commands to')
+        self._token = activate(self)
+        return self
+
+    def stop(self):
+        """
+        Sends the queued commands and restores the previously active backend.
+        """
+        try:
+            self.flush()
+        finally:
+            deactivate(self, self._token)
+            self._token = None
+
+    @property
+    def time(self):
+        return self.backend.time
+
+    def _add(self, key, ports, device, method, args):
+        queue = self._queue
+        for queued in [queued for queued, command in queue.items() if command[0] <= ports]:
+            del queue[queued]
+        queue[key] = (ports, device, method, args)
+        self.commands += 1
+
+    def flush(self):
+        """
+        Sends the queued commands in one write.
+
+        Backends that provide `apply_batch()` receive the commands as a list of
+        `(kind, address, method, args)` tuples; otherwise they are applied one after the other.
+        """
+        queue = self._queue
+        if not queue:
+            return
+        commands = [(key[0], key[1:], method, args) for key, (_, _, method, args) in queue.items()]
+        devices = [device for _, device, _, _ in queue.values()]
+        queue.clear()
+        self.writes += 1
+        apply_batch = getattr(self.backend, 'apply_batch', None)
+        if apply_batch is not None:
+            apply_batch(commands)
+            return
+        for device, (_, _, method, args) in zip(devices, commands):
+            getattr(device, method)(*args)
+
+    # Devices
+
+    def motor(self, port):
+        return _BatchedDevice(self, ('motor', port), frozenset((port,)), self.backend.motor(port))
+
+    def motor_pair(self, port_left, port_right):
+        return _BatchedDevice(self, ('motor_pair', port_left, port_right), frozenset((port_left, port_right)),
+                              self.backend.motor_pair(port_left, port_right))
+
+    def color_sensor(self, port):
+        return _BatchedDevice(self, ('color_sensor', port), frozenset(), self.backend.color_sensor(port))
+
+    def button(self, side):
+        return _BatchedDevice(self, ('button', side), frozenset(), self.backend.button(side))
+
+    def speaker(self):
+        return _BatchedDevice(self, ('speaker',), frozenset(), self.backend.speaker())
+
+    def light_matrix(self):
+        return _BatchedDevice(self, ('light_matrix',), frozenset(), self.backend.light_matrix())
+
+    def status_light(self):
+        return _BatchedDevice(self, ('status_light',), frozenset(), self.backend.status_light())
+
+    def motion_sensor(self):
+        return _BatchedDevice(self, ('motion_sensor',), frozenset(), self.backend.motion_sensor())
+
+    def app(self):
+        return _BatchedDevice(self, ('app',), frozenset(), self.backend.app())
+
+    def snapshot(self):
+        self.flush()
+        return self.backend.snapshot()
+
+    # Time
+
+    def sleep(self, seconds):
+        self.flush()
+        self.backend.sleep(seconds)
+
+    def wait(self, done):
+        self.flush()
+        self.backend.wait(done)
+
+    async def sleep_async(self, seconds):
+        self.flush()
+        await self.backend.sleep_async(seconds)
+
+    async def wait_async(self, done):
+        self.flush()
+        await self.backend.wait_async(done)
+
+
+class _BatchedDevice:
+
+    def __init__(self, batch, key, ports, device):
+        self._batch = batch
+        self._key = key
+        self._ports = ports
+        self._device = device
+
+    def __getattr__(self, name):
+        if name in BATCHED.get(self._key[0], ()):
+            return lambda *args: self._batch._add(self._key, self._ports, self._device, name, args)
+        self._batch.flush()
+        return getattr(self._device, name)
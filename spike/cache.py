@@ -0,0 +1,221 @@
+import time
+
+from ._backend import activate, deactivate, get_backend
+
+# The getters that are answered from the snapshot of a device, and where their value is in it.
+CACHED = {
+    'motor': {'get_speed': 0, 'get_position': 1, 'get_degrees_counted': 2},
+    'color_sensor': {'get_color': 0, 'get_ambient_light': 1, 'get_reflected_light': 2, 'get_red': 3,
+                     'get_green': 4, 'get_blue': 5, 'get_rgb_intensity': slice(3, 7)},
+    'motion_sensor': {'get_yaw_angle': 0, 'get_pitch_angle': 1, 'get_roll_angle': 2, 'get_orientation': 3},
+}
+
+
+class ReadCache:
+    """
+    Answers the getters of motors, color sensors and the Motion Sensor from a snapshot of the device.
+
+    The first read from a device fetches all of its readings with one `snapshot()` call, and later
+    reads within `staleness` seconds are answered from that snapshot. For example, `get_red()`,
+    `get_green()`, `get_blue()` and `get_rgb_intensity()` in a row cost one call to the hub.
+
+    Any other call, such as a motor command or a wait, clears the cache, so readings taken after the
+    state may have changed are always fetched again. Use `hits` and `misses` to tune the window.
+
+    Example:
+        from spike import ColorSensor
+        from spike.cache import ReadCache
+
+        sensor = ColorSensor('E')
+        with ReadCache(staleness=0.005) as cache:
+            for _ in range(100):
+                red, green, blue = sensor.get_red(), sensor.get_green(), sensor.get_blue()
+        print(cache.hits, cache.misses)
+    """
+
+    def __init__(self, staleness=0.005, backend=None, clock=None):
+        """
+        Initializes the ReadCache.
+
+        Args:
+            staleness (float, optional): How long a snapshot is used, in seconds. Defaults to 0.005.
+            backend (object, optional): The backend to read from. Defaults to the backend active when
+                the cache is started.
+            clock (callable, optional): The clock that measures the age of a snapshot. Defaults to
+                the simulated clock inside a simulation, and otherwise `time.monotonic`, which unlike
+                the time of a hub connection costs no round trip.
+
+        Raises:
+            ValueError: If `staleness` is negative.
+        """
+        if staleness < 0:
+            raise ValueError('staleness must not be negative')
+        self.staleness = staleness
+        self.backend = backend
+        self.clock = clock
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._snapshots = {}
+        self._devices = {}
+        self._token = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def start(self):
+        """
+        Starts answering reads from the cache.
+
+        Returns:
+            ReadCache: The cache itself.
+
+        Raises:
+            RuntimeError: If there is no backend to read from.
+        """
+        if self.backend is None:
+            self.backend = get_backend()
+            if self.backend is None:
+                raise RuntimeError('there is no active backend to read from')
+        self._clock = self.clock
+        if self._clock is None:
+            # Only a simulation schedules events; its clock is a plain attribute.
+            backend = self.backend
+            self._clock = (lambda: backend.time) if hasattr(backend, 'after') else time.monotonic
+        self._token = activate(self)
+        return self
+
+    def stop(self):
+        """
+        Restores the previously active backend.
+        """
+        deactivate(self, self._token)
+        self._token = None
+        self.clear()
+
+    def clear(self):
+        """
+        Discards all snapshots.
+        """
+        self._snapshots.clear()
+
+    @property
+    def time(self):
+        return self.backend.time
+
+    def _read(self, key, device, index):
+        entry = self._snapshots.get(key)
+        now = self._clock()
+        if entry is not None and now - entry[0] <= self.staleness:
+            self.hits += 1
+            return entry[1][index]
+        self.misses += 1
+        snapshot = device.snapshot()
+        self._snapshots[key] = (now, snapshot)
+        return snapshot[index]
+
+    def _device(self, kind, address, device):
+        cached = self._devices.get((kind, address))
+        if cached is None or cached._device is not device:
+            cached = self._devices[(kind, address)] = _CachedDevice(self, kind, address, device)
+        return cached
+
+    # Devices
+
+    def motor(self, port):
+        return self._device('motor', (port,), self.backend.motor(port))
+
+    def motor_pair(self, port_left, port_right):
+        return self._device('motor_pair', (port_left, port_right), self.backend.motor_pair(port_left, port_right))
+
+    def color_sensor(self, port):
+        return self._device('color_sensor', (port,), self.backend.color_sensor(port))
+
+    def button(self, side):
+        return self._device('button', (side,), self.backend.button(side))
+
+    def speaker(self):
+        return self._device('speaker', (), self.backend.speaker())
+
+    def light_matrix(self):
+        return self._device('light_matrix', (), self.backend.light_matrix())
+
+    def status_light(self):
+        return self._device('status_light', (), self.backend.status_light())
+
+    def motion_sensor(self):
+        return self._device('motion_sensor', (), self.backend.motion_sensor())
+
+    def app(self):
+        return self._device('app', (), self.backend.app())
+
+    # Time
+
+    def _fresh(self, done):
+        def fresh():
+            self.clear()
+            return done()
+        return fresh
+
+    def sleep(self, seconds):
+        self.clear()
+        self.backend.sleep(seconds)
+
+    def wait(self, done):
+        self.backend.wait(self._fresh(done))
+        self.clear()
+
+    async def sleep_async(self, seconds):
+        self.clear()
+        await self.backend.sleep_async(seconds)
+
+    async def wait_async(self, done):
+        await self.backend.wait_async(self._fresh(done))
+        self.clear()
+
+
+class _CachedDevice:
+
+    def __init__(self, cache, kind, address, device):
+        self._cache = cache
+        self._key = (kind, address)
+        self._device = device
+        self._cached = CACHED.get(kind, {})
+
+    def __getattr__(self, name):
+        index = self._cached.get(name)
+        if index is not None:
+            read = self._cache._read
+            key = self._key
+            device = self._device
+
+            def cached():
+                return read(key, device, index)
+        else:
+            method = getattr(self._device, name)
+            if not callable(method):
+                return method
+            clear = self._cache.clear
+            if name.endswith('_async'):
+                async def cached(*args):
+                    clear()
+                    try:
+                        return await method(*args)
+                    finally:
+                        clear()
+            else:
+                def cached(*args):
+                    clear()
+                    try:
+                        return method(*args)
+                    finally:
+                        clear()
+        # Keep the wrapper, so later lookups skip __getattr__.
+        setattr(self, name, cached)
+        return cached
@@ -0,0 +1,229 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .control import wait_for_seconds
+
+# The number of bits of each of red, green and blue that select a cell of the lookup table.
+DEFAULT_BITS = 5
+
+# The highest intensity the Color Sensor reports for red, green and blue.
+MAX_INTENSITY = 1024
+
+# The table entry of the cells that are not close enough to any color.
+_UNKNOWN = 255
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('ColorClassifier.classify_many requires NumPy: pip install numpy')
+
+
+class ColorClassifier:
+    """
+    Tells colors apart from the red, green and blue intensities of a Color Sensor, calibrated on the
+    actual mat and lighting.
+
+    The classifier learns the mean intensities, or centroid, of each color from samples taken with
+    `ColorSensor.get_rgb_intensity()`. `compile()` then divides the space of intensities into
+    `2 ** bits` steps per channel and stores the nearest color of every cell in a lookup table, so
+    that classifying a reading is a single table lookup instead of a search over the colors.
+
+    Example:
+        from spike import ColorSensor
+        from spike.colorclassifier import ColorClassifier
+
+        color_sensor = ColorSensor('E')
+        classifier = ColorClassifier(max_distance=150)
+        for color in ('black', 'white', 'red', 'green'):
+            input('Place the sensor over {} and press Enter'.format(color))
+            classifier.sample(color_sensor, color)
+        classifier.compile()
+        print(classifier.get_color(color_sensor))
+    """
+
+    def __init__(self, bits=DEFAULT_BITS, max_distance=None):
+        """
+        Initializes an empty ColorClassifier.
+
+        Args:
+            bits (int, optional): The number of bits per channel of the lookup table (1 to 8).
+                Defaults to 5, a table of 32768 cells.
+            max_distance (float, optional): How far from its nearest centroid a reading may be and
+                still get its color; farther readings are classified as None. Defaults to no limit.
+
+        Raises:
+            ValueError: If `bits` is not one of the allowed values.
+        """
+        if not 1 <= bits <= 8:
+            raise ValueError('bits must be within 1-8')
+        self.bits = bits
+        self.max_distance = max_distance
+        self.names = ()
+        self._sums = {}
+        self._table = None
+        self._shift = (MAX_INTENSITY.bit_length() - 1) - bits
+        self._last = (1 << bits) - 1
+
+    @property
+    def centroids(self):
+        """
+        dict: The mean red, green and blue intensities of each learned color.
+        """
+        return {name: (red / count, green / count, blue / count)
+                for name, (red, green, blue, count) in self._sums.items()}
+
+    # Settings
+
+    def add_sample(self, color, rgb):
+        """
+        Adds one reading of a known color to the centroids. Call `compile()` afterwards.
+
+        Args:
+            color (str): The name of the color.
+            rgb (tuple of int): The red, green and blue intensities, as returned by
+                `ColorSensor.get_rgb_intensity()`; a fourth value is ignored.
+        """
+        red, green, blue, count = self._sums.get(color, (0, 0, 0, 0))
+        self._sums[color] = (red + rgb[0], green + rgb[1], blue + rgb[2], count + 1)
+
+    def sample(self, color_sensor, color, count=20, interval=0.01):
+        """
+        Reads a Color Sensor held over a known color a number of times and adds the readings.
+
+        Args:
+            color_sensor (ColorSensor): The sensor to read.
+            color (str): The name of the color under the sensor.
+            count (int, optional): The number of readings. Defaults to 20.
+            interval (float, optional): The time between readings in seconds. Defaults to 0.01.
+        """
+        for index in range(count):
+            if index:
+                wait_for_seconds(interval)
+            self.add_sample(color, color_sensor.get_rgb_intensity())
+
+    def forget(self, color=None):
+        """
+        Removes the samples of a color, or of all colors. Call `compile()` afterwards.
+
+        Args:
+            color (str, optional): The color to forget. Defaults to all colors.
+        """
+        if color is None:
+            self._sums.clear()
+        else:
+            self._sums.pop(color, None)
+
+    def compile(self):
+        """
+        Builds the lookup table from the current centroids.
+
+        Raises:
+            RuntimeError: If no color has been learned.
+            ValueError: If more than 255 colors have been learned.
+        """
+        if not self._sums:
+            raise RuntimeError('no color has been learned')
+        if len(self._sums) >= _UNKNOWN:
+            raise ValueError('at most {} colors can be learned'.format(_UNKNOWN))
+        centroids = self.centroids
+        self.names = tuple(centroids)
+        points = [centroids[name] for name in self.names]
+        size = 1 << self.bits
+        width = 1 << self._shift
+        limit = float('inf') if self.max_distance is None else self.max_distance ** 2
+        if np is not None:
+            table = np.empty((size, size * size), dtype=np.uint8)
+            centroid = np.asarray(points)
+            # The centers of the cells of one red step, with green as the slower changing index.
+            plane = (np.indices((size, size)).reshape(2, -1).T + 0.5) * width
+            cells = np.empty((size * size, 3))
+            cells[:, 1:] = plane
+            for red in range(size):
+                cells[:, 0] = (red + 0.5) * width
+                distances = ((cells[:, None, :] - centroid[None, :, :]) ** 2).sum(axis=2)
+                nearest = distances.argmin(axis=1)
+                nearest[distances.min(axis=1) > limit] = _UNKNOWN
+                table[red] = nearest
+            self._table = bytearray(table.tobytes())
+            return
+        table = bytearray(size ** 3)
+        centers = [(index + 0.5) * width for index in range(size)]
+        cell = 0
+        for red in centers:
+            for green in centers:
+                for blue in centers:
+                    best, best_distance = _UNKNOWN, float('inf')
+                    for index, (x, y, z) in enumerate(points):
+                        distance = (red - x) ** 2 + (green - y) ** 2 + (blue - z) ** 2
+                        if distance < best_distance:
+                            best, best_distance = index, distance
+                    table[cell] = best if best_distance <= limit else _UNKNOWN
+                    cell += 1
+        self._table = table
+
+    # Measurements
+
+    def classify(self, rgb):
+        """
+        Classifies one reading with the lookup table.
+
+        Args:
+            rgb (tuple of int): The red, green and blue intensities (0 to 1024); a fourth value is ignored.
+
+        Returns:
+            str or None: The name of the color, or None if the reading is not close to any color.
+
+        Raises:
+            RuntimeError: If the classifier has not been compiled.
+        """
+        table = self._table
+        if table is None:
+            raise RuntimeError('the classifier has not been compiled')
+        shift, last, bits = self._shift, self._last, self.bits
+        red = min(rgb[0] >> shift, last)
+        green = min(rgb[1] >> shift, last)
+        blue = min(rgb[2] >> shift, last)
+        index = table[(((red << bits) | green) << bits) | blue]
+        return None if index == _UNKNOWN else self.names[index]
+
+    def get_color(self, color_sensor):
+        """
+        Reads a Color Sensor and classifies the reading.
+
+        Args:
+            color_sensor (ColorSensor): The sensor to read.
+
+        Returns:
+            str or None: The name of the color, or None if the reading is not close to any color.
+        """
+        return self.classify(color_sensor.get_rgb_intensity())
+
+    def classify_many(self, samples):
+        """
+        Classifies many recorded readings at once with vectorized NumPy operations.
+
+        Requires NumPy.
+
+        Args:
+            samples (array-like): The readings, one row of red, green and blue intensities (and
+                optionally the overall intensity) per reading.
+
+        Returns:
+            numpy.ndarray: The name of the color of each reading, or None, as an array of objects.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+            RuntimeError: If the classifier has not been compiled.
+        """
+        _require_numpy()
+        if self._table is None:
+            raise RuntimeError('the classifier has not been compiled')
+        samples = np.asarray(samples)
+        cells = np.minimum(samples[..., :3].astype(np.intp) >> self._shift, self._last)
+        bits = self.bits
+        indices = (((cells[..., 0] << bits) | cells[..., 1]) << bits) | cells[..., 2]
+        labels = np.empty(256, dtype=object)
+        labels[:len(self.names)] = self.names
+        return labels[np.frombuffer(self._table, dtype=np.uint8)[indices]]
@@ -1,5 +1,8 @@
 # colorsensor.py
 
+from ._backend import get_backend
+
+
 class ColorSensor:
     """
     Represents a Color Sensor connected to the SPIKE Prime Hub.
@@ -17,6 +20,8 @@ class ColorSensor:
         print(f"Detected color: {color}")
     """
 
+    __slots__ = ('port',)
+
     def __init__(self, port):
         """
         Initializes the Color Sensor.
@@ -46,6 +51,9 @@ class ColorSensor:
             if color == 'red':
                 print("Red color detected!")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.color_sensor(self.port).get_color()
         return None
 
     def get_ambient_light(self):
@@ -59,6 +67,9 @@ class ColorSensor:
             ambient_light = color_sensor.get_ambient_light()
             print(f"Ambient light: {ambient_light}%")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.color_sensor(self.port).get_ambient_light()
         return 0
 
     def get_reflected_light(self):
@@ -72,6 +83,9 @@ class ColorSensor:
             reflected_light = color_sensor.get_reflected_light()
             print(f"Reflected light: {reflected_light}%")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.color_sensor(self.port).get_reflected_light()
         return 0
 
     def get_rgb_intensity(self):
@@ -85,6 +99,9 @@ class ColorSensor:
             red, green, blue, overall = color_sensor.get_rgb_intensity()
             print(f"Red: {red}, Green: {green}, Blue: {blue}, Overall: {overall}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.color_sensor(self.port).get_rgb_intensity()
         return (0, 0, 0, 0)
 
     def get_red(self):
@@ -98,6 +115,9 @@ class ColorSensor:
             red_intensity = color_sensor.get_red()
             print(f"Red intensity: {red_intensity}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.color_sensor(self.port).get_red()
         return 0
 
     def get_green(self):
@@ -111,6 +131,9 @@ class ColorSensor:
             green_intensity = color_sensor.get_green()
             print(f"Green intensity: {green_intensity}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.color_sensor(self.port).get_green()
         return 0
 
     def get_blue(self):
@@ -124,6 +147,9 @@ class ColorSensor:
             blue_intensity = color_sensor.get_blue()
             print(f"Blue intensity: {blue_intensity}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.color_sensor(self.port).get_blue()
         return 0
 
     # Events
@@ -145,7 +171,9 @@ class ColorSensor:
             color_sensor.wait_until_color('blue')
             print("Blue color detected!")
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.color_sensor(self.port).wait_until_color(color)
 
     def wait_for_new_color(self):
         """
@@ -165,6 +193,9 @@ class ColorSensor:
                 new_color = color_sensor.wait_for_new_color()
                 print(f"New color detected: {new_color}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.color_sensor(self.port).wait_for_new_color()
         return None
 
     # Actions
@@ -186,7 +217,9 @@ class ColorSensor:
             # Turn off the lights
             color_sensor.light_up_all(0)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.color_sensor(self.port).light_up_all(brightness)
 
     def light_up(self, light_1=100, light_2=100, light_3=100):
         """
@@ -204,4 +237,38 @@ class ColorSensor:
             # Turn on only the first light at full brightness
             color_sensor.light_up(100, 0, 0)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.color_sensor(self.port).light_up(light_1, light_2, light_3)
+
+    # Awaitables
+
+    async def wait_until_color_async(self, color):
+        """
+        Waits until the specified color is detected.
+
+        Awaitable counterpart of `wait_until_color()`.
+
+        Example:
+            await color_sensor.wait_until_color_async('blue')
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.color_sensor(self.port).wait_until_color_async(color)
+
+    async def wait_for_new_color_async(self):
+        """
+        Waits until a new color is detected.
+
+        Awaitable counterpart of `wait_for_new_color()`.
+
+        Returns:
+            str or None: The name of the new color detected.
+
+        Example:
+            new_color = await color_sensor.wait_for_new_color_async()
+        """
+        backend = get_backend()
+        if backend is not None:
+            return await backend.color_sensor(self.port).wait_for_new_color_async()
+        return None
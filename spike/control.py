@@ -0,0 +1,141 @@
+import asyncio
+import operator
+import time
+
+from ._backend import get_backend, get_time
+
+
+def wait_for_seconds(seconds):
+    """
+    Waits for a specified number of seconds before continuing the program.
+
+    Inside a simulation, the wait advances the virtual clock instead of taking wall-clock time.
+
+    Args:
+        seconds (float): The time to wait in seconds.
+
+    Raises:
+        TypeError: If `seconds` is not a number.
+        ValueError: If `seconds` is negative.
+
+    Example:
+        from spike.control import wait_for_seconds
+
+        wait_for_seconds(2)
+    """
+    if seconds < 0:
+        raise ValueError('seconds must not be negative')
+    backend = get_backend()
+    if backend is not None:
+        backend.sleep(seconds)
+    else:
+        time.sleep(seconds)
+
+
+def wait_until(get_value_function, operator_function=operator.eq, target_value=True):
+    """
+    Waits until the condition is true before continuing with the program.
+
+    Inside a simulation, the virtual clock jumps from one scheduled event to the next
+    instead of polling.
+
+    Args:
+        get_value_function (callable): A function that returns the current value to be compared to the target value.
+        operator_function (callable, optional): A function that compares two arguments. Defaults to equality.
+        target_value (object, optional): The value to compare against. Defaults to True.
+
+    Raises:
+        TypeError: If `get_value_function` or `operator_function` is not callable.
+
+    Example:
+        from spike import ColorSensor
+        from spike.control import wait_until
+
+        color_sensor = ColorSensor('A')
+        wait_until(color_sensor.get_color, target_value='red')
+    """
+    if not callable(get_value_function) or not callable(operator_function):
+        raise TypeError('get_value_function and operator_function must be callable')
+
+    def done():
+        return operator_function(get_value_function(), target_value)
+
+    backend = get_backend()
+    if backend is not None:
+        backend.wait(done)
+        return
+    while not done():
+        time.sleep(0.001)
+
+
+async def wait_for_seconds_async(seconds):
+    """
+    Awaitable counterpart of `wait_for_seconds()`.
+
+    Example:
+        await wait_for_seconds_async(2)
+    """
+    if seconds < 0:
+        raise ValueError('seconds must not be negative')
+    backend = get_backend()
+    if backend is not None:
+        await backend.sleep_async(seconds)
+    else:
+        await asyncio.sleep(seconds)
+
+
+async def wait_until_async(get_value_function, operator_function=operator.eq, target_value=True):
+    """
+    Awaitable counterpart of `wait_until()`.
+
+    Example:
+        await wait_until_async(color_sensor.get_color, target_value='red')
+    """
+    if not callable(get_value_function) or not callable(operator_function):
+        raise TypeError('get_value_function and operator_function must be callable')
+
+    def done():
+        return operator_function(get_value_function(), target_value)
+
+    backend = get_backend()
+    if backend is not None:
+        await backend.wait_async(done)
+        return
+    while not done():
+        await asyncio.sleep(0.001)
+
+
+class Timer:
+    """
+    A timer that counts the seconds since the program started or since it was last reset.
+
+    Inside a simulation, the timer follows the virtual clock.
+
+    Example:
+        from spike.control import Timer, wait_for_seconds
+
+        timer = Timer()
+        wait_for_seconds(2)
+        print(f"Seconds passed: {timer.now()}")
+    """
+
+    def __init__(self):
+        """
+        Initialize the Timer.
+        """
+        self._start = get_time()
+
+    def reset(self):
+        """
+        Sets the timer to 0.
+        """
+        self._start = get_time()
+
+    def now(self):
+        """
+        Retrieves the timer's current value.
+
+        Returns:
+            int: The number of whole seconds since the timer was created or last reset.
+        """
+        return int(get_time() - self._start)
@@ -0,0 +1,300 @@
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from .simulation import DEFAULT_TICK, Simulation
+from .transport import KINDS, METHODS, Connection, Transport, decode_request, encode, request_id, response
+
+# The methods of the simulated devices that set up a scenario and have no counterpart on a hub. Only
+# the emulator answers them; they are numbered after the hub's methods of their kind.
+HARNESS_METHODS = {
+    'motor': ('is_idle',),
+    'motor_pair': ('is_idle',),
+    'color_sensor': ('set_color',),
+    'button': ('click', 'press', 'release'),
+    'motion_sensor': ('make_gesture', 'set_angles', 'set_orientation'),
+}
+# The methods the emulator answers, for connections that drive the scenario as well.
+EMULATOR_METHODS = {kind: METHODS[kind] + HARNESS_METHODS.get(kind, ()) for kind in KINDS}
+
+
+class _Hub:
+
+    def __init__(self, sim):
+        self.sim = sim
+
+    def get_time(self):
+        return self.sim.time
+
+    def sleep(self, seconds):
+        self.sim.sleep(seconds)
+
+    def snapshot(self):
+        return self.sim.snapshot()
+
+
+def _target(sim, kind, address):
+    if kind == 'hub':
+        return _Hub(sim)
+    return getattr(sim, kind)(*address)
+
+
+def handle(sim, payload):
+    """
+    Runs one request against a simulation.
+
+    Args:
+        sim (Simulation): The simulated hub.
+        payload (bytes): The payload of the request frame.
+
+    Returns:
+        bytes: The response frame; an error response if the request is malformed, holds no calls, or
+        a call fails.
+    """
+    try:
+        _, calls = decode_request(payload, EMULATOR_METHODS)
+        if not calls:
+            raise ValueError('a request must hold at least one call')
+        for kind, address, method, args in calls:
+            value = getattr(_target(sim, kind, address), method)(*args)
+        parts = []
+        encode(value, parts)
+    except Exception as error:
+        return response(request_id(payload), None, error)
+    return response(request_id(payload), parts)
+
+
+def serve(transport, sim):
+    """
+    Answers the requests on a transport with a simulated hub until the other end closes it.
+
+    Args:
+        transport (Transport): The stream to the client.
+        sim (Simulation): The simulated hub.
+    """
+    while True:
+        payload = transport.read_frame()
+        if payload is None:
+            return
+        transport.write(handle(sim, payload))
+
+
+class HubServer:
+    """
+    A fake hub that serves any number of clients on a Unix socket from background threads.
+
+    All clients share one simulated hub. Requests from each client are answered in order, so clients
+    can pipeline them; the server is meant for measuring the throughput of connections and sessions.
+
+    Example:
+        from spike.emulator import HubServer
+        from spike.pool import ConnectionPool
+
+        with HubServer('/tmp/hub.sock'), ConnectionPool() as pool:
+            connection = pool.connect('/tmp/hub.sock')
+            print(connection.pipeline([('motor', ('A',), 'get_speed', ())] * 100))
+    """
+
+    def __init__(self, path, tick=DEFAULT_TICK):
+        """
+        Initializes the HubServer.
+
+        Args:
+            path (str): The path of the Unix socket to listen on.
+            tick (float, optional): The simulation step of the hub in seconds. Defaults to 0.005.
+        """
+        self.path = path
+        self.sim = Simulation(tick)
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._transports = []
+        self._threads = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Starts listening.
+
+        Returns:
+            HubServer: The server itself.
+        """
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.path)
+        self._server.listen(64)
+        self._start_thread(self._accept)
+        return self
+
+    def stop(self):
+        """
+        Stops listening and disconnects all clients.
+        """
+        server, self._server = self._server, None
+        if server is None:
+            return
+        server.shutdown(socket.SHUT_RDWR)
+        server.close()
+        for transport in list(self._transports):
+            transport.close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        os.unlink(self.path)
+
+    def _start_thread(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        self._threads.append(thread)
+        thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, _ = self._server.accept()
+            except (OSError, AttributeError):
+                return
+            transport = Transport.socket(client)
+            self._transports.append(transport)
+            self._start_thread(self._serve, transport)
+
+    def _serve(self, transport):
+        try:
+            while True:
+                payload = transport.read_frame()
+                if payload is None:
+                    break
+                with self._lock:
+                    answer = handle(self.sim, payload)
+                    self.requests += 1
+                transport.write(answer)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._transports.remove(transport)
+            transport.close()
+
+
+class LoopbackHub:
+    """
+    Starts the hub emulator in a child process and connects to it.
+
+    The emulator runs a `Simulation` and answers the binary protocol of `spike.transport`, so a
+    program exercises the same code path as with a real hub. It talks over a pipe by default, or over
+    a Unix socket. Its connection also sends the methods of `HARNESS_METHODS`, so the program can set
+    up the scenario, e.g. with `connection.call('color_sensor', ('E',), 'set_color', ('red',))`.
+
+    Example:
+        from spike import Motor
+        from spike.emulator import LoopbackHub
+
+        with LoopbackHub() as connection:
+            Motor('A').run_for_seconds(1)
+            print(connection.calls)
+    """
+
+    def __init__(self, socket_path=None, tick=DEFAULT_TICK):
+        """
+        Initializes the LoopbackHub.
+
+        Args:
+            socket_path (str, optional): A Unix socket for the emulator to listen on. Defaults to a pipe.
+            tick (float, optional): The simulation step of the emulator in seconds. Defaults to 0.005.
+        """
+        self.socket_path = socket_path
+        self.tick = tick
+        self.connection = None
+        self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Starts the emulator and activates a connection to it.
+
+        Returns:
+            Connection: The active connection.
+
+        Raises:
+            RuntimeError: If the emulator does not start listening within ten seconds.
+        """
+        command = [sys.executable, '-m', 'spike.emulator', '--tick', repr(self.tick)]
+        environment = dict(os.environ)
+        package = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        environment['PYTHONPATH'] = os.pathsep.join(filter(None, [package, environment.get('PYTHONPATH')]))
+        if self.socket_path is None:
+            self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                             env=environment)
+            transport = Transport(self._process.stdout, self._process.stdin)
+        else:
+            self._process = subprocess.Popen(command + ['--socket', self.socket_path], env=environment)
+            transport = self._connect()
+        self.connection = Connection(transport, EMULATOR_METHODS).start()
+        return self.connection
+
+    def _connect(self):
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                return Transport.unix(self.socket_path)
+            except OSError:
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self._process.kill()
+                    raise RuntimeError('the emulator did not start listening on {}'.format(self.socket_path))
+                time.sleep(0.01)
+
+    def stop(self):
+        """
+        Deactivates the connection and stops the emulator.
+        """
+        if self.connection is not None:
+            self.connection.stop()
+            self.connection.close()
+            self.connection = None
+        if self._process is not None:
+            try:
+                self._process.wait(5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+            self._process = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m spike.emulator',
+                                     description='Emulates a SPIKE Prime Hub with a simulation.')
+    parser.add_argument('--socket', help='listen on this Unix socket instead of standard input and output')
+    parser.add_argument('--tick', type=float, default=DEFAULT_TICK, help='the simulation step in seconds')
+    arguments = parser.parse_args(argv)
+    sim = Simulation(arguments.tick)
+    if arguments.socket is None:
+        serve(Transport(sys.stdin.buffer, sys.stdout.buffer), sim)
+        return
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    if os.path.exists(arguments.socket):
+        os.unlink(arguments.socket)
+    server.bind(arguments.socket)
+    server.listen(1)
+    try:
+        client, _ = server.accept()
+        serve(Transport.socket(client), sim)
+    finally:
+        server.close()
+        os.unlink(arguments.socket)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+from collections import namedtuple
+
+from ._backend import get_backend, get_time
+
+# The events and what their source is: a button side, a motor port, a gesture or 'motion_sensor'.
+EVENTS = ('pressed', 'released', 'gesture', 'orientation', 'stalled', 'interrupted', 'color')
+
+Event = namedtuple('Event', ['kind', 'source', 'value', 'time'])
+Event.__doc__ = """
+An event delivered to subscribers.
+
+Attributes:
+    kind (str): One of `EVENTS`.
+    source (str): The button side, motor port or color sensor port, the gesture for 'gesture' events,
+        or 'motion_sensor' for 'orientation' events.
+    value (object): The new state, such as the detected color or the new orientation.
+    time (float): The time of the event in seconds.
+"""
+
+
+class Dispatcher:
+    """
+    Delivers state changes of the hub and its devices to the handlers subscribed to them.
+
+    Handlers are looked up by event and source when the state changes, so only the affected handlers
+    run and an idle program costs nothing. A handler is either a function that takes an `Event`, or
+    a queue, such as `collections.deque`, `queue.Queue` or `asyncio.Queue`, that the event is put into.
+
+    Handlers run at the moment the state changes, so they must not call blocking methods such as
+    `Motor.run_for_degrees()`. Put the event into a queue and handle it from the program instead.
+
+    Example:
+        from collections import deque
+        from spike import Motor, Simulation
+        from spike.events import get_dispatcher
+
+        with Simulation() as sim:
+            events = get_dispatcher()
+            stalls = deque()
+            events.subscribe('stalled', 'A', stalls)
+            events.subscribe('pressed', 'left', lambda event: print('pressed at', event.time))
+            sim.at(1, sim.button('left').click)
+            Motor('A').run_for_seconds(2)
+    """
+
+    def __init__(self):
+        """
+        Initializes the Dispatcher.
+        """
+        self._handlers = {}
+
+    def subscribe(self, kind, source, handler):
+        """
+        Subscribes a handler to an event.
+
+        Args:
+            kind (str): The event: 'pressed', 'released', 'gesture', 'orientation', 'stalled', 'interrupted' or 'color'.
+            source (str or None): The button side, motor port or color sensor port, the gesture, or
+                'motion_sensor'. None subscribes to the event of every source.
+            handler (callable or queue): A function that takes an `Event`, or a queue with an
+                `append()` or `put_nowait()` method.
+
+        Returns:
+            object: The handler, to pass to `unsubscribe()`.
+
+        Raises:
+            ValueError: If `kind` is not one of the allowed values.
+            TypeError: If `handler` is neither callable nor a queue.
+        """
+        if kind not in EVENTS:
+            raise ValueError('kind must be one of {}'.format(EVENTS))
+        if callable(handler):
+            deliver = handler
+        elif hasattr(handler, 'put_nowait'):
+            deliver = handler.put_nowait
+        elif hasattr(handler, 'append'):
+            deliver = handler.append
+        else:
+            raise TypeError('handler must be callable or a queue')
+        self._handlers.setdefault((kind, source), []).append((handler, deliver))
+        return handler
+
+    def unsubscribe(self, kind, source, handler):
+        """
+        Removes a handler added with `subscribe()`.
+
+        Raises:
+            ValueError: If the handler is not subscribed to the event.
+        """
+        handlers = self._handlers.get((kind, source), ())
+        for index, (subscribed, _) in enumerate(handlers):
+            if subscribed is handler:
+                del handlers[index]
+                if not handlers:
+                    del self._handlers[(kind, source)]
+                return
+        raise ValueError('the handler is not subscribed to {} of {}'.format(kind, source))
+
+    def emit(self, kind, source, value=None, time=None):
+        """
+        Delivers an event to its handlers. Backends call this when the state of a device changes.
+
+        Args:
+            kind (str): The event.
+            source (str): The source of the event.
+            value (object, optional): The new state.
+            time (float, optional): The time of the event. Defaults to the current time.
+        """
+        handlers = self._handlers
+        if not handlers:
+            return
+        specific = handlers.get((kind, source), ())
+        general = handlers.get((kind, None), ())
+        if not specific and not general:
+            return
+        event = Event(kind, source, value, get_time() if time is None else time)
+        # Copy, so that handlers can unsubscribe themselves.
+        for _, deliver in tuple(specific) + tuple(general):
+            deliver(event)
+
+
+# Subscriptions made while no backend is active; dummy devices never change, so nothing is delivered.
+_dispatcher = Dispatcher()
+
+
+def get_dispatcher():
+    """
+    Retrieves the dispatcher of the active backend.
+
+    Returns:
+        Dispatcher: The dispatcher that delivers the events of the active backend. Without a
+        backend that reports events, a dispatcher that never delivers any.
+    """
+    dispatcher = getattr(get_backend(), 'dispatcher', None)
+    return _dispatcher if dispatcher is None else dispatcher
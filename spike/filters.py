@@ -0,0 +1,400 @@
+import abc
+import bisect
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The largest factor the exponential filter lets its weights grow by within one vectorized block.
+_BLOCK_GROWTH = 1e8
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('Filter.apply requires NumPy: pip install numpy')
+
+
+def _exponential(values, alpha, start):
+    # Runs y += alpha * (x - y) from `start` over `values` in blocks short enough that the weights
+    # (1 - alpha) ** -i stay well within floating point range.
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        return values.copy()
+    size = max(1, int(math.log(_BLOCK_GROWTH) / -math.log(decay))) if decay < 1.0 else max(1, len(values))
+    result = np.empty(len(values))
+    previous = start
+    for begin in range(0, len(values), size):
+        block = values[begin:begin + size]
+        powers = decay ** np.arange(1, len(block) + 1)
+        result[begin:begin + len(block)] = powers * (previous + alpha * np.cumsum(block / powers))
+        previous = result[begin + len(block) - 1]
+    return result
+
+
+class Filter(abc.ABC):
+    """
+    A stage that smooths a stream of readings one sample at a time.
+
+    `update()` takes a reading and returns the filtered value in constant time, without allocating
+    once the filter is warmed up. `attach()` turns a getter such as `ColorSensor.get_reflected_light`
+    into one that returns filtered readings, and `apply()` runs the same filter over a whole recorded
+    array with NumPy. Stages are chained with `Pipeline`.
+    """
+
+    @abc.abstractmethod
+    def update(self, value):
+        """
+        Adds a reading.
+
+        Args:
+            value (float): The new reading.
+
+        Returns:
+            float: The filtered value.
+        """
+
+    @abc.abstractmethod
+    def reset(self):
+        """
+        Forgets all readings.
+        """
+
+    def attach(self, getter):
+        """
+        Wraps a getter so that each call reads it and returns the filtered value.
+
+        Args:
+            getter (callable): A function that returns a reading, e.g. `motor.get_speed`.
+
+        Returns:
+            callable: A function without arguments that returns the filtered reading.
+
+        Example:
+            from spike import ColorSensor
+            from spike.filters import MovingAverage
+
+            get_light = MovingAverage(5).attach(ColorSensor('E').get_reflected_light)
+            print(get_light())
+        """
+        update = self.update
+        return lambda: update(getter())
+
+    def apply(self, values):
+        """
+        Filters a recorded series from a fresh state, giving the same values as calling `update()`
+        on each reading in turn. The filter's own state is left alone.
+
+        Requires NumPy.
+
+        Args:
+            values (array-like): The readings, oldest first.
+
+        Returns:
+            numpy.ndarray: The filtered values.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        _require_numpy()
+        values = np.asarray(values, dtype=float)
+        if not len(values):
+            return np.empty(0)
+        return self._apply(values)
+
+    @abc.abstractmethod
+    def _apply(self, values):
+        pass
+
+
+class MovingAverage(Filter):
+    """
+    The mean of the last `size` readings, kept as a running sum over a ring buffer. Until `size`
+    readings have arrived, it is the mean of the readings so far.
+    """
+
+    def __init__(self, size):
+        """
+        Args:
+            size (int): The number of readings averaged.
+
+        Raises:
+            ValueError: If `size` is not positive.
+        """
+        if size <= 0:
+            raise ValueError('size must be positive')
+        self.size = size
+        self._window = array('d', bytes(8 * size))
+        self.reset()
+
+    def reset(self):
+        self._index = 0
+        self._count = 0
+        self._sum = 0.0
+
+    def update(self, value):
+        index = self._index
+        window = self._window
+        if self._count < self.size:
+            self._count += 1
+        else:
+            self._sum -= window[index]
+        window[index] = value
+        self._sum += value
+        self._index = index + 1 if index + 1 < self.size else 0
+        return self._sum / self._count
+
+    def _apply(self, values):
+        sums = np.cumsum(values)
+        sums[self.size:] -= sums[:-self.size].copy()
+        return sums / np.minimum(np.arange(1, len(values) + 1), self.size)
+
+
+class Median(Filter):
+    """
+    The median of the last `size` readings, which removes single spikes without smearing edges.
+
+    The window is kept sorted, so each reading costs a bisection and a move of at most `size`
+    values within a preallocated array. Until `size` readings have arrived, it is the median of the
+    readings so far.
+    """
+
+    def __init__(self, size=5):
+        """
+        Args:
+            size (int, optional): The number of readings in the window. Defaults to 5.
+
+        Raises:
+            ValueError: If `size` is not positive.
+        """
+        if size <= 0:
+            raise ValueError('size must be positive')
+        self.size = size
+        self._window = array('d', bytes(8 * size))
+        self.reset()
+
+    def reset(self):
+        self._sorted = array('d')
+        self._index = 0
+
+    def update(self, value):
+        ordered = self._sorted
+        if len(ordered) == self.size:
+            del ordered[bisect.bisect_left(ordered, self._window[self._index])]
+        bisect.insort(ordered, value)
+        self._window[self._index] = value
+        self._index = self._index + 1 if self._index + 1 < self.size else 0
+        count = len(ordered)
+        middle = count // 2
+        return ordered[middle] if count % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+    def _apply(self, values):
+        size = min(self.size, len(values))
+        result = np.empty(len(values))
+        for index in range(size - 1):
+            result[index] = np.median(values[:index + 1])
+        windows = np.lib.stride_tricks.sliding_window_view(values, size)
+        result[size - 1:] = np.median(windows, axis=1)
+        return result
+
+
+class Exponential(Filter):
+    """
+    An exponential moving average: each reading moves the value by `alpha` of the way towards it.
+    The first reading is taken as it is.
+    """
+
+    def __init__(self, alpha):
+        """
+        Args:
+            alpha (float): The weight of a new reading (0 to 1); smaller values smooth more.
+
+        Raises:
+            ValueError: If `alpha` is not within 0 and 1.
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError('alpha must be within 0 and 1')
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self._value = None
+
+    def update(self, value):
+        if self._value is None:
+            self._value = float(value)
+        else:
+            self._value += self.alpha * (value - self._value)
+        return self._value
+
+    def _apply(self, values):
+        result = np.empty(len(values))
+        result[0] = values[0]
+        result[1:] = _exponential(values[1:], self.alpha, values[0])
+        return result
+
+
+class Kalman(Filter):
+    """
+    A one-dimensional Kalman filter for a value that drifts slowly under noisy readings.
+
+    The filter weighs each reading by how uncertain its estimate is against the noise of the sensor,
+    so it follows quickly at first and settles to a steady smoothing. The first reading is taken as
+    it is, with the uncertainty of one reading.
+    """
+
+    def __init__(self, process_noise=1.0, measurement_noise=10.0):
+        """
+        Args:
+            process_noise (float, optional): The variance the true value drifts by per reading.
+                Defaults to 1.
+            measurement_noise (float, optional): The variance of the readings. Defaults to 10.
+
+        Raises:
+            ValueError: If `process_noise` is negative or `measurement_noise` is not positive.
+        """
+        if process_noise < 0:
+            raise ValueError('process_noise must not be negative')
+        if measurement_noise <= 0:
+            raise ValueError('measurement_noise must be positive')
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.reset()
+
+    def reset(self):
+        self._value = None
+        self._variance = self.measurement_noise
+
+    def _gain(self, variance):
+        # The gain for the next reading and the variance after it.
+        variance += self.process_noise
+        gain = variance / (variance + self.measurement_noise)
+        return gain, variance * (1 - gain)
+
+    def update(self, value):
+        if self._value is None:
+            self._value = float(value)
+            return self._value
+        gain, self._variance = self._gain(self._variance)
+        self._value += gain * (value - self._value)
+        return self._value
+
+    def _apply(self, values):
+        # The gains do not depend on the readings and settle after a few steps, after which the
+        # filter is an exponential moving average.
+        result = np.empty(len(values))
+        value = result[0] = values[0]
+        gain, variance = self._gain(self.measurement_noise)
+        index = 1
+        while index < len(values):
+            value += gain * (values[index] - value)
+            result[index] = value
+            index += 1
+            following, variance = self._gain(variance)
+            settled = abs(following - gain) <= 1e-12 * gain
+            gain = following
+            if settled:
+                break
+        result[index:] = _exponential(values[index:], gain, value)
+        return result
+
+
+class Debounce(Filter):
+    """
+    Passes a change of a discrete reading, such as a color or a button state, only once the new
+    value has been read `count` times in a row. The first reading is taken as it is.
+    """
+
+    def __init__(self, count=3):
+        """
+        Args:
+            count (int, optional): The number of equal readings in a row that make a change. Defaults to 3.
+
+        Raises:
+            ValueError: If `count` is not positive.
+        """
+        if count <= 0:
+            raise ValueError('count must be positive')
+        self.count = count
+        self.reset()
+
+    def reset(self):
+        self._value = None
+        self._candidate = None
+        self._seen = 0
+
+    def update(self, value):
+        if self._seen == 0:
+            self._value = self._candidate = value
+            self._seen = 1
+            return value
+        if value == self._candidate:
+            self._seen += 1
+        else:
+            self._candidate = value
+            self._seen = 1
+        if self._seen >= self.count:
+            self._value = value
+        return self._value
+
+    def apply(self, values):
+        _require_numpy()
+        values = np.asarray(values)
+        if not len(values):
+            return values.copy()
+        return self._apply(values)
+
+    def _apply(self, values):
+        positions = np.arange(len(values))
+        starts = np.zeros(len(values), dtype=np.intp)
+        changed = np.flatnonzero(values[1:] != values[:-1]) + 1
+        starts[changed] = changed
+        np.maximum.accumulate(starts, out=starts)
+        accepted = positions - starts >= self.count - 1
+        accepted[0] = True
+        return values[np.maximum.accumulate(np.where(accepted, positions, 0))]
+
+
+class Pipeline(Filter):
+    """
+    Runs readings through several filters in turn, e.g. a median to remove spikes followed by an
+    exponential moving average.
+
+    Example:
+        from spike import Motor
+        from spike.filters import Exponential, Median, Pipeline
+
+        get_speed = Pipeline(Median(5), Exponential(0.2)).attach(Motor('A').get_speed)
+        print(get_speed())
+    """
+
+    def __init__(self, *stages):
+        """
+        Args:
+            *stages (Filter): The filters, in the order the readings go through them.
+
+        Raises:
+            ValueError: If there are no stages.
+        """
+        if not stages:
+            raise ValueError('a pipeline needs at least one stage')
+        self.stages = stages
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+    def update(self, value):
+        for stage in self.stages:
+            value = stage.update(value)
+        return value
+
+    def apply(self, values):
+        for stage in self.stages:
+            values = stage.apply(values)
+        return values
+
+    def _apply(self, values):
+        return self.apply(values)
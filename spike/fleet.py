@@ -0,0 +1,365 @@
+from .simulation import (ACCELERATION, COAST_DECELERATION, DEFAULT_AXLE_TRACK, DEFAULT_MOTOR_ROTATION,
+                         DEFAULT_TICK, MAX_SPEED, STOP_ACTIONS, UNITS)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('Fleet requires NumPy: pip install numpy')
+
+
+class Fleet:
+    """
+    Simulates many independent driving bases at once, keeping their state in NumPy arrays.
+
+    Every driving base behaves like a `MotorPair` inside a `Simulation`, but a single tick advances
+    the whole fleet with one vectorized update. Arguments of the driving commands may be scalars,
+    which apply to every driving base, or arrays with one value per driving base, which makes the
+    fleet a convenient way to sweep settings such as the motor rotation or the speed.
+
+    The pose of each driving base is kept in `x` and `y` (cm, x pointing forward at the start) and
+    `heading` (radians, counterclockwise). As on the hub, the left motor is mirrored, so its angle
+    decreases when the driving base moves forward.
+
+    Requires NumPy.
+
+    Example:
+        import numpy as np
+        from spike.fleet import Fleet
+
+        fleet = Fleet(10000)
+        fleet.set_motor_rotation(np.linspace(15, 20, 10000))
+        fleet.move(50, 'cm', steering=10)
+        print(fleet.x.mean(), fleet.y.mean())
+    """
+
+    def __init__(self, size, tick=DEFAULT_TICK, axle_track=DEFAULT_AXLE_TRACK):
+        """
+        Initializes the Fleet.
+
+        Args:
+            size (int): The number of driving bases.
+            tick (float, optional): The length of one simulation step in seconds. Defaults to 0.005.
+            axle_track (float or array, optional): The distance between the wheels in cm. Defaults to 11.2.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+            ValueError: If `size` or `tick` is not positive.
+        """
+        _require_numpy()
+        if size <= 0:
+            raise ValueError('size must be positive')
+        if tick <= 0:
+            raise ValueError('tick must be positive')
+        self.size = size
+        self.tick = tick
+        self.ticks = 0
+        self.axle_track = np.broadcast_to(np.asarray(axle_track, dtype=float), (size,)).copy()
+        self.motor_rotation = np.full(size, DEFAULT_MOTOR_ROTATION)
+        self.default_speed = np.full(size, 100.0)
+        self.stop_action = np.full(size, STOP_ACTIONS.index('brake'), dtype=np.int8)
+        self.x = np.zeros(size)
+        self.y = np.zeros(size)
+        self.heading = np.zeros(size)
+        # Row 0 holds the left motor and row 1 the right motor.
+        self.angle = np.zeros((2, size))
+        self.speed = np.zeros((2, size))
+        self._target_speed = np.zeros((2, size))
+        self._acceleration = np.full((2, size), ACCELERATION)
+        self._goal = np.full((2, size), np.nan)
+        self._remaining = np.full(size, np.inf)
+        self._timed = False
+        self.busy = np.zeros((2, size), dtype=bool)
+
+    @property
+    def time(self):
+        """
+        float: The simulated time in seconds since the fleet was created.
+        """
+        return self.ticks * self.tick
+
+    # Time
+
+    def step(self, ticks=1):
+        """
+        Advances every driving base by a number of ticks.
+
+        Args:
+            ticks (int, optional): The number of ticks to advance. Defaults to 1.
+        """
+        dt = self.tick
+        change = np.empty((2, self.size))
+        limit = np.empty((2, self.size))
+        delta = np.empty((2, self.size))
+        crossed = np.empty((2, self.size), dtype=bool)
+        half_rotation = self.motor_rotation / 720
+        turn_rotation = self.motor_rotation / 360 / self.axle_track
+        for _ in range(ticks):
+            speed = self.speed
+            np.subtract(self._target_speed, speed, out=change)
+            np.multiply(self._acceleration, dt, out=limit)
+            np.minimum(change, limit, out=change)
+            np.negative(limit, out=limit)
+            np.maximum(change, limit, out=change)
+            speed += change
+            np.multiply(speed, dt, out=delta)
+            angle = self.angle
+            angle += delta
+            # Motors that reached or passed their goal this tick end exactly on it and stop there,
+            # whatever the stop action.
+            np.subtract(angle, self._goal, out=change)
+            change *= self._target_speed
+            np.greater_equal(change, 0, out=crossed)
+            crossed &= self.busy
+            if crossed.any():
+                delta -= angle
+                np.copyto(angle, self._goal, where=crossed)
+                delta += angle
+                speed[crossed] = 0.0
+                finished = crossed.copy()
+            else:
+                finished = None
+            if self._timed:
+                self._remaining -= dt
+                expired = self._remaining <= 1e-9
+                if expired.any():
+                    finished = self.busy & expired if finished is None else finished | (self.busy & expired)
+                    self._remaining[expired] = np.inf
+                    self._timed = bool(np.isfinite(self._remaining).any())
+            if finished is not None:
+                self._halt(finished)
+
+            left = delta[0]
+            right = delta[1]
+            left *= -1
+            distance = left + right
+            distance *= half_rotation
+            turn = right - left
+            turn *= turn_rotation
+            middle = turn * 0.5
+            middle += self.heading
+            self.x += distance * np.cos(middle)
+            self.y += distance * np.sin(middle)
+            self.heading += turn
+            self.ticks += 1
+
+    def run_for(self, seconds):
+        """
+        Advances every driving base by a duration.
+
+        Args:
+            seconds (float): The simulated time to advance, in seconds.
+        """
+        self.step(int(round(seconds / self.tick)))
+
+    def wait(self, time_limit=None):
+        """
+        Advances the fleet until no driving base is running a blocking command.
+
+        Args:
+            time_limit (float, optional): The simulated time in seconds after which RuntimeError is raised.
+
+        Raises:
+            RuntimeError: If the time limit is reached first.
+        """
+        while self.busy.any():
+            if time_limit is not None and self.time >= time_limit:
+                raise RuntimeError('simulation time limit of {} s reached'.format(time_limit))
+            self.step()
+
+    # Actions
+
+    def move(self, amount, unit='cm', steering=0, speed=None):
+        """
+        Moves every driving base, like `MotorPair.move()`, and waits until all have finished.
+
+        Args:
+            amount (float or array): The quantity to move in relation to `unit`.
+            unit (str, optional): 'cm', 'in', 'rotations', 'degrees' or 'seconds'. Defaults to 'cm'.
+            steering (int or array, optional): The steering (-100 to 100). Defaults to 0.
+            speed (int or array, optional): The motor speed (-100 to 100%). Defaults to the default speed.
+
+        Raises:
+            ValueError: If `unit` is not one of the allowed values.
+        """
+        self._command_tank(amount, unit, *self._tank_speeds(steering, speed))
+        self.wait()
+
+    def move_tank(self, amount, unit='cm', left_speed=None, right_speed=None):
+        """
+        Moves every driving base with tank steering, like `MotorPair.move_tank()`,
+        and waits until all have finished.
+
+        Args:
+            amount (float or array): The quantity to move in relation to `unit`.
+            unit (str, optional): 'cm', 'in', 'rotations', 'degrees' or 'seconds'. Defaults to 'cm'.
+            left_speed (int or array, optional): The speed of the left motor. Defaults to the default speed.
+            right_speed (int or array, optional): The speed of the right motor. Defaults to the default speed.
+
+        Raises:
+            ValueError: If `unit` is not one of the allowed values.
+        """
+        self._command_tank(amount, unit, self._speed(left_speed), self._speed(right_speed))
+        self.wait()
+
+    def start(self, steering=0, speed=None):
+        """
+        Starts every driving base without waiting, like `MotorPair.start()`.
+
+        Args:
+            steering (int or array, optional): The steering (-100 to 100). Defaults to 0.
+            speed (int or array, optional): The motor speed (-100 to 100%). Defaults to the default speed.
+        """
+        self.start_tank(*self._tank_speeds(steering, speed))
+
+    def start_tank(self, left_speed, right_speed):
+        """
+        Starts every driving base with tank steering without waiting, like `MotorPair.start_tank()`.
+
+        Args:
+            left_speed (int or array): The speed of the left motor (-100 to 100%).
+            right_speed (int or array): The speed of the right motor (-100 to 100%).
+        """
+        self._run(np.stack((-self._clip(left_speed), self._clip(right_speed))))
+
+    def stop(self):
+        """
+        Stops every driving base using its stop action.
+        """
+        self._halt(np.ones((2, self.size), dtype=bool))
+        self._remaining[:] = np.inf
+        self._timed = False
+
+    # Measurements
+
+    def get_degrees_counted(self):
+        """
+        Retrieves the degrees counted by the motors.
+
+        Returns:
+            tuple of array: The degrees counted by the left and the right motors.
+        """
+        counted = np.rint(self.angle).astype(int)
+        return counted[0], counted[1]
+
+    def get_speed(self):
+        """
+        Retrieves the speed of the motors.
+
+        Returns:
+            tuple of array: The speed of the left and the right motors (-100% to 100%).
+        """
+        speed = np.rint(self.speed * 100 / MAX_SPEED).astype(int)
+        return speed[0], speed[1]
+
+    # Settings
+
+    def set_motor_rotation(self, amount, unit='cm'):
+        """
+        Sets the distance the driving bases move for one motor rotation.
+
+        Args:
+            amount (float or array): The distance of one motor rotation.
+            unit (str, optional): 'cm' or 'in'. Defaults to 'cm'.
+
+        Raises:
+            ValueError: If `unit` is not one of the allowed values.
+        """
+        if unit not in ('cm', 'in'):
+            raise ValueError("unit must be 'cm' or 'in'")
+        amount = np.asarray(amount, dtype=float)
+        self.motor_rotation[:] = amount * 2.54 if unit == 'in' else amount
+
+    def set_default_speed(self, speed):
+        """
+        Sets the default motor speed.
+
+        Args:
+            speed (int or array): The default motor speed (-100 to 100%).
+        """
+        self.default_speed[:] = self._clip(speed)
+
+    def set_stop_action(self, action):
+        """
+        Sets the action used when the driving bases stop.
+
+        Args:
+            action (str or sequence of str): 'coast', 'brake' or 'hold', either for all driving bases
+                or one per driving base.
+
+        Raises:
+            ValueError: If an action is not one of the allowed values.
+        """
+        actions = [action] if isinstance(action, str) else list(action)
+        for name in actions:
+            if name not in STOP_ACTIONS:
+                raise ValueError('action must be one of {}'.format(STOP_ACTIONS))
+        self.stop_action[:] = [STOP_ACTIONS.index(name) for name in actions]
+
+    # Internals
+
+    def _per_base(self, value):
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.size,))
+
+    def _clip(self, value):
+        return np.clip(self._per_base(value), -100, 100)
+
+    def _speed(self, speed):
+        return self.default_speed if speed is None else self._clip(speed)
+
+    def _tank_speeds(self, steering, speed):
+        speed = self._speed(speed)
+        steering = self._clip(steering)
+        left = np.where(steering >= 0, speed, speed * (100 + 2 * steering) / 100)
+        right = np.where(steering >= 0, speed * (100 - 2 * steering) / 100, speed)
+        return left, right
+
+    def _run(self, speeds, acceleration=ACCELERATION):
+        self._goal[:] = np.nan
+        self._remaining[:] = np.inf
+        self._timed = False
+        self.busy[:] = False
+        self._target_speed[:] = speeds * (MAX_SPEED / 100)
+        self._acceleration[:] = acceleration
+
+    def _halt(self, mask):
+        coast = mask & (self.stop_action == STOP_ACTIONS.index('coast'))
+        self._target_speed[mask] = 0.0
+        self._acceleration[mask] = ACCELERATION
+        self._acceleration[coast] = COAST_DECELERATION
+        self.speed[mask & ~coast] = 0.0
+        self._goal[mask] = np.nan
+        self.busy[mask] = False
+
+    def _command_tank(self, amount, unit, left_speed, right_speed):
+        if unit not in UNITS:
+            raise ValueError('unit must be one of {}'.format(UNITS))
+        speeds = np.stack((-self._clip(left_speed), self._clip(right_speed)))
+        amount = self._per_base(amount)
+        lead = np.abs(speeds).max(axis=0)
+        share = np.divide(np.abs(speeds), lead, out=np.zeros((2, self.size)), where=lead > 0)
+        self._run(speeds, ACCELERATION * share)
+        if unit == 'seconds':
+            active = (lead > 0) & (amount > 0)
+            self._remaining[active] = amount[active]
+            self._timed = bool(active.any())
+            self.busy[:] = active
+            return
+        if unit == 'cm':
+            degrees = amount / self.motor_rotation * 360
+        elif unit == 'in':
+            degrees = amount * 2.54 / self.motor_rotation * 360
+        elif unit == 'rotations':
+            degrees = amount * 360
+        else:
+            degrees = amount
+        # Scaling the travel and the acceleration keeps both wheels on the same timeline.
+        direction = np.sign(degrees) * np.sign(speeds)
+        self._goal[:] = self.angle + np.abs(degrees) * share * direction
+        self._target_speed[:] = np.abs(speeds) * direction * (MAX_SPEED / 100)
+        self.busy[:] = direction != 0
+        self._goal[~self.busy] = np.nan
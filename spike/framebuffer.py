@@ -0,0 +1,351 @@
+import functools
+
+from .control import wait_for_seconds
+from .primehub import LightMatrix
+
+# The named images of the Light Matrix, row by row from the top, with the brightness of each pixel
+# from 0 to 9.
+IMAGES = {
+    'HEART': '09090:99999:99999:09990:00900',
+    'HEART_SMALL': '00000:09090:09990:00900:00000',
+    'HAPPY': '00000:09090:00000:90009:09990',
+    'SMILE': '00000:00000:00000:90009:09990',
+    'SAD': '00000:09090:00000:09990:90009',
+    'CONFUSED': '00000:09090:00000:09090:90909',
+    'ANGRY': '90009:09090:00000:99999:90909',
+    'ASLEEP': '00000:99099:00000:09990:00000',
+    'SURPRISED': '09090:00000:00900:09090:00900',
+    'SILLY': '90009:00000:99999:00099:00099',
+    'FABULOUS': '99999:99099:00000:09090:09990',
+    'MEH': '09090:00000:00090:00900:09000',
+    'YES': '00000:00009:00090:90900:09000',
+    'NO': '90009:09090:00900:09090:90009',
+    'TRIANGLE': '00000:00900:09090:99999:00000',
+    'TRIANGLE_LEFT': '90000:99000:90900:90090:99999',
+    'CHESSBOARD': '09090:90909:09090:90909:09090',
+    'DIAMOND': '00900:09090:90009:09090:00900',
+    'DIAMOND_SMALL': '00000:00900:09090:00900:00000',
+    'SQUARE': '99999:90009:90009:90009:99999',
+    'SQUARE_SMALL': '00000:09990:09090:09990:00000',
+    'RABBIT': '90900:90900:99990:99090:99990',
+    'COW': '90009:90009:99999:09990:00900',
+    'MUSIC_CROTCHET': '00900:00900:00900:99900:99900',
+    'MUSIC_QUAVER': '00900:00990:00909:99900:99900',
+    'MUSIC_QUAVERS': '09999:09009:09009:99099:99099',
+    'PITCHFORK': '90909:90909:99999:00900:00900',
+    'XMAS': '00900:09990:00900:09990:99999',
+    'PACMAN': '09999:99090:99900:99990:09999',
+    'TARGET': '00900:09990:99099:09990:00900',
+    'TSHIRT': '99099:99999:09990:09990:09990',
+    'ROLLERSKATE': '00099:00099:99999:99999:09090',
+    'DUCK': '09900:99900:09999:09990:00000',
+    'HOUSE': '00900:09990:99999:09990:09090',
+    'TORTOISE': '00000:09990:99999:09090:00000',
+    'BUTTERFLY': '99099:99999:00900:99999:99099',
+    'STICKFIGURE': '00900:99999:00900:09090:90009',
+    'GHOST': '99999:90909:99999:99999:90909',
+    'SWORD': '00900:00900:00900:09990:00900',
+    'GIRAFFE': '99000:09000:09000:09990:09090',
+    'SKULL': '09990:90909:99999:09990:09990',
+    'UMBRELLA': '09990:99999:00900:90900:09900',
+    'SNAKE': '99000:99099:09090:09990:00000',
+    'ARROW_N': '00900:09990:90909:00900:00900',
+    'ARROW_NE': '00999:00099:00909:09000:90000',
+    'ARROW_E': '00900:00090:99999:00090:00900',
+    'ARROW_SE': '90000:09000:00909:00099:00999',
+    'ARROW_S': '00900:00900:90909:09990:00900',
+    'ARROW_SW': '00009:00090:90900:99000:99900',
+    'ARROW_W': '00900:09000:99999:09000:00900',
+    'ARROW_NW': '99900:99000:90900:00090:00009',
+    'GO_UP': '00900:09990:99999:00000:00000',
+    'GO_RIGHT': '09000:09900:09990:09900:09000',
+    'GO_DOWN': '00000:00000:99999:09990:00900',
+    'GO_LEFT': '00090:00990:09990:00990:00090',
+    'CLOCK12': '00900:00900:00900:00000:00000',
+    'CLOCK1': '00090:00090:00900:00000:00000',
+    'CLOCK2': '00000:00099:00900:00000:00000',
+    'CLOCK3': '00000:00000:00999:00000:00000',
+    'CLOCK4': '00000:00000:00900:00099:00000',
+    'CLOCK5': '00000:00000:00900:00090:00090',
+    'CLOCK6': '00000:00000:00900:00900:00900',
+    'CLOCK7': '00000:00000:00900:09000:09000',
+    'CLOCK8': '00000:00000:00900:99000:00000',
+    'CLOCK9': '00000:00000:99900:00000:00000',
+    'CLOCK10': '00000:99000:00900:00000:00000',
+    'CLOCK11': '09000:09000:00900:00000:00000',
+}
+
+# The characters `write()` can show, in the same notation as the images; each glyph is as wide as
+# its rows. Lowercase letters are shown as uppercase and unknown characters as '?'.
+FONT = {
+    ' ': '000:000:000:000:000',
+    '0': '0990:9009:9009:9009:0990',
+    '1': '090:990:090:090:999',
+    '2': '9990:0009:0990:9000:9999',
+    '3': '9990:0009:0990:0009:9990',
+    '4': '0090:0990:9090:9999:0090',
+    '5': '9999:9000:9990:0009:9990',
+    '6': '0990:9000:9990:9009:0990',
+    '7': '9999:0009:0090:0900:0900',
+    '8': '0990:9009:0990:9009:0990',
+    '9': '0990:9009:0999:0009:0990',
+    'A': '0990:9009:9999:9009:9009',
+    'B': '9990:9009:9990:9009:9990',
+    'C': '0999:9000:9000:9000:0999',
+    'D': '9990:9009:9009:9009:9990',
+    'E': '9999:9000:9990:9000:9999',
+    'F': '9999:9000:9990:9000:9000',
+    'G': '0999:9000:9099:9009:0999',
+    'H': '9009:9009:9999:9009:9009',
+    'I': '999:090:090:090:999',
+    'J': '0999:0009:0009:9009:0990',
+    'K': '9009:9090:9900:9090:9009',
+    'L': '9000:9000:9000:9000:9999',
+    'M': '90009:99099:90909:90009:90009',
+    'N': '90009:99009:90909:90099:90009',
+    'O': '09990:90009:90009:90009:09990',
+    'P': '9990:9009:9990:9000:9000',
+    'Q': '0990:9009:9009:9090:0909',
+    'R': '9990:9009:9990:9090:9009',
+    'S': '0999:9000:0990:0009:9990',
+    'T': '99999:00900:00900:00900:00900',
+    'U': '9009:9009:9009:9009:0990',
+    'V': '90009:90009:90009:09090:00900',
+    'W': '90009:90009:90909:99099:90009',
+    'X': '9009:9009:0990:9009:9009',
+    'Y': '90009:09090:00900:00900:00900',
+    'Z': '9999:0090:0900:9000:9999',
+    '.': '0:0:0:0:9',
+    ',': '00:00:00:09:90',
+    '!': '9:9:9:0:9',
+    '?': '9990:0009:0990:0000:0900',
+    '-': '000:000:999:000:000',
+    '+': '000:090:999:090:000',
+    '=': '000:999:000:999:000',
+    ':': '0:9:0:9:0',
+    "'": '9:9:0:0:0',
+}
+
+
+@functools.lru_cache(maxsize=256)
+def render_image(image, brightness=100):
+    """
+    Renders a named image into a frame. Frames are cached per image and brightness.
+
+    Args:
+        image (str): The name of the image, one of `IMAGES`.
+        brightness (int, optional): The brightness of the brightest pixels (0 to 100%). Defaults to 100.
+
+    Returns:
+        bytes: The brightness of the 25 pixels, row by row from the top left.
+
+    Raises:
+        ValueError: If `image` is not one of the allowed values.
+    """
+    if image not in IMAGES:
+        raise ValueError('image must be one of {}'.format(tuple(IMAGES)))
+    brightness = max(0, min(100, brightness))
+    return bytes(int(digit) * brightness // 9 for digit in IMAGES[image] if digit != ':')
+
+
+@functools.lru_cache(maxsize=256)
+def _glyph(character, brightness):
+    # The columns of a character, each as five bytes from the top, followed by a blank column.
+    rows = FONT.get(character.upper(), FONT['?']).split(':')
+    brightness = max(0, min(100, brightness))
+    columns = tuple(bytes(int(row[column]) * brightness // 9 for row in rows) for column in range(len(rows[0])))
+    return columns + (bytes(5),)
+
+
+@functools.lru_cache(maxsize=64)
+def render_text(text, brightness=100):
+    """
+    Renders the frames of a text scrolling across the Light Matrix from right to left. Glyphs and
+    whole texts are cached, so writing the same text again costs nothing to render.
+
+    Args:
+        text (str): The text.
+        brightness (int, optional): The brightness of the text (0 to 100%). Defaults to 100.
+
+    Returns:
+        tuple of bytes: The frames, one per column the text moves, starting and ending with a blank
+        matrix.
+    """
+    blank = (bytes(5),) * 5
+    columns = blank + tuple(column for character in str(text) for column in _glyph(character, brightness)) + blank
+    frames = []
+    for start in range(len(columns) - 4):
+        window = columns[start:start + 5]
+        frames.append(bytes(window[x][y] for y in range(5) for x in range(5)))
+    return tuple(frames)
+
+
+class FrameBuffer:
+    """
+    Composes frames for the Light Matrix in memory and sends each frame to the hub in one transfer.
+
+    Drawing only changes `pixels`, a bytearray with the brightness of the 25 pixels row by row.
+    `update()` compares it with the frame the matrix shows: it sends nothing if nothing changed, one
+    `set_pixel()` if a single pixel changed, and otherwise the whole frame with one
+    `LightMatrix.show()`. Named images and text are rendered once and cached.
+
+    Example:
+        from spike.control import wait_for_seconds
+        from spike.framebuffer import FrameBuffer
+
+        frame = FrameBuffer()
+        for step in range(90):
+            frame.clear()
+            frame.set_pixel(step % 5, step // 5 % 5)
+            frame.set_pixel(4 - step % 5, 2, 50)
+            frame.update()
+            wait_for_seconds(1 / 30)
+    """
+
+    def __init__(self, light_matrix=None):
+        """
+        Initializes a blank FrameBuffer.
+
+        Args:
+            light_matrix (LightMatrix, optional): The Light Matrix to draw on. Defaults to the hub's.
+        """
+        self.light_matrix = light_matrix if light_matrix is not None else LightMatrix()
+        self.pixels = bytearray(25)
+        self.transfers = 0
+        self._shown = None
+
+    # Drawing
+
+    def clear(self):
+        """
+        Turns all pixels of the frame off.
+        """
+        self.pixels[:] = bytes(25)
+
+    def fill(self, brightness=100):
+        """
+        Sets all pixels of the frame to one brightness.
+
+        Args:
+            brightness (int, optional): The brightness (0 to 100%). Defaults to 100.
+        """
+        self.pixels[:] = bytes((max(0, min(100, brightness)),)) * 25
+
+    def set_pixel(self, x, y, brightness=100):
+        """
+        Sets the brightness of one pixel of the frame.
+
+        Args:
+            x (int): Pixel position from the left (0 to 4).
+            y (int): Pixel position from the top (0 to 4).
+            brightness (int, optional): Brightness of the pixel (0 to 100%). Defaults to 100.
+
+        Raises:
+            ValueError: If `x` or `y` is not within the allowed range of 0-4.
+        """
+        if not (0 <= x <= 4 and 0 <= y <= 4):
+            raise ValueError('x and y must be within 0-4')
+        self.pixels[y * 5 + x] = max(0, min(100, brightness))
+
+    def get_pixel(self, x, y):
+        """
+        Args:
+            x (int): Pixel position from the left (0 to 4).
+            y (int): Pixel position from the top (0 to 4).
+
+        Returns:
+            int: The brightness of the pixel in the frame (0 to 100%).
+        """
+        if not (0 <= x <= 4 and 0 <= y <= 4):
+            raise ValueError('x and y must be within 0-4')
+        return self.pixels[y * 5 + x]
+
+    def draw(self, frame):
+        """
+        Copies a whole frame, such as one returned by `render_image()` or `render_text()`. Values
+        outside 0 to 100 are clamped.
+
+        Args:
+            frame (bytes or sequence of int): The brightness of the 25 pixels, row by row from the top left.
+
+        Raises:
+            ValueError: If `frame` does not hold 25 values.
+        """
+        if len(frame) != 25:
+            raise ValueError('a frame must hold 25 values')
+        self.pixels[:] = bytes(max(0, min(100, value)) for value in frame)
+
+    def draw_image(self, image, brightness=100):
+        """
+        Draws a named image over the whole frame.
+
+        Args:
+            image (str): Name of the image.
+            brightness (int, optional): Brightness of the image (0 to 100%). Defaults to 100.
+
+        Raises:
+            ValueError: If `image` is not one of the allowed values.
+        """
+        self.pixels[:] = render_image(image, brightness)
+
+    # Actions
+
+    def update(self):
+        """
+        Sends the frame to the Light Matrix if it differs from the frame shown.
+
+        Returns:
+            int: The number of transfers, 0 or 1.
+        """
+        pixels = self.pixels
+        shown = self._shown
+        if shown is not None:
+            changed = -1
+            for index in range(25):
+                if pixels[index] != shown[index]:
+                    if changed >= 0:
+                        break
+                    changed = index
+            else:
+                if changed < 0:
+                    return 0
+                shown[changed] = pixels[changed]
+                self.light_matrix.set_pixel(changed % 5, changed // 5, pixels[changed])
+                self.transfers += 1
+                return 1
+        self._shown = bytearray(pixels)
+        self.light_matrix.show(self._shown)
+        self.transfers += 1
+        return 1
+
+    def invalidate(self):
+        """
+        Forgets what the Light Matrix shows, so the next `update()` sends the whole frame. Call it
+        after drawing on the matrix in other ways.
+        """
+        self._shown = None
+
+    def show_image(self, image, brightness=100):
+        """
+        Shows a named image, sending only what changed.
+
+        Args:
+            image (str): Name of the image.
+            brightness (int, optional): Brightness of the image (0 to 100%). Defaults to 100.
+        """
+        self.draw_image(image, brightness)
+        self.update()
+
+    def write(self, text, brightness=100, delay=0.1):
+        """
+        Scrolls text across the Light Matrix from right to left, one transfer per step.
+
+        Args:
+            text (str): Text to write.
+            brightness (int, optional): Brightness of the text (0 to 100%). Defaults to 100.
+            delay (float, optional): The time between steps in seconds. Defaults to 0.1.
+        """
+        for frame in render_text(text, brightness):
+            self.pixels[:] = frame
+            self.update()
+            wait_for_seconds(delay)
@@ -0,0 +1,223 @@
+import threading
+import time
+
+try:
+    import contextvars
+except ImportError:
+    contextvars = None
+
+from ._backend import get_backend, get_time
+from .control import wait_for_seconds
+
+# How often the heading service samples the yaw angle, in samples per second.
+DEFAULT_RATE = 100
+
+# How much the heading follows the gyro, against the wheels, on each sample.
+DEFAULT_GYRO_WEIGHT = 0.995
+
+# How quickly the drift estimate follows the yaw angle while the wheels stand still, per sample.
+DRIFT_GAIN = 0.002
+
+
+class HeadingService:
+    """
+    Keeps a continuous, drift-compensated heading of the hub.
+
+    Each `sample()` reads the yaw angle, unwraps it so the heading keeps counting past ±180 degrees,
+    and subtracts the estimated drift of the gyro. With an odometry, the heading is also pulled
+    gently towards the turn measured by the wheels, a complementary filter that trusts the gyro for
+    quick turns and the wheels over the long run. Whenever the wheels stand still, any change of the
+    yaw angle is drift, and the drift estimate is updated from it; `calibrate()` measures it outright.
+
+    The heading is in degrees and grows clockwise, like the yaw angle. Reading `heading` and
+    `turn_rate` costs nothing, so turn controllers can read them as often as they like while
+    `start()` keeps them up to date at a fixed rate in the background.
+
+    Example:
+        from spike import MotorPair, PrimeHub
+        from spike.control import wait_until
+        from spike.heading import HeadingService
+        from spike.odometry import Odometry
+
+        hub = PrimeHub()
+        motor_pair = MotorPair('B', 'C')
+        with HeadingService(hub.motion_sensor, Odometry(motor_pair)) as heading:
+            motor_pair.start_tank(30, -30)
+            wait_until(lambda: heading.heading >= 720)
+            motor_pair.stop()
+    """
+
+    def __init__(self, motion_sensor, odometry=None, rate=DEFAULT_RATE, gyro_weight=DEFAULT_GYRO_WEIGHT,
+                 drift_rate=0.0):
+        """
+        Initializes the HeadingService with a heading of 0.
+
+        Args:
+            motion_sensor (MotionSensor): The hub's motion sensor.
+            odometry (Odometry, optional): An odometry made without a motion sensor, whose wheel
+                heading hints the turn. The service updates it on every sample. Defaults to the gyro alone.
+            rate (float, optional): The number of samples per second of `start()`. Defaults to 100.
+            gyro_weight (float, optional): The weight of the gyro against the wheels (0 to 1). Defaults to 0.995.
+            drift_rate (float, optional): The known drift of the yaw angle, in degrees per second.
+                Defaults to 0.
+
+        Raises:
+            ValueError: If `rate` is not positive or `gyro_weight` is not between 0 and 1.
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        if not 0 <= gyro_weight <= 1:
+            raise ValueError('gyro_weight must be between 0 and 1')
+        self.motion_sensor = motion_sensor
+        self.odometry = odometry
+        self.period = 1 / rate
+        self.gyro_weight = gyro_weight
+        self.drift_rate = drift_rate
+        self.samples = 0
+        self._running = False
+        self._generation = 0
+        self._thread = None
+        self._stopped = threading.Event()
+        self.reset()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    # Measurements
+
+    def reset(self, heading=0.0):
+        """
+        Sets the heading and measures the following turns from the current readings.
+
+        Args:
+            heading (float, optional): The heading in degrees, clockwise. Defaults to 0.
+        """
+        self.heading = heading
+        self.turn_rate = 0.0
+        self._wheels = heading
+        self._yaw = self.motion_sensor.get_yaw_angle()
+        self._time = get_time()
+        if self.odometry is not None:
+            self.odometry.update()
+            self._pose = (self.odometry.x, self.odometry.y, self.odometry.heading)
+
+    def sample(self):
+        """
+        Reads the yaw angle and, with an odometry, the wheels, and updates the heading.
+
+        Returns:
+            float: The heading in degrees, clockwise.
+        """
+        now = get_time()
+        elapsed = now - self._time
+        self._time = now
+        yaw = self.motion_sensor.get_yaw_angle()
+        turned = (yaw - self._yaw + 180) % 360 - 180
+        self._yaw = yaw
+        heading = self.heading + turned - self.drift_rate * elapsed
+        odometry = self.odometry
+        if odometry is not None:
+            previous = self._pose[2]
+            odometry.update()
+            pose = (odometry.x, odometry.y, odometry.heading)
+            if pose == self._pose:
+                if elapsed > 0:
+                    self.drift_rate += DRIFT_GAIN * (turned / elapsed - self.drift_rate)
+            else:
+                self._pose = pose
+            # The odometry's heading grows counterclockwise.
+            self._wheels -= pose[2] - previous
+            heading = self._wheels + self.gyro_weight * (heading - self._wheels)
+        if elapsed > 0:
+            self.turn_rate = (heading - self.heading) / elapsed
+        self.heading = heading
+        self.samples += 1
+        return heading
+
+    def calibrate(self, duration=1.0):
+        """
+        Measures the drift of the yaw angle while the hub stands still, and resets the heading's
+        reference to the current readings.
+
+        Args:
+            duration (float, optional): How long to measure, in seconds. Defaults to 1.
+
+        Returns:
+            float: The drift in degrees per second.
+        """
+        begin = get_time()
+        previous = self.motion_sensor.get_yaw_angle()
+        total = 0
+        while get_time() - begin < duration:
+            wait_for_seconds(self.period)
+            yaw = self.motion_sensor.get_yaw_angle()
+            total += (yaw - previous + 180) % 360 - 180
+            previous = yaw
+        elapsed = get_time() - begin
+        if elapsed > 0:
+            self.drift_rate = total / elapsed
+        self.reset(self.heading)
+        return self.drift_rate
+
+    # Sampling
+
+    def start(self):
+        """
+        Starts sampling at the fixed rate in the background.
+
+        Inside a simulation, the samples are scheduled on the simulated clock, so they happen at
+        exact multiples of the period however the program waits. They are background events, so a
+        wait that nothing else can end still fails instead of sampling until the time limit.
+        Otherwise a daemon thread samples, running in a copy of the caller's context so that it
+        talks to the same backend.
+
+        Returns:
+            HeadingService: The service itself.
+        """
+        if self._running:
+            return self
+        self._running = True
+        self._generation += 1
+        self.reset(self.heading)
+        schedule = getattr(get_backend(), 'after', None)
+        if schedule is not None:
+            schedule(self.period, self._scheduled, schedule, self._generation, background=True)
+            return self
+        self._stopped.clear()
+        # Without contextvars, all threads share the most recently activated backend anyway.
+        target, args = (self._loop, ()) if contextvars is None else (contextvars.copy_context().run, (self._loop,))
+        self._thread = threading.Thread(target=target, args=args, name='spike-heading', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops sampling in the background.
+        """
+        self._running = False
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _scheduled(self, schedule, generation):
+        # Samples left over from before a stop() and a new start() end their chain here.
+        if self._running and generation == self._generation:
+            self.sample()
+            schedule(self.period, self._scheduled, schedule, generation, background=True)
+
+    def _loop(self):
+        period = self.period
+        deadline = time.monotonic()
+        while not self._stopped.is_set():
+            self.sample()
+            deadline += period
+            remaining = deadline - time.monotonic()
+            if remaining < 0:
+                # Too late for the missed samples; keep the rate from now on.
+                deadline -= remaining
+            elif self._stopped.wait(remaining):
+                break
@@ -0,0 +1,155 @@
+import math
+from collections import namedtuple
+
+from ._backend import get_time
+from .control import wait_for_seconds
+
+# How often the line follower runs its loop, in iterations per second.
+DEFAULT_RATE = 100
+
+LoopStats = namedtuple('LoopStats', ['iterations', 'duration', 'frequency', 'mean_period', 'jitter', 'max_jitter'])
+LoopStats.__doc__ = """
+How regularly a control loop ran.
+
+Attributes:
+    iterations (int): The number of iterations.
+    duration (float): The time from the first iteration to the end of the last one, in seconds.
+    frequency (float): The achieved number of iterations per second, from the mean period.
+    mean_period (float): The mean time between the starts of two iterations, in seconds.
+    jitter (float): The standard deviation of the time between iterations, in seconds.
+    max_jitter (float): The largest difference between the time between two iterations and the
+        intended period, in seconds.
+"""
+
+
+class LineFollower:
+    """
+    Follows the edge of a line with a driving base and a Color Sensor, using a PID controller.
+
+    The controller keeps the reflected light at `target`, the value halfway between the line and
+    the floor. Everything that depends only on the reading or on the rounded correction is worked out
+    when the follower is made: a table maps each reflected light value (0 to 100%) to its error and
+    proportional term, and a second table maps each correction to the pair of motor powers. An
+    iteration therefore reads the sensor, adds up three terms, and sends one `start_tank_at_power()`,
+    without building any lists or tuples.
+
+    The loop runs at a fixed rate: each iteration starts at its own multiple of the period after the
+    first, so a late iteration does not push the following ones back.
+
+    Example:
+        from spike import ColorSensor, MotorPair
+        from spike.linefollow import LineFollower
+
+        follower = LineFollower(MotorPair('B', 'C'), ColorSensor('E'), kp=0.8, kd=4, power=40)
+        stats = follower.run(duration=10)
+        print(stats.frequency, stats.jitter)
+    """
+
+    def __init__(self, motor_pair, color_sensor, target=50, kp=1.0, ki=0.0, kd=0.0, power=40, edge='left',
+                 rate=DEFAULT_RATE):
+        """
+        Initializes the LineFollower.
+
+        Args:
+            motor_pair (MotorPair): The driving base.
+            color_sensor (ColorSensor): The sensor that looks at the line.
+            target (int, optional): The reflected light to keep (0 to 100%). Defaults to 50.
+            kp (float, optional): The proportional gain, in % power per % of reflected light. Defaults to 1.
+            ki (float, optional): The integral gain, per second. Defaults to 0.
+            kd (float, optional): The derivative gain, in seconds. Defaults to 0.
+            power (int, optional): The power of both motors on the target (-100 to 100%). Defaults to 40.
+            edge (str, optional): 'left' or 'right', the edge of the line to follow. Defaults to 'left'.
+            rate (float, optional): The number of iterations per second. Defaults to 100.
+
+        Raises:
+            ValueError: If `target`, `edge` or `rate` is not one of the allowed values.
+        """
+        if not 0 <= target <= 100:
+            raise ValueError('target must be within 0-100')
+        if edge not in ('left', 'right'):
+            raise ValueError("edge must be 'left' or 'right'")
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.motor_pair = motor_pair
+        self.color_sensor = color_sensor
+        self.period = 1 / rate
+        # On the left edge, too much light means the robot drifted off the line to the left.
+        sign = 1 if edge == 'left' else -1
+        self._errors = tuple(float(sign * (value - target)) for value in range(101))
+        self._proportional = tuple(kp * error for error in self._errors)
+        self._integral_gain = ki * self.period
+        self._derivative_gain = kd / self.period
+        # The powers for every rounded correction from -200 to 200; beyond that both motors saturate.
+        self._powers = tuple((max(-100, min(100, power + correction)), max(-100, min(100, power - correction)))
+                             for correction in range(-200, 201))
+        self.reset()
+
+    def reset(self):
+        """
+        Clears the integral and derivative state of the controller.
+        """
+        self._integral = 0.0
+        self._previous = None
+
+    def step(self):
+        """
+        Runs one iteration: reads the reflected light and sets the motor powers.
+
+        Returns:
+            float: The correction applied, in % power.
+        """
+        # The tables cover the readings 0 to 100; replayed or filtered readings may be floats or out of range.
+        reading = int(round(self.color_sensor.get_reflected_light()))
+        reading = 0 if reading < 0 else 100 if reading > 100 else reading
+        error = self._errors[reading]
+        self._integral += self._integral_gain * error
+        previous = self._previous
+        correction = self._proportional[reading] + self._integral
+        if previous is not None:
+            correction += self._derivative_gain * (error - previous)
+        self._previous = error
+        index = int(round(correction)) + 200
+        left, right = self._powers[0 if index < 0 else 400 if index > 400 else index]
+        self.motor_pair.start_tank_at_power(left, right)
+        return correction
+
+    def run(self, duration=None, until=None):
+        """
+        Follows the line at the fixed rate, then stops the motors.
+
+        Args:
+            duration (float, optional): How long to follow the line, in seconds. Defaults to no limit.
+            until (callable, optional): A function checked after every iteration; the loop ends when
+                it returns True. Defaults to never.
+
+        Returns:
+            LoopStats: The achieved loop frequency and jitter.
+        """
+        period = self.period
+        iterations = 0
+        total = squares = worst = 0.0
+        begin = previous = get_time()
+        end = math.inf if duration is None else begin + duration
+        try:
+            while True:
+                now = get_time()
+                if iterations:
+                    interval = now - previous
+                    total += interval
+                    squares += interval * interval
+                    worst = max(worst, abs(interval - period))
+                previous = now
+                self.step()
+                iterations += 1
+                if (until is not None and until()) or now + period >= end:
+                    break
+                remaining = begin + iterations * period - get_time()
+                if remaining > 0:
+                    wait_for_seconds(remaining)
+        finally:
+            self.motor_pair.stop()
+        elapsed = get_time() - begin
+        intervals = iterations - 1
+        mean = total / intervals if intervals else 0.0
+        jitter = math.sqrt(max(squares / intervals - mean * mean, 0.0)) if intervals else 0.0
+        return LoopStats(iterations, elapsed, 1 / mean if mean else 0.0, mean, jitter, worst)
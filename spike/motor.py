@@ -1,3 +1,6 @@
+from ._backend import get_backend
+
+
 class Motor:
     """
     Represents a single motor connected to the SPIKE Prime Hub.
@@ -16,6 +19,8 @@ class Motor:
         motor.run_for_seconds(2, 50)
     """
 
+    __slots__ = ('port',)
+
     def __init__(self, port):
         """
         Initialize the Motor.
@@ -49,7 +54,9 @@ class Motor:
         Example:
             motor.run_to_position(0)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).run_to_position(degrees, direction, speed)
 
     def run_to_degrees_counted(self, degrees, speed=None):
         """
@@ -70,7 +77,9 @@ class Motor:
         Example:
             motor.run_to_degrees_counted(360)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).run_to_degrees_counted(degrees, speed)
 
     def run_for_degrees(self, degrees, speed=None):
         """
@@ -87,7 +96,9 @@ class Motor:
         Example:
             motor.run_for_degrees(90)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).run_for_degrees(degrees, speed)
 
     def run_for_rotations(self, rotations, speed=None):
         """
@@ -104,7 +115,9 @@ class Motor:
         Example:
             motor.run_for_rotations(1)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).run_for_rotations(rotations, speed)
 
     def run_for_seconds(self, seconds, speed=None):
         """
@@ -121,7 +134,9 @@ class Motor:
         Example:
             motor.run_for_seconds(2, 50)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).run_for_seconds(seconds, speed)
 
     def start(self, speed=None):
         """
@@ -140,7 +155,9 @@ class Motor:
         Example:
             motor.start(50)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).start(speed)
 
     def stop(self):
         """
@@ -155,7 +172,9 @@ class Motor:
         Example:
             motor.stop()
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).stop()
 
     def start_at_power(self, power):
         """
@@ -174,7 +193,9 @@ class Motor:
         Example:
             motor.start_at_power(75)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).start_at_power(power)
 
     # Measurements
 
@@ -192,6 +213,9 @@ class Motor:
             current_speed = motor.get_speed()
             print(f"Current speed: {current_speed}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motor(self.port).get_speed()
         return 0
 
     def get_position(self):
@@ -210,6 +234,9 @@ class Motor:
             position = motor.get_position()
             print(f"Motor position: {position} degrees")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motor(self.port).get_position()
         return 0
 
     def get_degrees_counted(self):
@@ -226,6 +253,9 @@ class Motor:
             degrees_counted = motor.get_degrees_counted()
             print(f"Degrees counted: {degrees_counted}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motor(self.port).get_degrees_counted()
         return 0
 
     def get_default_speed(self):
@@ -239,6 +269,9 @@ class Motor:
             default_speed = motor.get_default_speed()
             print(f"Default speed: {default_speed}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motor(self.port).get_default_speed()
         return 100
 
     # Events
@@ -258,6 +291,9 @@ class Motor:
             if motor.was_interrupted():
                 print("Motor was interrupted!")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motor(self.port).was_interrupted()
         return False
 
     def was_stalled(self):
@@ -275,6 +311,9 @@ class Motor:
             if motor.was_stalled():
                 print("Motor was stalled!")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motor(self.port).was_stalled()
         return False
 
     # Settings
@@ -293,7 +332,9 @@ class Motor:
         Example:
             motor.set_degrees_counted(0)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).set_degrees_counted(degrees_counted)
 
     def set_default_speed(self, default_speed):
         """
@@ -313,7 +354,9 @@ class Motor:
         Example:
             motor.set_default_speed(50)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).set_default_speed(default_speed)
 
     def set_stop_action(self, action):
         """
@@ -331,7 +374,9 @@ class Motor:
         Example:
             motor.set_stop_action('hold')
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).set_stop_action(action)
 
     def set_stall_detection(self, stop_when_stalled):
         """
@@ -355,4 +400,73 @@ class Motor:
         Example:
             motor.set_stall_detection(False)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor(self.port).set_stall_detection(stop_when_stalled)
+
+    # Awaitables
+
+    async def run_to_position_async(self, degrees, direction='shortest path', speed=None):
+        """
+        Runs the motor to an absolute position.
+
+        Awaitable counterpart of `run_to_position()`.
+
+        Example:
+            await motor.run_to_position_async(0)
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.motor(self.port).run_to_position_async(degrees, direction, speed)
+
+    async def run_to_degrees_counted_async(self, degrees, speed=None):
+        """
+        Runs the motor until degrees counted is equal to `degrees`.
+
+        Awaitable counterpart of `run_to_degrees_counted()`.
+
+        Example:
+            await motor.run_to_degrees_counted_async(360)
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.motor(self.port).run_to_degrees_counted_async(degrees, speed)
+
+    async def run_for_degrees_async(self, degrees, speed=None):
+        """
+        Runs the motor for a given number of degrees.
+
+        Awaitable counterpart of `run_for_degrees()`.
+
+        Example:
+            await motor.run_for_degrees_async(90)
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.motor(self.port).run_for_degrees_async(degrees, speed)
+
+    async def run_for_rotations_async(self, rotations, speed=None):
+        """
+        Runs the motor for a specified number of rotations.
+
+        Awaitable counterpart of `run_for_rotations()`.
+
+        Example:
+            await motor.run_for_rotations_async(1)
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.motor(self.port).run_for_rotations_async(rotations, speed)
+
+    async def run_for_seconds_async(self, seconds, speed=None):
+        """
+        Runs the motor for a specified number of seconds.
+
+        Awaitable counterpart of `run_for_seconds()`.
+
+        Example:
+            await motor.run_for_seconds_async(2, 50)
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.motor(self.port).run_for_seconds_async(seconds, speed)
@@ -0,0 +1,182 @@
+from collections import namedtuple
+
+from ._backend import get_backend, get_time
+from .batch import CommandBatch
+from .control import wait_for_seconds
+from .profile import DEFAULT_ACCELERATION, DEFAULT_PERIOD, POSITION_GAIN, plan
+from .simulation import MAX_SPEED
+
+# How long a coordinated move waits for late motors after the profile ends, in seconds.
+SETTLE_TIME = 0.5
+
+MoveReport = namedtuple('MoveReport', ['duration', 'arrival_times', 'skew'])
+MoveReport.__doc__ = """
+The outcome of a coordinated move.
+
+Attributes:
+    duration (float): The planned duration of the move in seconds.
+    arrival_times (tuple): For each motor, the time in seconds after the start at which it was first
+        within the tolerance of its target, or None if it did not get there.
+    skew (float or None): The time between the first and the last arrival, or None if a motor did
+        not arrive.
+"""
+
+
+class MotorGroup:
+    """
+    Moves any number of motors together, so that they start together and arrive at their targets
+    at the same moment.
+
+    The motor with the longest way to go follows a planned motion profile, and the others follow the
+    same profile scaled to their distance. The speed commands of all motors for each step are sent
+    as one batch, so the motors start and change speed together.
+
+    Example:
+        from spike import Motor
+        from spike.motorgroup import MotorGroup
+
+        arm = MotorGroup([Motor('A'), Motor('C'), Motor('D')])
+        report = arm.run_for_degrees([90, -180, 360], speed=60)
+        print(report.skew)
+    """
+
+    __slots__ = ('motors',)
+
+    def __init__(self, motors):
+        """
+        Initializes the MotorGroup.
+
+        Args:
+            motors (list of Motor): The motors of the group.
+
+        Raises:
+            ValueError: If the group is empty or two motors share a port.
+        """
+        self.motors = tuple(motors)
+        if not self.motors:
+            raise ValueError('a motor group needs at least one motor')
+        ports = [motor.port for motor in self.motors]
+        if len(set(ports)) != len(ports):
+            raise ValueError('the motors of a group must be on different ports')
+
+    # Actions
+
+    def run_for_degrees(self, degrees, speed=None, acceleration=DEFAULT_ACCELERATION, jerk=None,
+                        period=DEFAULT_PERIOD, tolerance=1):
+        """
+        Rotates each motor by its own number of degrees, all finishing at the same time.
+
+        Args:
+            degrees (list of int): The degrees for each motor; negative values turn a motor backward.
+            speed (int, optional): The highest speed of the motor with the longest way (0 to 100%).
+                Defaults to the lowest default speed of the motors.
+            acceleration (float, optional): The highest acceleration in degrees per second squared.
+                Defaults to 2000.
+            jerk (float, optional): The highest jerk in degrees per second cubed. Defaults to no limit.
+            period (float, optional): The time between speed updates in seconds. Defaults to 0.01.
+            tolerance (int, optional): How close to its target, in degrees, a motor counts as arrived.
+                Defaults to 1.
+
+        Returns:
+            MoveReport: The arrival times and the skew between the motors.
+
+        Raises:
+            ValueError: If the number of values does not match the number of motors.
+        """
+        if len(degrees) != len(self.motors):
+            raise ValueError('expected {} values, got {}'.format(len(self.motors), len(degrees)))
+        targets = [motor.get_degrees_counted() + value for motor, value in zip(self.motors, degrees)]
+        return self.run_to_degrees_counted(targets, speed, acceleration, jerk, period, tolerance)
+
+    def run_to_degrees_counted(self, targets, speed=None, acceleration=DEFAULT_ACCELERATION, jerk=None,
+                               period=DEFAULT_PERIOD, tolerance=1):
+        """
+        Runs each motor to its own degrees counted value, all arriving at the same time.
+
+        Args:
+            targets (list of int): The target degrees counted of each motor.
+            speed (int, optional): The highest speed of the motor with the longest way (0 to 100%).
+                Defaults to the lowest default speed of the motors.
+            acceleration (float, optional): The highest acceleration in degrees per second squared.
+                Defaults to 2000.
+            jerk (float, optional): The highest jerk in degrees per second cubed. Defaults to no limit.
+            period (float, optional): The time between speed updates in seconds. Defaults to 0.01.
+            tolerance (int, optional): How close to its target, in degrees, a motor counts as arrived.
+                Defaults to 1.
+
+        Returns:
+            MoveReport: The arrival times and the skew between the motors.
+
+        Raises:
+            ValueError: If the number of values does not match the number of motors.
+        """
+        motors = self.motors
+        if len(targets) != len(motors):
+            raise ValueError('expected {} values, got {}'.format(len(motors), len(targets)))
+        if get_backend() is None:
+            return MoveReport(0.0, (0.0,) * len(motors), 0.0)
+        if speed is None:
+            speed = min(motor.get_default_speed() for motor in motors)
+        starts = [motor.get_degrees_counted() for motor in motors]
+        distances = [target - start for target, start in zip(targets, starts)]
+        longest = max(abs(distance) for distance in distances)
+        profile = plan(longest, max(abs(speed), 1) * MAX_SPEED / 100, acceleration, jerk)
+        positions = profile.positions(period)
+        shares = [distance / longest if longest else 0.0 for distance in distances]
+        arrivals = [None] * len(motors)
+        scale = 100 / MAX_SPEED
+        begin = get_time()
+
+        def arrive():
+            # All readings are taken before any command is queued, so the commands go out together.
+            now = get_time() - begin
+            counted = [motor.get_degrees_counted() for motor in motors]
+            for index, value in enumerate(counted):
+                if arrivals[index] is None and abs(targets[index] - value) <= tolerance:
+                    arrivals[index] = now
+            return counted
+
+        with CommandBatch():
+            for step in range(len(positions) - 1):
+                counted = arrive()
+                for motor, value, start, share in zip(motors, counted, starts, shares):
+                    error = start + share * positions[step] - value
+                    velocity = share * (positions[step + 1] - positions[step]) / period + POSITION_GAIN * error
+                    motor.start(int(round(max(-100.0, min(100.0, velocity * scale)))))
+                wait_for_seconds(period)
+            for motor in motors:
+                motor.stop()
+        arrive()
+        while None in arrivals and get_time() - begin < profile.duration + SETTLE_TIME:
+            wait_for_seconds(period)
+            arrive()
+        skew = None if None in arrivals else max(arrivals) - min(arrivals)
+        return MoveReport(profile.duration, tuple(arrivals), skew)
+
+    def start(self, speeds):
+        """
+        Starts all motors at once, each at its own speed.
+
+        Args:
+            speeds (list of int): The speed of each motor (-100 to 100%).
+
+        Raises:
+            ValueError: If the number of values does not match the number of motors.
+        """
+        if len(speeds) != len(self.motors):
+            raise ValueError('expected {} values, got {}'.format(len(self.motors), len(speeds)))
+        if get_backend() is None:
+            return
+        with CommandBatch():
+            for motor, speed in zip(self.motors, speeds):
+                motor.start(speed)
+
+    def stop(self):
+        """
+        Stops all motors at once.
+        """
+        if get_backend() is None:
+            return
+        with CommandBatch():
+            for motor in self.motors:
+                motor.stop()
@@ -1,3 +1,6 @@
+from ._backend import get_backend
+
+
 class MotorPair:
     """
     Represents a pair of motors connected to the SPIKE Prime Hub, allowing you to control two motors simultaneously.
@@ -14,6 +17,8 @@ class MotorPair:
         motor_pair.move(10, 'cm')
     """
 
+    __slots__ = ('port_left', 'port_right')
+
     def __init__(self, port_left, port_right):
         """
         Initializes the MotorPair with the specified ports for the left and right motors.
@@ -54,7 +59,9 @@ class MotorPair:
         Example:
             motor_pair.move(20, 'cm', steering=50, speed=60)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor_pair(self.port_left, self.port_right).move(amount, unit, steering, speed)
 
     def start(self, steering=0, speed=None):
         """
@@ -75,7 +82,9 @@ class MotorPair:
         Example:
             motor_pair.start(steering=-50, speed=75)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor_pair(self.port_left, self.port_right).start(steering, speed)
 
     def stop(self):
         """
@@ -89,7 +98,9 @@ class MotorPair:
         Example:
             motor_pair.stop()
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor_pair(self.port_left, self.port_right).stop()
 
     def move_tank(self, amount, unit='cm', left_speed=None, right_speed=None):
         """
@@ -112,7 +123,9 @@ class MotorPair:
         Example:
             motor_pair.move_tank(10, 'cm', left_speed=25, right_speed=75)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor_pair(self.port_left, self.port_right).move_tank(amount, unit, left_speed, right_speed)
 
     def start_tank(self, left_speed, right_speed):
         """
@@ -129,7 +142,9 @@ class MotorPair:
         Example:
             motor_pair.start_tank(50, -50)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor_pair(self.port_left, self.port_right).start_tank(left_speed, right_speed)
 
     def start_at_power(self, power, steering=0):
         """
@@ -148,7 +163,9 @@ class MotorPair:
         Example:
             motor_pair.start_at_power(50, steering=25)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor_pair(self.port_left, self.port_right).start_at_power(power, steering)
 
     def start_tank_at_power(self, left_power, right_power):
         """
@@ -165,7 +182,9 @@ class MotorPair:
         Example:
             motor_pair.start_tank_at_power(50, -50)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor_pair(self.port_left, self.port_right).start_tank_at_power(left_power, right_power)
 
     # Measurements
 
@@ -180,6 +199,9 @@ class MotorPair:
             default_speed = motor_pair.get_default_speed()
             print(f"Default speed: {default_speed}%")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motor_pair(self.port_left, self.port_right).get_default_speed()
         return 100
 
     # Settings
@@ -202,7 +224,9 @@ class MotorPair:
         Example:
             motor_pair.set_motor_rotation(17.6 * math.pi, 'cm')
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor_pair(self.port_left, self.port_right).set_motor_rotation(amount, unit)
 
     def set_default_speed(self, speed):
         """
@@ -219,7 +243,9 @@ class MotorPair:
         Example:
             motor_pair.set_default_speed(50)
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor_pair(self.port_left, self.port_right).set_default_speed(speed)
 
     def set_stop_action(self, action):
         """
@@ -236,4 +262,34 @@ class MotorPair:
         Example:
             motor_pair.set_stop_action('hold')
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motor_pair(self.port_left, self.port_right).set_stop_action(action)
+
+    # Awaitables
+
+    async def move_async(self, amount, unit='cm', steering=0, speed=None):
+        """
+        Moves the driving base and waits until the specified amount is reached.
+
+        Awaitable counterpart of `move()`.
+
+        Example:
+            await motor_pair.move_async(20, 'cm', steering=50, speed=60)
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.motor_pair(self.port_left, self.port_right).move_async(amount, unit, steering, speed)
+
+    async def move_tank_async(self, amount, unit='cm', left_speed=None, right_speed=None):
+        """
+        Moves the driving base using differential (tank) steering.
+
+        Awaitable counterpart of `move_tank()`.
+
+        Example:
+            await motor_pair.move_tank_async(10, 'cm', left_speed=25, right_speed=75)
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.motor_pair(self.port_left, self.port_right).move_tank_async(amount, unit, left_speed, right_speed)
@@ -0,0 +1,131 @@
+import math
+
+from .motor import Motor
+from .simulation import DEFAULT_AXLE_TRACK, DEFAULT_MOTOR_ROTATION
+
+# How much the Motion Sensor's yaw angle counts in the heading, against the wheels, when it is used.
+DEFAULT_YAW_WEIGHT = 0.98
+
+
+class Odometry:
+    """
+    Keeps a running estimate of where a driving base is, from its wheels and the Motion Sensor.
+
+    Each `update()` reads the degrees counted of both motors and, if a motion sensor is given, the
+    yaw angle, and adds the movement since the previous update to the pose. The turn is a blend of
+    the turn measured by the wheels and the turn measured by the yaw angle, weighted by
+    `yaw_weight`. An update takes constant time and does not allocate, so it can run on every tick
+    of a control loop.
+
+    The pose is `x` and `y` in the unit of the motor rotation (cm by default) from where the base
+    was when the odometry was created or reset, with x pointing forward at that time, and `heading`
+    in degrees, counterclockwise.
+
+    Example:
+        from spike import MotorPair, PrimeHub
+        from spike.odometry import Odometry
+
+        hub = PrimeHub()
+        motor_pair = MotorPair('B', 'C')
+        odometry = Odometry(motor_pair, hub.motion_sensor, axle_track=11.2)
+        motor_pair.start_tank(30, 50)
+        for _ in range(1000):
+            odometry.update()
+        print(odometry.x, odometry.y, odometry.heading)
+    """
+
+    __slots__ = ('motor_pair', 'motion_sensor', 'axle_track', 'yaw_weight', 'x', 'y', 'heading', '_left',
+                 '_right', '_scale', '_left_counted', '_right_counted', '_yaw', '_theta')
+
+    def __init__(self, motor_pair, motion_sensor=None, axle_track=DEFAULT_AXLE_TRACK,
+                 motor_rotation=DEFAULT_MOTOR_ROTATION, yaw_weight=DEFAULT_YAW_WEIGHT):
+        """
+        Initializes the Odometry at the origin.
+
+        Args:
+            motor_pair (MotorPair): The driving base.
+            motion_sensor (MotionSensor, optional): The hub's motion sensor. Defaults to using the
+                wheels alone.
+            axle_track (float, optional): The distance between the wheels. Defaults to 11.2 cm.
+            motor_rotation (float, optional): The distance the base moves when both motors turn one
+                rotation, as set with `MotorPair.set_motor_rotation()`. Defaults to 17.6 cm.
+            yaw_weight (float, optional): The weight of the yaw angle in the heading (0 to 1).
+                Defaults to 0.98.
+
+        Raises:
+            ValueError: If `axle_track` is not positive or `yaw_weight` is not between 0 and 1.
+        """
+        if axle_track <= 0:
+            raise ValueError('axle_track must be positive')
+        if not 0 <= yaw_weight <= 1:
+            raise ValueError('yaw_weight must be between 0 and 1')
+        self.motor_pair = motor_pair
+        self.motion_sensor = motion_sensor
+        self.axle_track = axle_track
+        self.yaw_weight = yaw_weight if motion_sensor is not None else 0.0
+        self._left = Motor(motor_pair.port_left)
+        self._right = Motor(motor_pair.port_right)
+        self._scale = motor_rotation / 360
+        self.reset()
+
+    def set_motor_rotation(self, amount, unit='cm'):
+        """
+        Sets the wheel calibration of both the odometry and the motor pair.
+
+        Args:
+            amount (float): The distance the driving base moves when both motors move one rotation each.
+            unit (str, optional): 'cm' or 'in'. Defaults to 'cm'. The pose keeps the unit it was
+                created with.
+
+        Raises:
+            ValueError: If `unit` is not one of the allowed values.
+        """
+        if unit not in ('cm', 'in'):
+            raise ValueError("unit must be 'cm' or 'in'")
+        self.motor_pair.set_motor_rotation(amount, unit)
+        self._scale = (amount * 2.54 if unit == 'in' else amount) / 360
+
+    def reset(self, x=0.0, y=0.0, heading=0.0):
+        """
+        Sets the pose and measures the following movement from the current readings.
+
+        Args:
+            x (float, optional): The x coordinate. Defaults to 0.
+            y (float, optional): The y coordinate. Defaults to 0.
+            heading (float, optional): The heading in degrees, counterclockwise. Defaults to 0.
+        """
+        self.x = x
+        self.y = y
+        self.heading = heading
+        self._theta = math.radians(heading)
+        self._left_counted = self._left.get_degrees_counted()
+        self._right_counted = self._right.get_degrees_counted()
+        self._yaw = self.motion_sensor.get_yaw_angle() if self.motion_sensor is not None else 0
+
+    def update(self):
+        """
+        Adds the movement since the previous update to the pose.
+        """
+        left_counted = self._left.get_degrees_counted()
+        right_counted = self._right.get_degrees_counted()
+        # The left motor is mirrored, so driving forward decreases its degrees counted.
+        left = (self._left_counted - left_counted) * self._scale
+        right = (right_counted - self._right_counted) * self._scale
+        self._left_counted = left_counted
+        self._right_counted = right_counted
+        turn = (right - left) / self.axle_track
+        weight = self.yaw_weight
+        if weight:
+            yaw = self.motion_sensor.get_yaw_angle()
+            # The yaw angle grows clockwise and wraps around at 180 degrees.
+            turned = -((yaw - self._yaw + 180) % 360 - 180)
+            self._yaw = yaw
+            turn += weight * (math.radians(turned) - turn)
+        theta = self._theta
+        distance = (left + right) / 2
+        direction = theta + turn / 2
+        self.x += distance * math.cos(direction)
+        self.y += distance * math.sin(direction)
+        theta += turn
+        self._theta = theta
+        self.heading = math.degrees(theta)
@@ -0,0 +1,229 @@
+import bisect
+import math
+
+from .control import wait_for_seconds
+
+
+class Path:
+    """
+    A polyline of waypoints with a grid index over its segments.
+
+    The index maps each square cell of the floor to the segments that pass through it, so the part
+    of the path near a position is found without looking at the rest of the path.
+
+    Example:
+        from spike.pathfollow import Path
+
+        path = Path([(0, 0), (50, 0), (50, 50)])
+        print(path.length)
+    """
+
+    def __init__(self, points, cell_size=10.0):
+        """
+        Initializes the Path.
+
+        Args:
+            points (list of tuple): The waypoints as `(x, y)` pairs, in the unit of the odometry.
+            cell_size (float, optional): The size of the cells of the index. Defaults to 10.
+
+        Raises:
+            ValueError: If there are fewer than two points or `cell_size` is not positive.
+        """
+        if len(points) < 2:
+            raise ValueError('a path needs at least two points')
+        if cell_size <= 0:
+            raise ValueError('cell_size must be positive')
+        self.xs = [float(x) for x, _ in points]
+        self.ys = [float(y) for _, y in points]
+        self.cell_size = cell_size
+        # The distance along the path from the first point to each point.
+        self.lengths = [0.0]
+        for index in range(1, len(points)):
+            self.lengths.append(self.lengths[-1] + math.hypot(self.xs[index] - self.xs[index - 1],
+                                                              self.ys[index] - self.ys[index - 1]))
+        self.length = self.lengths[-1]
+        self._cells = {}
+        for index in range(len(points) - 1):
+            low_x, high_x = sorted((self.xs[index], self.xs[index + 1]))
+            low_y, high_y = sorted((self.ys[index], self.ys[index + 1]))
+            for cell_x in range(self._cell(low_x), self._cell(high_x) + 1):
+                for cell_y in range(self._cell(low_y), self._cell(high_y) + 1):
+                    self._cells.setdefault((cell_x, cell_y), []).append(index)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def _cell(self, coordinate):
+        return int(math.floor(coordinate / self.cell_size))
+
+    def point_at(self, distance, hint=0):
+        """
+        Finds the point at a distance along the path.
+
+        Args:
+            distance (float): The distance from the first point. Distances beyond the end give the last point.
+            hint (int, optional): A segment at or before the point; the search walks forward from it.
+                Defaults to the first segment.
+
+        Returns:
+            tuple: The `(x, y)` of the point and the index of its segment.
+        """
+        lengths = self.lengths
+        last = len(lengths) - 2
+        index = hint
+        while index < last and lengths[index + 1] < distance:
+            index += 1
+        start = lengths[index]
+        span = lengths[index + 1] - start
+        share = min(max((distance - start) / span, 0.0), 1.0) if span else 0.0
+        x = self.xs[index] + (self.xs[index + 1] - self.xs[index]) * share
+        y = self.ys[index] + (self.ys[index + 1] - self.ys[index]) * share
+        return (x, y), index
+
+    def closest(self, x, y, low=0.0, high=math.inf):
+        """
+        Finds the closest point of the path to a position among the nearby segments.
+
+        Only the segments in the position's cell and the eight cells around it are looked at, and
+        only the parts of them between the distances `low` and `high` along the path. The segments of
+        a cell are kept in path order, so the ones in that range are found by bisection.
+
+        Args:
+            x (float): The x coordinate of the position.
+            y (float): The y coordinate of the position.
+            low (float, optional): The lowest distance along the path to consider. Defaults to 0.
+            high (float, optional): The highest distance along the path to consider. Defaults to the end.
+
+        Returns:
+            tuple or None: The distance along the path of the closest point and the index of its
+            segment, or None if no segment is near.
+        """
+        xs, ys, lengths = self.xs, self.ys, self.lengths
+        first = max(bisect.bisect_right(lengths, low) - 1, 0)
+        last = bisect.bisect_left(lengths, high)
+        cell_x, cell_y = self._cell(x), self._cell(y)
+        best = None
+        best_squared = math.inf
+        for neighbor_x in (cell_x - 1, cell_x, cell_x + 1):
+            for neighbor_y in (cell_y - 1, cell_y, cell_y + 1):
+                cell = self._cells.get((neighbor_x, neighbor_y))
+                if cell is None:
+                    continue
+                for position in range(bisect.bisect_left(cell, first), bisect.bisect_right(cell, last)):
+                    index = cell[position]
+                    start = lengths[index]
+                    span = lengths[index + 1] - start
+                    dx = xs[index + 1] - xs[index]
+                    dy = ys[index + 1] - ys[index]
+                    if span:
+                        share = ((x - xs[index]) * dx + (y - ys[index]) * dy) / (span * span)
+                        share = min(max(share, (low - start) / span, 0.0), (high - start) / span, 1.0)
+                    else:
+                        share = 0.0
+                    squared = (xs[index] + dx * share - x) ** 2 + (ys[index] + dy * share - y) ** 2
+                    if squared < best_squared:
+                        best_squared = squared
+                        best = (start + span * share, index)
+        return best
+
+
+class PurePursuit:
+    """
+    Drives a driving base along a path without stopping, by steering towards a point ahead on the path.
+
+    On every step, the follower finds the closest point of the path near the robot with the path's
+    grid index, looks `lookahead` further along the path, and sets the wheel speeds with
+    `MotorPair.start_tank()` so the robot drives an arc through that point. The search only moves
+    forward along the path, so a step costs the same however long the path is.
+
+    Example:
+        from spike import MotorPair, PrimeHub
+        from spike.odometry import Odometry
+        from spike.pathfollow import Path, PurePursuit
+
+        hub = PrimeHub()
+        motor_pair = MotorPair('B', 'C')
+        odometry = Odometry(motor_pair, hub.motion_sensor)
+        path = Path([(0, 0), (40, 0), (60, 20), (60, 60)])
+        PurePursuit(motor_pair, odometry, path, lookahead=10, speed=50).run()
+    """
+
+    def __init__(self, motor_pair, odometry, path, lookahead=10.0, speed=50, tolerance=1.0):
+        """
+        Initializes the PurePursuit follower.
+
+        Args:
+            motor_pair (MotorPair): The driving base.
+            odometry (Odometry): The pose estimate of the driving base.
+            path (Path): The path to follow.
+            lookahead (float, optional): How far ahead along the path the robot steers to. Defaults to 10.
+            speed (int, optional): The speed of the faster wheel (0 to 100%). Defaults to 50.
+            tolerance (float, optional): How close to the last point the robot has arrived. Defaults to 1.
+
+        Raises:
+            ValueError: If `lookahead` is not positive.
+        """
+        if lookahead <= 0:
+            raise ValueError('lookahead must be positive')
+        self.motor_pair = motor_pair
+        self.odometry = odometry
+        self.path = path
+        self.lookahead = lookahead
+        self.speed = speed
+        self.tolerance = tolerance
+        self.progress = 0.0
+        # The segments of the closest point and of the lookahead point; both only move forward.
+        self._segment = 0
+        self._ahead = 0
+
+    @property
+    def finished(self):
+        """
+        bool: True if the robot has reached the end of the path.
+        """
+        if self.progress < self.path.length - self.lookahead:
+            return False
+        x, y = self.path.xs[-1], self.path.ys[-1]
+        if math.hypot(x - self.odometry.x, y - self.odometry.y) <= self.tolerance:
+            return True
+        # Past the last point, seen from the robot.
+        theta = math.radians(self.odometry.heading)
+        return (x - self.odometry.x) * math.cos(theta) + (y - self.odometry.y) * math.sin(theta) < 0
+
+    def step(self):
+        """
+        Steers towards the lookahead point from the current pose. Call `odometry.update()` first.
+        """
+        odometry = self.odometry
+        path = self.path
+        found = path.closest(odometry.x, odometry.y, self.progress, self.progress + self.lookahead)
+        if found is not None:
+            self.progress, self._segment = found
+        (x, y), self._ahead = path.point_at(self.progress + self.lookahead, max(self._ahead, self._segment))
+        theta = math.radians(odometry.heading)
+        dx = x - odometry.x
+        dy = y - odometry.y
+        squared = dx * dx + dy * dy
+        if not squared:
+            return
+        # The curvature of the arc through the lookahead point, positive to the left.
+        curvature = 2 * (dy * math.cos(theta) - dx * math.sin(theta)) / squared
+        half = curvature * odometry.axle_track / 2
+        left, right = 1 - half, 1 + half
+        scale = self.speed / max(abs(left), abs(right))
+        self.motor_pair.start_tank(int(round(left * scale)), int(round(right * scale)))
+
+    def run(self, period=0.01):
+        """
+        Follows the path to its end and stops.
+
+        Args:
+            period (float, optional): The time between steps in seconds. Defaults to 0.01.
+        """
+        while True:
+            self.odometry.update()
+            if self.finished:
+                break
+            self.step()
+            wait_for_seconds(period)
+        self.motor_pair.stop()
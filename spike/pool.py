@@ -0,0 +1,252 @@
+import threading
+from concurrent.futures import Future
+
+from .transport import CALL, Connection, Transport, encode_call, request, request_id, result
+
+
+class Session:
+    """
+    One stream to a hub that many connections share, with several requests in flight at once.
+
+    Requests are written as soon as they are made, without waiting for the answers to earlier ones.
+    A background thread reads the answers and hands each one to the request with the same id.
+
+    Use `ConnectionPool` to share one session per hub between the device objects of a program.
+    """
+
+    def __init__(self, transport):
+        """
+        Initializes the Session and starts reading answers.
+
+        Args:
+            transport (Transport): The stream to the hub.
+        """
+        self.transport = transport
+        self.requests = 0
+        self.closed = False
+        self._pending = {}
+        self._request_id = 0
+        self._lock = threading.Lock()
+        # Held while writing, apart from `_lock`, so the reader can pop answers while a long write
+        # waits for the hub to read.
+        self._write_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name='spike-session', daemon=True)
+        self._reader.start()
+
+    def request(self, operation, parts):
+        """
+        Sends a request without waiting for the answer.
+
+        Args:
+            operation (int): `CALL` or `BATCH`.
+            parts (list of bytes): The encoded call or calls.
+
+        Returns:
+            concurrent.futures.Future: The future of the return value.
+
+        Raises:
+            ConnectionError: If the session is closed.
+        """
+        return self.request_all([(operation, parts)])[0]
+
+    def request_all(self, requests):
+        """
+        Sends several requests in one write without waiting for the answers.
+
+        Args:
+            requests (list of tuple): The `(operation, parts)` of each request.
+
+        Returns:
+            list of concurrent.futures.Future: The futures of the return values.
+
+        Raises:
+            ConnectionError: If the session is closed.
+        """
+        futures = []
+        frames = []
+        with self._lock:
+            if self.closed:
+                raise ConnectionError('the session is closed')
+            for operation, parts in requests:
+                self._request_id = number = (self._request_id + 1) & 0xFFFFFFFF
+                future = self._pending[number] = Future()
+                futures.append(future)
+                frames.append(request(number, operation, parts))
+            self.requests += len(frames)
+            # Taken before `_lock` is released, so requests go out in the order of their ids.
+            self._write_lock.acquire()
+        try:
+            self.transport.write(b''.join(frames))
+        finally:
+            self._write_lock.release()
+        return futures
+
+    def _read(self):
+        try:
+            while True:
+                payload = self.transport.read_frame()
+                if payload is None:
+                    break
+                with self._lock:
+                    future = self._pending.pop(request_id(payload), None)
+                if future is None:
+                    continue
+                try:
+                    future.set_result(result(payload)[1])
+                except Exception as error:
+                    future.set_exception(error)
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._lock:
+                self.closed = True
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                future.set_exception(ConnectionError('the hub closed the connection'))
+
+    def close(self):
+        """
+        Closes the stream. Requests still waiting for an answer raise ConnectionError.
+        """
+        with self._lock:
+            self.closed = True
+        self.transport.close()
+        self._reader.join()
+
+
+class PooledConnection(Connection):
+    """
+    A connection that sends its calls over a shared `Session`.
+
+    Each pooled connection is a backend of its own that can be activated in its own thread or task,
+    while all of them share the session of their hub. Besides the blocking calls of the device
+    objects, `submit()` and `pipeline()` put several calls in flight at once.
+    """
+
+    def __init__(self, session):
+        """
+        Initializes the PooledConnection.
+
+        Args:
+            session (Session): The session to the hub.
+        """
+        super().__init__(session.transport)
+        self.session = session
+
+    def close(self):
+        """
+        Does nothing; the session belongs to the pool.
+        """
+
+    def _request(self, operation, parts):
+        self.calls += 1
+        return self.session.request(operation, parts).result()
+
+    def submit(self, kind, address, method, args=()):
+        """
+        Calls a method of a device on the hub without waiting for the answer.
+
+        Args:
+            kind (str): The kind of device, one of `KINDS`.
+            address (tuple): The port or ports, or the side of a button.
+            method (str): The method.
+            args (tuple, optional): The arguments.
+
+        Returns:
+            concurrent.futures.Future: The future of the return value.
+        """
+        parts = []
+        encode_call(kind, address, method, args, parts)
+        self.calls += 1
+        return self.session.request(CALL, parts)
+
+    def pipeline(self, calls):
+        """
+        Sends several calls back to back and waits for all answers.
+
+        Args:
+            calls (list of tuple): The `(kind, address, method, args)` of each call.
+
+        Returns:
+            list: The return values, in the order of `calls`.
+
+        Example:
+            speeds = connection.pipeline([('motor', (port,), 'get_speed', ()) for port in 'ABCD'])
+        """
+        requests = []
+        for kind, address, method, args in calls:
+            parts = []
+            encode_call(kind, address, method, args, parts)
+            requests.append((CALL, parts))
+        self.calls += len(requests)
+        return [future.result() for future in self.session.request_all(requests)]
+
+
+class ConnectionPool:
+    """
+    Keeps one session per hub and hands out connections that share it.
+
+    Example:
+        from spike import Motor
+        from spike.pool import ConnectionPool
+
+        with ConnectionPool() as pool:
+            for path in ('/tmp/hub1.sock', '/tmp/hub2.sock'):
+                with pool.connect(path):
+                    Motor('A').start(50)
+    """
+
+    def __init__(self, open_transport=Transport.unix):
+        """
+        Initializes the ConnectionPool.
+
+        Args:
+            open_transport (callable, optional): A function that opens a transport to the hub at an
+                address. Defaults to `Transport.unix`, which takes the path of a Unix socket.
+        """
+        self.open_transport = open_transport
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def session(self, address):
+        """
+        Retrieves the session to a hub, opening it if there is none or the previous one was closed.
+
+        Args:
+            address (object): The address of the hub, passed to `open_transport`.
+
+        Returns:
+            Session: The session.
+        """
+        with self._lock:
+            session = self._sessions.get(address)
+            if session is None or session.closed:
+                session = self._sessions[address] = Session(self.open_transport(address))
+            return session
+
+    def connect(self, address):
+        """
+        Creates a connection to a hub that shares the hub's session.
+
+        Args:
+            address (object): The address of the hub, passed to `open_transport`.
+
+        Returns:
+            PooledConnection: The connection. Use it as a context manager to activate it.
+        """
+        return PooledConnection(self.session(address))
+
+    def close(self):
+        """
+        Closes all sessions.
+        """
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
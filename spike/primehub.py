@@ -1,3 +1,21 @@
+from collections import namedtuple
+
+from ._backend import get_backend, get_time
+from .colorsensor import ColorSensor
+from .motor import Motor
+from .motorpair import MotorPair
+
+PORTS = ('A', 'B', 'C', 'D', 'E', 'F')
+
+# The records returned by `PrimeHub.snapshot()`.
+HubSnapshot = namedtuple('HubSnapshot', ['time', 'ports', 'yaw_angle', 'pitch_angle', 'roll_angle', 'orientation',
+                                         'left_button_pressed', 'right_button_pressed'])
+MotorState = namedtuple('MotorState', ['speed', 'position', 'degrees_counted'])
+ColorSensorState = namedtuple('ColorSensorState', ['color', 'ambient_light', 'reflected_light', 'red', 'green',
+                                                   'blue', 'intensity'])
+_STATES = {'motor': MotorState._make, 'color_sensor': ColorSensorState._make}
+
+
 class PrimeHub:
     """
     A class to represent the SPIKE Prime Hub.
@@ -20,6 +38,9 @@ class PrimeHub:
     PORT_E = 'E'
     PORT_F = 'F'
 
+    __slots__ = ('left_button', 'right_button', 'speaker', 'light_matrix', 'status_light', 'motion_sensor',
+                 '_ports')
+
     def __init__(self):
         """
         Initialize the PrimeHub and its components.
@@ -30,6 +51,166 @@ class PrimeHub:
         self.light_matrix = LightMatrix()
         self.status_light = StatusLight()
         self.motion_sensor = MotionSensor()
+        self._ports = None
+
+    @property
+    def ports(self):
+        """
+        PortRegistry: The devices connected to the hub's ports, one shared object per port.
+
+        The registry is created on first use, so hubs that never use it do not pay for it.
+
+        Example:
+            hub = PrimeHub()
+            motor = hub.ports.motor(hub.PORT_A)
+        """
+        if self._ports is None:
+            self._ports = PortRegistry()
+        return self._ports
+
+    # Measurements
+
+    def snapshot(self):
+        """
+        Reads the state of every device of the hub in one operation.
+
+        All readings are taken at the same time, so they are consistent with each other, and over a
+        connection they cost a single request instead of one per getter.
+
+        Returns:
+            HubSnapshot: The time of the snapshot in seconds; `ports`, a tuple with one entry per port
+            A-F that is a `MotorState`, a `ColorSensorState` or None if nothing is connected; the yaw,
+            pitch and roll angles and the orientation of the Motion Sensor; and whether the left and
+            right buttons are pressed.
+
+        Example:
+            snapshot = hub.snapshot()
+            motor_a = snapshot.ports[0]
+            print(snapshot.time, motor_a.degrees_counted, snapshot.yaw_angle)
+        """
+        backend = get_backend()
+        if backend is None:
+            return HubSnapshot(get_time(), (None,) * len(PORTS), 0, 0, 0, 'front', False, False)
+        time, ports, *readings = backend.snapshot()
+        return HubSnapshot(time, tuple(None if port is None else _STATES[port[0]](port[1]) for port in ports),
+                           *readings)
+
+class PortRegistry:
+    """
+    Keeps one shared device object per port of a hub.
+
+    Asking twice for the device on a port returns the same object, so code that passes
+    port letters around does not create a new `Motor` or `ColorSensor` for every call.
+
+    Example:
+        from spike import PrimeHub
+
+        hub = PrimeHub()
+
+        left = hub.ports.motor('B')
+        assert hub.ports.motor('B') is left
+    """
+
+    __slots__ = ('_devices', '_motor_pairs')
+
+    def __init__(self):
+        """
+        Initialize an empty PortRegistry.
+        """
+        self._devices = [None] * len(PORTS)
+        self._motor_pairs = None
+
+    def motor(self, port):
+        """
+        Retrieves the motor on a port.
+
+        Args:
+            port (str): The port of the motor ('A'-'F').
+
+        Returns:
+            Motor: The shared motor object for the port.
+
+        Raises:
+            ValueError: If `port` is not a valid port or another kind of device is registered on it.
+        """
+        return self._get(Motor, port)
+
+    def color_sensor(self, port):
+        """
+        Retrieves the color sensor on a port.
+
+        Args:
+            port (str): The port of the sensor ('A'-'F').
+
+        Returns:
+            ColorSensor: The shared color sensor object for the port.
+
+        Raises:
+            ValueError: If `port` is not a valid port or another kind of device is registered on it.
+        """
+        return self._get(ColorSensor, port)
+
+    def motor_pair(self, port_left, port_right):
+        """
+        Retrieves the driving base on two ports.
+
+        Both motors are registered on their ports, so they remain available through `motor()` and no
+        other kind of device can be registered there.
+
+        Args:
+            port_left (str): The port of the left motor ('A'-'F').
+            port_right (str): The port of the right motor ('A'-'F').
+
+        Returns:
+            MotorPair: The shared motor pair object for the ports.
+
+        Raises:
+            ValueError: If a port is not valid, both ports are the same, or a color sensor is registered on one of them.
+        """
+        if port_left == port_right:
+            raise ValueError('the motors of a pair must be on different ports')
+        self._get(Motor, port_left)
+        self._get(Motor, port_right)
+        if self._motor_pairs is None:
+            self._motor_pairs = {}
+        key = (port_left, port_right)
+        pair = self._motor_pairs.get(key)
+        if pair is None:
+            pair = self._motor_pairs[key] = MotorPair(port_left, port_right)
+        return pair
+
+    def get(self, port):
+        """
+        Retrieves the device registered on a port.
+
+        Args:
+            port (str): The port ('A'-'F').
+
+        Returns:
+            Motor or ColorSensor or None: The registered device, or None if the port is free.
+
+        Raises:
+            ValueError: If `port` is not a valid port.
+        """
+        return self._devices[self._index(port)]
+
+    def _index(self, port):
+        try:
+            return PORTS.index(port)
+        except ValueError:
+            raise ValueError('port must be one of {}'.format(PORTS)) from None
+
+    def _check(self, device_class, port):
+        device = self._devices[self._index(port)]
+        if device is not None and not isinstance(device, device_class):
+            raise ValueError('port {} is used by a {}'.format(port, type(device).__name__))
+        return device
+
+    def _get(self, device_class, port):
+        device = self._check(device_class, port)
+        if device is None:
+            device = self._devices[PORTS.index(port)] = device_class(port)
+        return device
 
 class Button:
     """
@@ -44,6 +225,8 @@ class Button:
         hub.left_button.wait_until_pressed()
     """
 
+    __slots__ = ('side',)
+
     def __init__(self, side):
         """
         Initialize the Button.
@@ -59,13 +242,17 @@ class Button:
         """
         Waits until the button is pressed.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.button(self.side).wait_until_pressed()
 
     def wait_until_released(self):
         """
         Waits until the button is released.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.button(self.side).wait_until_released()
 
     def was_pressed(self):
         """
@@ -76,6 +263,9 @@ class Button:
         Returns:
             bool: True if the button was pressed, otherwise False.
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.button(self.side).was_pressed()
         return False
 
     # Measurements
@@ -87,8 +277,39 @@ class Button:
         Returns:
             bool: True if the button is pressed, otherwise False.
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.button(self.side).is_pressed()
         return False
 
+    # Awaitables
+
+    async def wait_until_pressed_async(self):
+        """
+        Waits until the button is pressed.
+
+        Awaitable counterpart of `wait_until_pressed()`.
+
+        Example:
+            await hub.left_button.wait_until_pressed_async()
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.button(self.side).wait_until_pressed_async()
+
+    async def wait_until_released_async(self):
+        """
+        Waits until the button is released.
+
+        Awaitable counterpart of `wait_until_released()`.
+
+        Example:
+            await hub.left_button.wait_until_released_async()
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.button(self.side).wait_until_released_async()
+
 class Speaker:
     """
     Represents the speaker inside the Hub.
@@ -101,6 +322,8 @@ class Speaker:
         hub.speaker.beep()
     """
 
+    __slots__ = ()
+
     # Actions
 
     def beep(self, note=60, seconds=0.2):
@@ -117,7 +340,9 @@ class Speaker:
             TypeError: If `note` is not an integer or `seconds` is not a number.
             ValueError: If `note` is not within the allowed range of 44-123.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.speaker().beep(note, seconds)
 
     def start_beep(self, note=60):
         """
@@ -132,13 +357,17 @@ class Speaker:
             TypeError: If `note` is not an integer.
             ValueError: If `note` is not within the allowed range of 44-123.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.speaker().start_beep(note)
 
     def stop(self):
         """
         Stops any sound that is playing.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.speaker().stop()
 
     # Measurements
 
@@ -149,6 +378,9 @@ class Speaker:
         Returns:
             int: The current volume (0 to 100%).
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.speaker().get_volume()
         return 100
 
     # Settings
@@ -163,7 +395,24 @@ class Speaker:
         Raises:
             TypeError: If `volume` is not an integer.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.speaker().set_volume(volume)
+
+    # Awaitables
+
+    async def beep_async(self, note=60, seconds=0.2):
+        """
+        Plays a beep on the Hub and waits until it has finished.
+
+        Awaitable counterpart of `beep()`.
+
+        Example:
+            await hub.speaker.beep_async(60, 0.5)
+        """
+        backend = get_backend()
+        if backend is not None:
+            await backend.speaker().beep_async(note, seconds)
 
 class LightMatrix:
     """
@@ -177,6 +426,8 @@ class LightMatrix:
         hub.light_matrix.show_image('HAPPY')
     """
 
+    __slots__ = ()
+
     # Actions
 
     def show_image(self, image, brightness=100):
@@ -191,7 +442,9 @@ class LightMatrix:
             TypeError: If `image` is not a string or `brightness` is not an integer.
             ValueError: If `image` is not one of the allowed values.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.light_matrix().show_image(image, brightness)
 
     def set_pixel(self, x, y, brightness=100):
         """
@@ -206,7 +459,28 @@ class LightMatrix:
             TypeError: If `x`, `y`, or `brightness` is not an integer.
             ValueError: If `x` or `y` is not within the allowed range of 0-4.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.light_matrix().set_pixel(x, y, brightness)
+
+    def show(self, pixels):
+        """
+        Sets the brightness of all 25 pixels at once.
+
+        Args:
+            pixels (bytes): The brightness of each pixel (0 to 100%), row by row from the top left.
+
+        Raises:
+            ValueError: If `pixels` does not hold 25 values.
+
+        Example:
+            hub.light_matrix.show(bytes([100, 0, 0, 0, 100] * 5))
+        """
+        if len(pixels) != 25:
+            raise ValueError('pixels must hold 25 values')
+        backend = get_backend()
+        if backend is not None:
+            backend.light_matrix().show(bytes(pixels))
 
     def write(self, text):
         """
@@ -218,13 +492,17 @@ class LightMatrix:
         Raises:
             TypeError: If `text` is not a string.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.light_matrix().write(text)
 
     def off(self):
         """
         Turns off all the pixels on the Light Matrix.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.light_matrix().off()
 
 class StatusLight:
     """
@@ -238,6 +516,8 @@ class StatusLight:
         hub.status_light.on('blue')
     """
 
+    __slots__ = ()
+
     # Actions
 
     def on(self, color='white'):
@@ -254,13 +534,17 @@ class StatusLight:
             TypeError: If `color` is not a string.
             ValueError: If `color` is not one of the allowed values.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.status_light().on(color)
 
     def off(self):
         """
         Turns off the Brick Status Light.
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.status_light().off()
 
 class MotionSensor:
     """
@@ -279,6 +563,8 @@ class MotionSensor:
         yaw_angle = motion_sensor.get_yaw_angle()
     """
 
+    __slots__ = ()
+
     def __init__(self):
         """
         Initialize the Motion Sensor.
@@ -317,6 +603,9 @@ class MotionSensor:
             if motion_sensor.was_gesture('shaken'):
                 print("The Hub was shaken!")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motion_sensor().was_gesture(gesture)
         return False
 
     def wait_for_new_gesture(self):
@@ -345,6 +634,9 @@ class MotionSensor:
                 elif gesture == 'tapped':
                     print("Tapped detected!")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motion_sensor().wait_for_new_gesture()
         return 'tapped'
 
     def wait_for_new_orientation(self):
@@ -370,6 +662,9 @@ class MotionSensor:
                 orientation = motion_sensor.wait_for_new_orientation()
                 print(f"New orientation: {orientation}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motion_sensor().wait_for_new_orientation()
         return 'front'
 
     # Measurements
@@ -392,6 +687,9 @@ class MotionSensor:
             orientation = motion_sensor.get_orientation()
             print(f"Current orientation: {orientation}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motion_sensor().get_orientation()
         return 'front'
 
     def get_gesture(self):
@@ -412,6 +710,9 @@ class MotionSensor:
             gesture = motion_sensor.get_gesture()
             print(f"Latest gesture: {gesture}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motion_sensor().get_gesture()
         return 'tapped'
 
     def get_roll_angle(self):
@@ -431,6 +732,9 @@ class MotionSensor:
             roll_angle = motion_sensor.get_roll_angle()
             print(f"Roll angle: {roll_angle}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motion_sensor().get_roll_angle()
         return 0
 
     def get_pitch_angle(self):
@@ -450,6 +754,9 @@ class MotionSensor:
             pitch_angle = motion_sensor.get_pitch_angle()
             print(f"Pitch angle: {pitch_angle}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motion_sensor().get_pitch_angle()
         return 0
 
     def get_yaw_angle(self):
@@ -469,6 +776,9 @@ class MotionSensor:
             yaw_angle = motion_sensor.get_yaw_angle()
             print(f"Yaw angle: {yaw_angle}")
         """
+        backend = get_backend()
+        if backend is not None:
+            return backend.motion_sensor().get_yaw_angle()
         return 0
 
     # Settings
@@ -485,4 +795,42 @@ class MotionSensor:
             motion_sensor.reset_yaw_angle()
             print("Yaw angle reset to 0.")
         """
-        pass
+        backend = get_backend()
+        if backend is not None:
+            backend.motion_sensor().reset_yaw_angle()
+
+    # Awaitables
+
+    async def wait_for_new_gesture_async(self):
+        """
+        Waits until a new gesture happens.
+
+        Awaitable counterpart of `wait_for_new_gesture()`.
+
+        Returns:
+            str: The new gesture.
+
+        Example:
+            gesture = await motion_sensor.wait_for_new_gesture_async()
+        """
+        backend = get_backend()
+        if backend is not None:
+            return await backend.motion_sensor().wait_for_new_gesture_async()
+        return 'tapped'
+
+    async def wait_for_new_orientation_async(self):
+        """
+        Waits until the orientation of the Hub changes.
+
+        Awaitable counterpart of `wait_for_new_orientation()`.
+
+        Returns:
+            str: The Hub's new orientation.
+
+        Example:
+            orientation = await motion_sensor.wait_for_new_orientation_async()
+        """
+        backend = get_backend()
+        if backend is not None:
+            return await backend.motion_sensor().wait_for_new_orientation_async()
+        return 'front'
@@ -0,0 +1,263 @@
+import functools
+import math
+from collections import namedtuple
+
+from .control import wait_for_seconds
+from .simulation import DIRECTIONS, MAX_SPEED
+
+# The default acceleration limit of a planned move, in degrees per second squared.
+DEFAULT_ACCELERATION = 2000.0
+
+# How often a planned move updates the motor's speed, in seconds.
+DEFAULT_PERIOD = 0.01
+
+# How strongly a planned move corrects the distance it lags behind the profile, per second.
+POSITION_GAIN = 20.0
+
+_Segment = namedtuple('_Segment', ['start', 'duration', 'position', 'velocity', 'acceleration', 'jerk'])
+
+
+class Profile(namedtuple('Profile', ['distance', 'speed', 'duration', 'segments'])):
+    """
+    A velocity profile that moves a motor over a distance and stops it.
+
+    Profiles are made by `plan()`. `distance` is in degrees, `speed` is the highest speed reached in
+    degrees per second, and `duration` is in seconds. The profile is a series of segments of
+    constant jerk, seven for an S-curve and three for a trapezoid.
+    """
+
+    __slots__ = ()
+
+    def _segment(self, time):
+        for segment in reversed(self.segments):
+            if time >= segment.start:
+                return segment, min(time, self.duration) - segment.start
+        return self.segments[0], 0.0
+
+    def position(self, time):
+        """
+        Args:
+            time (float): The time since the start of the move, in seconds.
+
+        Returns:
+            float: The distance covered at `time`, in degrees.
+        """
+        if not self.segments:
+            return 0.0
+        segment, t = self._segment(time)
+        return (segment.position + segment.velocity * t + segment.acceleration * t * t / 2
+                + segment.jerk * t * t * t / 6)
+
+    def velocity(self, time):
+        """
+        Args:
+            time (float): The time since the start of the move, in seconds.
+
+        Returns:
+            float: The speed at `time`, in degrees per second.
+        """
+        if not self.segments or time >= self.duration:
+            return 0.0
+        segment, t = self._segment(time)
+        return segment.velocity + segment.acceleration * t + segment.jerk * t * t / 2
+
+    def positions(self, period):
+        """
+        Samples the profile at a fixed period. The result is cached per profile and period.
+
+        Args:
+            period (float): The time between samples, in seconds.
+
+        Returns:
+            tuple of float: The distance covered at every multiple of `period` up to and including
+            the end of the move.
+        """
+        return _positions(self, period)
+
+
+@functools.lru_cache(maxsize=256)
+def _positions(profile, period):
+    count = int(math.ceil(profile.duration / period - 1e-9))
+    return tuple(profile.position(index * period) for index in range(count)) + (profile.distance,)
+
+
+def _peak(distance, acceleration, jerk):
+    # The highest speed from which the move can still stop within `distance`.
+    if jerk is None:
+        return math.sqrt(distance * acceleration)
+    speed = (distance * math.sqrt(jerk) / 2) ** (2 / 3)
+    if speed * jerk <= acceleration * acceleration:
+        return speed
+    ramp = acceleration / jerk
+    return acceleration / 2 * (math.sqrt(ramp * ramp + 4 * distance / acceleration) - ramp)
+
+
+@functools.lru_cache(maxsize=1024)
+def plan(distance, speed, acceleration=DEFAULT_ACCELERATION, jerk=None):
+    """
+    Plans the fastest move over a distance within limits of speed, acceleration and jerk.
+
+    Without a jerk limit the profile is a trapezoid: constant acceleration up to `speed`, constant
+    speed, and constant deceleration. With a jerk limit it is an S-curve, which ramps the
+    acceleration up and down as well. Short moves that cannot reach `speed` peak at a lower speed.
+
+    Plans are cached, so repeating a move with the same arguments costs nothing to plan.
+
+    Args:
+        distance (float): The distance in degrees. The sign is ignored.
+        speed (float): The highest speed in degrees per second.
+        acceleration (float, optional): The highest acceleration in degrees per second squared.
+            Defaults to 2000.
+        jerk (float, optional): The highest jerk in degrees per second cubed. Defaults to no limit,
+            which plans a trapezoid.
+
+    Returns:
+        Profile: The planned profile.
+
+    Raises:
+        ValueError: If `speed`, `acceleration` or `jerk` is not positive.
+
+    Example:
+        from spike.profile import plan
+
+        profile = plan(720, 800, acceleration=3000, jerk=40000)
+        print(profile.duration, profile.velocity(0.1))
+    """
+    if speed <= 0 or acceleration <= 0 or (jerk is not None and jerk <= 0):
+        raise ValueError('speed, acceleration and jerk must be positive')
+    distance = abs(distance)
+    if distance == 0:
+        return Profile(0.0, 0.0, 0.0, ())
+    speed = min(speed, _peak(distance, acceleration, jerk))
+    if jerk is None:
+        ramp, peak, constant = 0.0, acceleration, speed / acceleration
+    elif speed * jerk <= acceleration * acceleration:
+        ramp = math.sqrt(speed / jerk)
+        peak, constant = jerk * ramp, 0.0
+    else:
+        ramp = acceleration / jerk
+        peak, constant = acceleration, speed / acceleration - ramp
+    cruise = max(distance - speed * (2 * ramp + constant), 0.0) / speed
+    jerk = jerk or 0.0
+    phases = ((ramp, 0.0, jerk), (constant, peak, 0.0), (ramp, peak, -jerk), (cruise, 0.0, 0.0),
+              (ramp, 0.0, -jerk), (constant, -peak, 0.0), (ramp, -peak, jerk))
+    segments = []
+    start = position = velocity = 0.0
+    for duration, initial, change in phases:
+        if duration <= 0:
+            continue
+        segments.append(_Segment(start, duration, position, velocity, initial, change))
+        position += velocity * duration + initial * duration ** 2 / 2 + change * duration ** 3 / 6
+        velocity += initial * duration + change * duration ** 2 / 2
+        start += duration
+    return Profile(distance, speed, start, tuple(segments))
+
+
+def run_profile(motor, profile, direction=1, period=DEFAULT_PERIOD):
+    """
+    Moves a motor along a profile and stops it.
+
+    Every `period` the motor's speed is set to the speed that covers the profile's next step, plus
+    a correction for the distance it lags behind. The motor stops with its stop action.
+
+    Args:
+        motor (Motor): The motor to move.
+        profile (Profile): The profile made by `plan()`.
+        direction (int, optional): 1 to move forward (clockwise), -1 to move backward. Defaults to 1.
+        period (float, optional): The time between speed updates in seconds. Defaults to 0.01.
+    """
+    positions = profile.positions(period)
+    start = motor.get_degrees_counted()
+    scale = 100 / MAX_SPEED
+    for index in range(len(positions) - 1):
+        error = start + direction * positions[index] - motor.get_degrees_counted()
+        velocity = direction * (positions[index + 1] - positions[index]) / period + POSITION_GAIN * error
+        motor.start(int(round(max(-100.0, min(100.0, velocity * scale)))))
+        wait_for_seconds(period)
+    motor.stop()
+
+
+def run_for_degrees(motor, degrees, speed=None, acceleration=DEFAULT_ACCELERATION, jerk=None,
+                    period=DEFAULT_PERIOD):
+    """
+    Rotates a motor for a number of degrees along a planned profile.
+
+    Unlike `Motor.run_for_degrees()`, the motor speeds up and slows down within the given limits,
+    so fast moves do not overshoot.
+
+    Args:
+        motor (Motor): The motor to move.
+        degrees (int): The number of degrees; negative values turn the motor backward.
+        speed (int, optional): The highest speed (0 to 100%). Defaults to the motor's default speed.
+        acceleration (float, optional): The highest acceleration in degrees per second squared.
+            Defaults to 2000.
+        jerk (float, optional): The highest jerk in degrees per second cubed. Defaults to no limit.
+        period (float, optional): The time between speed updates in seconds. Defaults to 0.01.
+
+    Example:
+        from spike import Motor
+        from spike.profile import run_for_degrees
+
+        run_for_degrees(Motor('A'), 720, speed=80, acceleration=3000, jerk=40000)
+    """
+    if speed is None:
+        speed = motor.get_default_speed()
+    direction = 1 if degrees >= 0 else -1
+    if speed < 0:
+        direction = -direction
+    profile = plan(abs(degrees), abs(speed) * MAX_SPEED / 100, acceleration, jerk)
+    run_profile(motor, profile, direction, period)
+
+
+def run_to_degrees_counted(motor, degrees, speed=None, acceleration=DEFAULT_ACCELERATION, jerk=None,
+                           period=DEFAULT_PERIOD):
+    """
+    Runs a motor to a degrees counted value along a planned profile.
+
+    Args:
+        motor (Motor): The motor to move.
+        degrees (int): The target degrees counted.
+        speed (int, optional): The highest speed (0 to 100%). Defaults to the motor's default speed.
+        acceleration (float, optional): The highest acceleration in degrees per second squared.
+            Defaults to 2000.
+        jerk (float, optional): The highest jerk in degrees per second cubed. Defaults to no limit.
+        period (float, optional): The time between speed updates in seconds. Defaults to 0.01.
+    """
+    if speed is None:
+        speed = motor.get_default_speed()
+    run_for_degrees(motor, degrees - motor.get_degrees_counted(), abs(speed), acceleration, jerk, period)
+
+
+def run_to_position(motor, degrees, direction='shortest path', speed=None, acceleration=DEFAULT_ACCELERATION,
+                    jerk=None, period=DEFAULT_PERIOD):
+    """
+    Runs a motor to an absolute position along a planned profile.
+
+    Args:
+        motor (Motor): The motor to move.
+        degrees (int): The target position (0 to 359).
+        direction (str, optional): 'shortest path', 'clockwise' or 'counterclockwise'. Defaults to 'shortest path'.
+        speed (int, optional): The highest speed (0 to 100%). Defaults to the motor's default speed.
+        acceleration (float, optional): The highest acceleration in degrees per second squared.
+            Defaults to 2000.
+        jerk (float, optional): The highest jerk in degrees per second cubed. Defaults to no limit.
+        period (float, optional): The time between speed updates in seconds. Defaults to 0.01.
+
+    Raises:
+        ValueError: If `degrees` or `direction` is not one of the allowed values.
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError('direction must be one of {}'.format(DIRECTIONS))
+    if not 0 <= degrees <= 359:
+        raise ValueError('degrees must be within 0-359')
+    if speed is None:
+        speed = motor.get_default_speed()
+    clockwise = (degrees - motor.get_position()) % 360
+    counterclockwise = clockwise - 360 if clockwise else 0
+    if direction == 'clockwise':
+        delta = clockwise
+    elif direction == 'counterclockwise':
+        delta = counterclockwise
+    else:
+        delta = clockwise if clockwise <= 180 else counterclockwise
+    run_for_degrees(motor, delta, abs(speed), acceleration, jerk, period)
@@ -0,0 +1,389 @@
+import json
+
+from ._backend import activate, deactivate, get_backend
+
+# The calls captured per kind of device: measurements and the blocking calls that let time pass.
+RECORDED = {
+    'motor': ('get_speed', 'get_position', 'get_degrees_counted', 'get_default_speed', 'was_interrupted',
+              'was_stalled', 'run_to_position', 'run_to_degrees_counted', 'run_for_degrees',
+              'run_for_rotations', 'run_for_seconds'),
+    'motor_pair': ('get_default_speed', 'move', 'move_tank'),
+    'color_sensor': ('get_color', 'get_ambient_light', 'get_reflected_light', 'get_rgb_intensity', 'get_red',
+                     'get_green', 'get_blue', 'wait_until_color', 'wait_for_new_color'),
+    'button': ('was_pressed', 'is_pressed', 'wait_until_pressed', 'wait_until_released'),
+    'speaker': ('get_volume', 'beep'),
+    'light_matrix': (),
+    'status_light': (),
+    'motion_sensor': ('get_orientation', 'get_gesture', 'get_roll_angle', 'get_pitch_angle', 'get_yaw_angle',
+                      'was_gesture', 'wait_for_new_gesture', 'wait_for_new_orientation'),
+    'app': ('play_sound',),
+    'hub': ('sleep', 'wait', 'snapshot'),
+}
+
+
+def _recorded(kind, name):
+    if name.endswith('_async'):
+        name = name[:-len('_async')]
+    return name in RECORDED[kind]
+
+
+def _tuples(value):
+    # JSON turns tuples into lists; the recorded values only ever hold tuples.
+    return tuple(_tuples(item) for item in value) if isinstance(value, list) else value
+
+
+class Recording:
+    """
+    The calls a program made to the hub during one run, with their timestamps and return values.
+
+    Each call is stored as a tuple `(time, kind, address, method, args, value)`, where `kind` names
+    the device ('motor', 'color_sensor', ...), `address` holds its port or side, and `value` is what
+    the call returned.
+    """
+
+    def __init__(self, calls=None):
+        """
+        Initializes the Recording.
+
+        Args:
+            calls (list of tuple, optional): The recorded calls. Defaults to an empty recording.
+        """
+        self.calls = [] if calls is None else calls
+
+    def __len__(self):
+        return len(self.calls)
+
+    def save(self, path):
+        """
+        Writes the recording to a JSON file. Floating point values are stored exactly.
+
+        Args:
+            path (str): The path of the file to write.
+        """
+        with open(path, 'w') as file:
+            json.dump({'calls': self.calls}, file)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a recording written by `save()`.
+
+        Args:
+            path (str): The path of the file.
+
+        Returns:
+            Recording: The recording.
+        """
+        with open(path) as file:
+            calls = json.load(file)['calls']
+        return cls([(time, kind, tuple(address), method, tuple(args), _tuples(value))
+                    for time, kind, address, method, args, value in calls])
+
+
+class Recorder:
+    """
+    A backend that captures the measurements of a run so it can be replayed later.
+
+    The recorder wraps the active backend, usually a `Simulation` or a hub connection, and passes
+    every call through to it. The measurement methods and the blocking calls are recorded with the
+    backend's time and their return value.
+
+    Example:
+        from spike import ColorSensor, Simulation
+        from spike.replay import Recorder
+
+        with Simulation() as sim, Recorder() as recorder:
+            sim.at(2, sim.color_sensor('E').set_color, 'red')
+            mission()
+        recorder.recording.save('mission.json')
+    """
+
+    def __init__(self, backend=None):
+        """
+        Initializes the Recorder.
+
+        Args:
+            backend (object, optional): The backend to record. Defaults to the backend active when
+                the recorder is started.
+        """
+        self.backend = backend
+        self.recording = Recording()
+        self._token = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def start(self):
+        """
+        Starts recording.
+
+        Returns:
+            Recorder: The recorder itself.
+
+        Raises:
+            RuntimeError: If there is no backend to record.
+        """
+        if self.backend is None:
+            self.backend = get_backend()
+            if self.backend is None:
+                raise RuntimeError('there is no active backend to record')
+        self._token = activate(self)
+        return self
+
+    def stop(self):
+        """
+        Stops recording and restores the previously active backend.
+        """
+        deactivate(self, self._token)
+        self._token = None
+
+    @property
+    def time(self):
+        return self.backend.time
+
+    def _record(self, kind, address, method, args, value):
+        self.recording.calls.append((self.backend.time, kind, address, method, args, value))
+        return value
+
+    # Devices
+
+    def motor(self, port):
+        return _RecordedDevice(self, 'motor', (port,), self.backend.motor(port))
+
+    def motor_pair(self, port_left, port_right):
+        return _RecordedDevice(self, 'motor_pair', (port_left, port_right),
+                               self.backend.motor_pair(port_left, port_right))
+
+    def color_sensor(self, port):
+        return _RecordedDevice(self, 'color_sensor', (port,), self.backend.color_sensor(port))
+
+    def button(self, side):
+        return _RecordedDevice(self, 'button', (side,), self.backend.button(side))
+
+    def speaker(self):
+        return _RecordedDevice(self, 'speaker', (), self.backend.speaker())
+
+    def light_matrix(self):
+        return _RecordedDevice(self, 'light_matrix', (), self.backend.light_matrix())
+
+    def status_light(self):
+        return _RecordedDevice(self, 'status_light', (), self.backend.status_light())
+
+    def motion_sensor(self):
+        return _RecordedDevice(self, 'motion_sensor', (), self.backend.motion_sensor())
+
+    def app(self):
+        return _RecordedDevice(self, 'app', (), self.backend.app())
+
+    # Measurements
+
+    def snapshot(self):
+        return self._record('hub', (), 'snapshot', (), self.backend.snapshot())
+
+    # Time
+
+    def sleep(self, seconds):
+        self.backend.sleep(seconds)
+        self._record('hub', (), 'sleep', (seconds,), None)
+
+    def wait(self, done):
+        self.backend.wait(done)
+        self._record('hub', (), 'wait', (), None)
+
+    async def sleep_async(self, seconds):
+        await self.backend.sleep_async(seconds)
+        self._record('hub', (), 'sleep', (seconds,), None)
+
+    async def wait_async(self, done):
+        await self.backend.wait_async(done)
+        self._record('hub', (), 'wait', (), None)
+
+
+class _RecordedDevice:
+
+    def __init__(self, recorder, kind, address, device):
+        self._recorder = recorder
+        self._kind = kind
+        self._address = address
+        self._device = device
+
+    def __getattr__(self, name):
+        method = getattr(self._device, name)
+        if not _recorded(self._kind, name):
+            return method
+        record = self._recorder._record
+        kind = self._kind
+        address = self._address
+        if name.endswith('_async'):
+            base = name[:-len('_async')]
+
+            async def recorded_async(*args):
+                return record(kind, address, base, args, await method(*args))
+            return recorded_async
+
+        def recorded(*args):
+            return record(kind, address, name, args, method(*args))
+        return recorded
+
+
+class Replayer:
+    """
+    A backend that feeds a recorded run back to the same program.
+
+    The recorded calls are answered in order with their recorded return values, and the clock
+    follows the recorded timestamps, so the replay is deterministic and runs at full CPU speed.
+    Commands that were not recorded, such as `Motor.start()`, do nothing. If the program makes a
+    call that differs from the recorded one, the replay has diverged and RuntimeError is raised.
+
+    Example:
+        from spike.replay import Recording, Replayer
+
+        with Replayer(Recording.load('mission.json')) as replayer:
+            mission()
+        assert replayer.remaining == 0
+    """
+
+    def __init__(self, recording):
+        """
+        Initializes the Replayer.
+
+        Args:
+            recording (Recording): The recording to replay.
+        """
+        self.recording = recording
+        self.time = 0.0
+        self._position = 0
+        self._token = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def remaining(self):
+        """
+        int: The number of recorded calls that have not been replayed yet.
+        """
+        return len(self.recording.calls) - self._position
+
+    def start(self):
+        """
+        Starts replaying.
+
+        Returns:
+            Replayer: The replayer itself.
+        """
+        self._token = activate(self)
+        return self
+
+    def stop(self):
+        """
+        Stops replaying and restores the previously active backend.
+        """
+        deactivate(self, self._token)
+        self._token = None
+
+    def _replay(self, kind, address, method, args):
+        calls = self.recording.calls
+        if self._position >= len(calls):
+            raise RuntimeError('replay diverged: {}{}.{}{} was not recorded'.format(kind, address, method, args))
+        time, *call, value = calls[self._position]
+        if call != [kind, address, method, args]:
+            raise RuntimeError('replay diverged at call {}: expected {}, got {}'.format(
+                self._position, tuple(call), (kind, address, method, args)))
+        self._position += 1
+        self.time = time
+        return value
+
+    # Devices
+
+    def motor(self, port):
+        return _ReplayedDevice(self, 'motor', (port,))
+
+    def motor_pair(self, port_left, port_right):
+        return _ReplayedDevice(self, 'motor_pair', (port_left, port_right))
+
+    def color_sensor(self, port):
+        return _ReplayedDevice(self, 'color_sensor', (port,))
+
+    def button(self, side):
+        return _ReplayedDevice(self, 'button', (side,))
+
+    def speaker(self):
+        return _ReplayedDevice(self, 'speaker', ())
+
+    def light_matrix(self):
+        return _ReplayedDevice(self, 'light_matrix', ())
+
+    def status_light(self):
+        return _ReplayedDevice(self, 'status_light', ())
+
+    def motion_sensor(self):
+        return _ReplayedDevice(self, 'motion_sensor', ())
+
+    def app(self):
+        return _ReplayedDevice(self, 'app', ())
+
+    # Measurements
+
+    def snapshot(self):
+        return self._replay('hub', (), 'snapshot', ())
+
+    # Time
+
+    def sleep(self, seconds):
+        self._replay('hub', (), 'sleep', (seconds,))
+
+    def wait(self, done):
+        # The recording marks where each wait ended, so the wait ends there whatever `done()`
+        # depends on; the calls `done()` makes on the way are replayed as they come.
+        calls = self.recording.calls
+        while self._position >= len(calls) or calls[self._position][1:5] != ('hub', (), 'wait', ()):
+            position = self._position
+            done()
+            if self._position == position:
+                raise RuntimeError('replay diverged at call {}: the wait made no progress'.format(position))
+        self._replay('hub', (), 'wait', ())
+
+    async def sleep_async(self, seconds):
+        self.sleep(seconds)
+
+    async def wait_async(self, done):
+        self.wait(done)
+
+
+class _ReplayedDevice:
+
+    def __init__(self, replayer, kind, address):
+        self._replayer = replayer
+        self._kind = kind
+        self._address = address
+
+    def __getattr__(self, name):
+        if not _recorded(self._kind, name):
+            if name.endswith('_async'):
+                async def ignored_async(*args):
+                    pass
+                return ignored_async
+            return lambda *args: None
+        replay = self._replayer._replay
+        kind = self._kind
+        address = self._address
+        if name.endswith('_async'):
+            base = name[:-len('_async')]
+
+            async def replayed_async(*args):
+                return replay(kind, address, base, args)
+            return replayed_async
+
+        def replayed(*args):
+            return replay(kind, address, name, args)
+        return replayed
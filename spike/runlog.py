@@ -0,0 +1,204 @@
+import bisect
+import mmap
+import struct
+import sys
+
+MAGIC = b'SPIKELOG'
+VERSION = 1
+
+# Magic, version, byte order ('<' or '>'), number of channels, number of samples, size of the header.
+_HEADER = struct.Struct('<8sBcHQQ')
+# Length of the name, followed by the name itself and an entry.
+_NAME = struct.Struct('<H')
+# Type code and offset of the column.
+_ENTRY = struct.Struct('<cQ')
+_ALIGNMENT = 8
+_BYTE_ORDER = b'<' if sys.byteorder == 'little' else b'>'
+
+
+def _segments(data):
+    if isinstance(data, (tuple, list)):
+        return [memoryview(segment) for segment in data]
+    return [memoryview(data)]
+
+
+def _aligned(offset):
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def write_run_log(path, times, channels):
+    """
+    Writes recorded samples to a file in the run log format.
+
+    A run log stores every channel as one contiguous column behind a small header that indexes the
+    columns, so `RunLog` can map the file into memory and read single channels without touching the
+    others. The columns are written straight from the given buffers.
+
+    Args:
+        path (str): The path of the file to write.
+        times (buffer or tuple of buffers): The timestamps in seconds, as doubles ('d').
+        channels (list of tuple): One `(name, data)` pair per channel, where `data` is an `array`,
+            a `memoryview`, or a tuple of them that are written one after the other.
+
+    Raises:
+        ValueError: If a column has a different number of samples than `times`, the timestamps are
+            not doubles, or two channels have the same name.
+
+    Example:
+        from array import array
+        from spike.runlog import write_run_log
+
+        write_run_log('run.log', array('d', [0.0, 0.1]), [('A.speed', array('b', [0, 50]))])
+    """
+    columns = [('time', _segments(times))] + [(name, _segments(data)) for name, data in channels]
+    names = [name for name, _ in columns]
+    if len(set(names)) != len(names):
+        raise ValueError('channel names must be unique and must not be "time"')
+    if columns[0][1][0].format != 'd':
+        raise ValueError("times must be doubles ('d')")
+    count = sum(len(segment) for segment in columns[0][1])
+    for name, segments in columns:
+        if sum(len(segment) for segment in segments) != count:
+            raise ValueError('channel {} does not have {} samples'.format(name, count))
+        if any(segment.format != segments[0].format for segment in segments):
+            raise ValueError('the segments of channel {} have different types'.format(name))
+    encoded = [name.encode('utf-8') for name in names]
+    header_size = _HEADER.size + sum(_NAME.size + len(name) + _ENTRY.size for name in encoded)
+
+    offset = _aligned(header_size)
+    index = b''
+    for name, (_, segments) in zip(encoded, columns):
+        index += _NAME.pack(len(name)) + name + _ENTRY.pack(segments[0].format.encode('ascii'), offset)
+        offset = _aligned(offset + count * segments[0].itemsize)
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, _BYTE_ORDER, len(columns), count, header_size))
+        file.write(index)
+        position = header_size
+        for _, segments in columns:
+            file.write(bytes(_aligned(position) - position))
+            position = _aligned(position)
+            for segment in segments:
+                file.write(segment)
+                position += segment.nbytes
+
+
+class RunLog:
+    """
+    A run log file opened through a memory map.
+
+    Channels are returned as `memoryview` objects over the mapped file, so opening a log and slicing
+    one channel over a time window only reads the pages that hold those samples. Release the views
+    (or let them go out of scope) before closing the log.
+
+    Example:
+        from spike.runlog import RunLog
+
+        with RunLog('run.log') as log:
+            times, speeds = log.window('A.speed', 10.0, 12.5)
+            print(max(speeds))
+    """
+
+    def __init__(self, path):
+        """
+        Opens a run log.
+
+        Args:
+            path (str): The path of the file.
+
+        Raises:
+            ValueError: If the file is not a run log or was written with a different byte order.
+        """
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._columns = self._read_index()
+        except Exception:
+            self._mmap.close()
+            raise
+        self.channels = [name for name in self._columns if name != 'time']
+
+    def _read_index(self):
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError('not a run log')
+        magic, version, byte_order, columns, count, _ = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not a run log of version {}'.format(VERSION))
+        if byte_order != _BYTE_ORDER:
+            raise ValueError('the run log was written with a different byte order')
+        self._count = count
+        position = _HEADER.size
+        index = {}
+        for _ in range(columns):
+            length, = _NAME.unpack_from(self._mmap, position)
+            position += _NAME.size
+            name = self._mmap[position:position + length].decode('utf-8')
+            position += length
+            typecode, offset = _ENTRY.unpack_from(self._mmap, position)
+            position += _ENTRY.size
+            index[name] = (typecode.decode('ascii'), offset)
+        return index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        """
+        Closes the memory map.
+
+        Raises:
+            BufferError: If views returned by this log are still in use.
+        """
+        self._mmap.close()
+
+    @property
+    def times(self):
+        """
+        memoryview: The timestamps of all samples in seconds.
+        """
+        return self.channel('time')
+
+    def channel(self, name):
+        """
+        Retrieves all samples of a channel.
+
+        Args:
+            name (str): The name of the channel.
+
+        Returns:
+            memoryview: The samples, typed with the channel's type code.
+
+        Raises:
+            KeyError: If there is no channel with that name.
+        """
+        typecode, offset = self._columns[name]
+        size = struct.calcsize(typecode)
+        return memoryview(self._mmap)[offset:offset + self._count * size].cast(typecode)
+
+    def window(self, name, start, end):
+        """
+        Retrieves the samples of a channel within a time window.
+
+        The timestamps must be in ascending order, as they are when recorded.
+
+        Args:
+            name (str): The name of the channel.
+            start (float): The start of the window in seconds (inclusive).
+            end (float): The end of the window in seconds (exclusive).
+
+        Returns:
+            tuple of memoryview: The timestamps and the samples within the window.
+
+        Raises:
+            KeyError: If there is no channel with that name.
+        """
+        times = self.times
+        first = bisect.bisect_left(times, start)
+        last = bisect.bisect_left(times, end, first)
+        return times[first:last], self.channel(name)[first:last]
@@ -0,0 +1,1383 @@
+import asyncio
+import heapq
+import math
+
+from ._backend import activate, deactivate
+from .events import Dispatcher
+from .primehub import PORTS
+
+# Length of one simulation step in seconds.
+DEFAULT_TICK = 0.005
+
+# No-load speed of a motor running at 100% speed, in degrees per second.
+MAX_SPEED = 1050.0
+
+# Acceleration used by speed-controlled commands, in degrees per second squared.
+ACCELERATION = 10000.0
+
+# Deceleration of a motor that coasts to a stop, in degrees per second squared.
+COAST_DECELERATION = 2000.0
+
+# Time a blocked motor keeps trying before stall detection powers it off, in seconds.
+STALL_TIME = 2.0
+
+# Distance the driving base moves for one motor rotation, in cm (SPIKE Prime wheel, 5.6 cm diameter).
+DEFAULT_MOTOR_ROTATION = 17.6
+
+# Distance between the wheel contact points of the driving base, in cm.
+DEFAULT_AXLE_TRACK = 11.2
+
+STOP_ACTIONS = ('coast', 'brake', 'hold')
+DIRECTIONS = ('shortest path', 'clockwise', 'counterclockwise')
+UNITS = ('cm', 'in', 'rotations', 'degrees', 'seconds')
+COLORS = ('black', 'violet', 'blue', 'cyan', 'green', 'yellow', 'red', 'white', None)
+GESTURES = ('shaken', 'tapped', 'doubletapped', 'falling')
+ORIENTATIONS = ('front', 'back', 'up', 'down', 'leftside', 'rightside')
+STATUS_LIGHT_COLORS = ('azure', 'black', 'blue', 'cyan', 'green', 'orange', 'pink', 'red', 'violet',
+                       'yellow', 'white')
+
+# Duration of a sound played by `App.play_sound()` when no duration is configured, in seconds.
+DEFAULT_SOUND_DURATION = 1.0
+
+# How many rounds of the event loop the async driver lets pass at most before it advances the clock.
+# A coroutine needs one round per task it awaits through to issue its next command.
+SETTLE_ROUNDS = 100
+
+
+def _clamp(value, low=-100, high=100):
+    return max(low, min(high, value))
+
+
+def _sign(value):
+    return int(value > 0) - int(value < 0)
+
+
+def _wrap_angle(degrees):
+    return int(round((degrees + 180) % 360 - 180))
+
+
+class Simulation:
+    """
+    A fixed-timestep simulation of a SPIKE Prime Hub and the devices connected to it.
+
+    While a simulation is active, `Motor` and `MotorPair` commands drive simulated motors instead
+    of doing nothing, and their measurements (`get_speed()`, `get_position()`,
+    `get_degrees_counted()`) report the simulated state. Blocking commands such as
+    `Motor.run_for_degrees()` advance the simulation tick by tick until they finish, so they take
+    simulated time rather than wall-clock time.
+
+    The simulation keeps a virtual clock. Whenever no motor is moving, a blocking call such as
+    `Button.wait_until_pressed()` or `Speaker.beep()` jumps the clock straight to the next
+    scheduled event or to the end of the wait instead of stepping through the ticks in between.
+    Events such as button presses, gestures or color changes are scheduled with `at()` and
+    `after()`.
+
+    Example:
+        from spike import Motor, PrimeHub, Simulation
+
+        with Simulation() as sim:
+            hub = PrimeHub()
+            motor = Motor('A')
+            sim.at(5, sim.button('left').press)
+            hub.left_button.wait_until_pressed()
+            motor.run_for_seconds(2, 50)
+            print(f"{sim.time} s, {motor.get_degrees_counted()} degrees")
+    """
+
+    def __init__(self, tick=DEFAULT_TICK, time_limit=None):
+        """
+        Initializes the Simulation.
+
+        Args:
+            tick (float, optional): The length of one simulation step in seconds. Defaults to 0.005.
+            time_limit (float, optional): The simulated time in seconds after which a blocking command
+                raises RuntimeError instead of waiting forever. Defaults to no limit.
+
+        Raises:
+            ValueError: If `tick` is not positive.
+        """
+        if tick <= 0:
+            raise ValueError('tick must be positive')
+        self.tick = tick
+        self.time_limit = time_limit
+        self.ticks = 0
+        self._motors = {}
+        self._motor_pairs = {}
+        self._color_sensors = {}
+        self._buttons = {}
+        self._speaker = None
+        self._light_matrix = None
+        self._status_light = None
+        self._motion_sensor = None
+        self._app = None
+        self.dispatcher = Dispatcher()
+        self._stepped = ()
+        self._bases = ()
+        self._events = []
+        self._foreground = 0
+        self._sequence = 0
+        self._waiters = []
+        self._driver = None
+        self._token = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @property
+    def time(self):
+        """
+        float: The simulated time in seconds since the simulation was created.
+        """
+        return self.ticks * self.tick
+
+    def start(self):
+        """
+        Makes this simulation the backend of all device objects.
+
+        Returns:
+            Simulation: The simulation itself.
+        """
+        self._token = activate(self)
+        return self
+
+    def stop(self):
+        """
+        Deactivates the simulation and restores the previously active backend.
+        """
+        deactivate(self, self._token)
+        self._token = None
+
+    # Devices
+
+    def motor(self, port):
+        """
+        Retrieves the simulated motor on a port, creating it on first use.
+
+        Args:
+            port (str): The port of the motor ('A'-'F').
+
+        Returns:
+            SimulatedMotor: The simulated motor.
+        """
+        motor = self._motors.get(port)
+        if motor is None:
+            motor = self._motors[port] = SimulatedMotor(self, port)
+            self._stepped = tuple(self._motors.values())
+        return motor
+
+    def motor_pair(self, port_left, port_right):
+        """
+        Retrieves the simulated driving base for two ports, creating it on first use.
+
+        The simulation tracks the position of every driving base on the floor. The first one created
+        carries the hub, so its turns also change the yaw angle of the Motion Sensor.
+
+        Args:
+            port_left (str): The port of the left motor ('A'-'F').
+            port_right (str): The port of the right motor ('A'-'F').
+
+        Returns:
+            SimulatedMotorPair: The simulated driving base.
+
+        Raises:
+            ValueError: If both ports are the same.
+        """
+        key = (port_left, port_right)
+        pair = self._motor_pairs.get(key)
+        if pair is None:
+            if port_left == port_right:
+                raise ValueError('the motors of a pair must be on different ports')
+            pair = self._motor_pairs[key] = SimulatedMotorPair(self, port_left, port_right)
+            self._bases += (pair,)
+        return pair
+
+    def color_sensor(self, port):
+        """
+        Retrieves the simulated color sensor on a port, creating it on first use.
+
+        Args:
+            port (str): The port of the sensor ('A'-'F').
+
+        Returns:
+            SimulatedColorSensor: The simulated color sensor.
+        """
+        sensor = self._color_sensors.get(port)
+        if sensor is None:
+            sensor = self._color_sensors[port] = SimulatedColorSensor(self, port)
+        return sensor
+
+    def button(self, side):
+        """
+        Retrieves one of the simulated hub buttons.
+
+        Args:
+            side (str): The side of the button ('left' or 'right').
+
+        Returns:
+            SimulatedButton: The simulated button.
+        """
+        button = self._buttons.get(side)
+        if button is None:
+            button = self._buttons[side] = SimulatedButton(self, side)
+        return button
+
+    def speaker(self):
+        """
+        Returns:
+            SimulatedSpeaker: The simulated speaker of the hub.
+        """
+        if self._speaker is None:
+            self._speaker = SimulatedSpeaker(self)
+        return self._speaker
+
+    def light_matrix(self):
+        """
+        Returns:
+            SimulatedLightMatrix: The simulated Light Matrix of the hub.
+        """
+        if self._light_matrix is None:
+            self._light_matrix = SimulatedLightMatrix(self)
+        return self._light_matrix
+
+    def status_light(self):
+        """
+        Returns:
+            SimulatedStatusLight: The simulated Brick Status Light of the hub.
+        """
+        if self._status_light is None:
+            self._status_light = SimulatedStatusLight(self)
+        return self._status_light
+
+    def motion_sensor(self):
+        """
+        Returns:
+            SimulatedMotionSensor: The simulated Motion Sensor of the hub.
+        """
+        if self._motion_sensor is None:
+            self._motion_sensor = SimulatedMotionSensor(self)
+        return self._motion_sensor
+
+    def app(self):
+        """
+        Returns:
+            SimulatedApp: The simulated SPIKE App.
+        """
+        if self._app is None:
+            self._app = SimulatedApp(self)
+        return self._app
+
+    def snapshot(self):
+        """
+        Reads the state of the whole hub at the current time, as used by `PrimeHub.snapshot()`.
+
+        Returns:
+            tuple: The time, a tuple with one entry per port ('A'-'F') that is `('motor', readings)`,
+            `('color_sensor', readings)` or None, the yaw, pitch and roll angles, the orientation, and
+            whether the left and right buttons are pressed. The readings are those of the device's
+            `snapshot()`.
+        """
+        ports = []
+        for port in PORTS:
+            if port in self._motors:
+                ports.append(('motor', self._motors[port].snapshot()))
+            elif port in self._color_sensors:
+                ports.append(('color_sensor', self._color_sensors[port].snapshot()))
+            else:
+                ports.append(None)
+        return ((self.time, tuple(ports)) + self.motion_sensor().snapshot()
+                + (self.button('left').pressed, self.button('right').pressed))
+
+    # Events
+
+    def at(self, time, callback, *args, background=False):
+        """
+        Schedules a function to be called when the virtual clock reaches a point in time.
+
+        Events scheduled for the same time are called in the order they were scheduled.
+
+        Args:
+            time (float): The simulated time in seconds.
+            callback (callable): The function to call.
+            *args: The arguments passed to `callback`.
+            background (bool, optional): Whether the event only keeps something up to date, like the
+                samples of a `HeadingService`. A wait without a deadline fails once only background
+                events are scheduled and nothing moves. Defaults to False.
+
+        Example:
+            sim.at(2.5, sim.color_sensor('E').set_color, 'red')
+        """
+        self._sequence += 1
+        heapq.heappush(self._events, (time, self._sequence, callback, args, background))
+        if not background:
+            self._foreground += 1
+
+    def after(self, delay, callback, *args, background=False):
+        """
+        Schedules a function to be called after a delay in simulated time.
+
+        Args:
+            delay (float): The delay in seconds.
+            callback (callable): The function to call.
+            *args: The arguments passed to `callback`.
+            background (bool, optional): Whether the event only keeps something up to date; see
+                `at()`. Defaults to False.
+        """
+        self.at(self.time + delay, callback, *args, background=background)
+
+    def _emit(self, kind, source, value):
+        self.dispatcher.emit(kind, source, value, self.time)
+
+    def _fire_events(self):
+        events = self._events
+        now = self.time + 1e-9
+        while events and events[0][0] <= now:
+            _, _, callback, args, background = heapq.heappop(events)
+            if not background:
+                self._foreground -= 1
+            callback(*args)
+
+    # Time
+
+    def is_idle(self):
+        """
+        Returns:
+            bool: True if no simulated motor is moving or trying to move.
+        """
+        for motor in self._stepped:
+            if motor.speed or motor._target_speed:
+                return False
+        return True
+
+    def step(self, ticks=1):
+        """
+        Advances the simulation by a number of ticks.
+
+        Args:
+            ticks (int, optional): The number of ticks to advance. Defaults to 1.
+        """
+        dt = self.tick
+        motors = self._stepped
+        bases = self._bases
+        for _ in range(ticks):
+            for motor in motors:
+                motor._step(dt)
+            for base in bases:
+                base._step()
+            self.ticks += 1
+            if self._events:
+                self._fire_events()
+
+    def _advance(self, limit):
+        # Steps while something moves; otherwise jumps straight to the next event or to `limit`.
+        if not self.is_idle():
+            self.step()
+            return True
+        if self._events:
+            ticks = max(self.ticks + 1, int(math.ceil(self._events[0][0] / self.tick - 1e-9)))
+            if limit is not None:
+                ticks = min(ticks, limit)
+        elif limit is not None:
+            ticks = limit
+        else:
+            return False
+        self.ticks = ticks
+        self._fire_events()
+        return True
+
+    def run_for(self, seconds):
+        """
+        Advances the simulation by a duration.
+
+        Args:
+            seconds (float): The simulated time to advance, in seconds.
+        """
+        end = self.ticks + int(round(seconds / self.tick))
+        while self.ticks < end:
+            self._advance(end)
+
+    def sleep(self, seconds):
+        """
+        Blocks for a duration of simulated time, like `wait_for_seconds()` does on the hub.
+
+        Args:
+            seconds (float): The duration in seconds.
+
+        Raises:
+            RuntimeError: If the time limit of the simulation is reached first.
+        """
+        end = self.ticks + int(round(seconds / self.tick))
+        self._wait(lambda: self.ticks >= end, end)
+
+    def wait(self, done):
+        """
+        Advances the simulation until a condition holds.
+
+        Args:
+            done (callable): A function without arguments that returns True once the wait is over.
+
+        Raises:
+            RuntimeError: If the time limit of the simulation is reached first, or if nothing is moving
+                and no event is scheduled, so the condition could never become true.
+        """
+        self._wait(done, None)
+
+    def _stalled(self):
+        # Nothing moves and only background events, if any, are scheduled.
+        return not self._foreground and self.is_idle()
+
+    def _wait(self, done, end):
+        forever = end is None
+        limit = self.time_limit
+        if limit is not None:
+            limit_ticks = int(math.ceil(limit / self.tick - 1e-9))
+            end = limit_ticks if end is None else min(end, limit_ticks)
+        while not done():
+            if limit is not None and self.time >= limit:
+                raise RuntimeError('simulation time limit of {} s reached'.format(limit))
+            if forever and self._stalled() or not self._advance(end):
+                raise RuntimeError('nothing is scheduled in the simulation, the wait would never end')
+
+    async def sleep_async(self, seconds):
+        """
+        Suspends the calling coroutine for a duration of simulated time.
+
+        Args:
+            seconds (float): The duration in seconds.
+
+        Raises:
+            RuntimeError: If the time limit of the simulation is reached first.
+        """
+        end = self.ticks + int(round(seconds / self.tick))
+        await self._suspend(lambda: self.ticks >= end, end)
+
+    async def wait_async(self, done):
+        """
+        Suspends the calling coroutine until a condition holds.
+
+        All coroutines waiting on the simulation share one driver task. It advances the virtual
+        clock only after every coroutine it resumed has had the chance to issue its next command,
+        so concurrent coroutines observe one consistent simulated time.
+
+        Args:
+            done (callable): A function without arguments that returns True once the wait is over.
+
+        Raises:
+            RuntimeError: If the time limit of the simulation is reached first, or if nothing is moving
+                and no event is scheduled, so the condition could never become true.
+        """
+        if not done():
+            await self._suspend(done, None)
+
+    def _suspend(self, done, end):
+        future = asyncio.get_event_loop().create_future()
+        self._waiters.append((done, end, future))
+        if self._driver is None or self._driver.done():
+            self._driver = asyncio.ensure_future(self._drive())
+        return future
+
+    async def _drive(self):
+        waiters = self._waiters
+        limit = self.time_limit
+        limit_ticks = None if limit is None else int(math.ceil(limit / self.tick - 1e-9))
+        # The default event loops keep the callbacks due in the next round in `_ready`.
+        ready = getattr(asyncio.get_event_loop(), '_ready', None)
+        resumed = False
+        while waiters:
+            # Coroutines just resumed may await through further tasks before they issue their next
+            # command, so the clock stays put until nothing else is ready to run.
+            for _ in range(SETTLE_ROUNDS if resumed else 1):
+                await asyncio.sleep(0)
+                if ready is not None and not ready:
+                    break
+            pending = []
+            resumed = False
+            for waiter in waiters:
+                done, end, future = waiter
+                if future.done():
+                    continue
+                try:
+                    finished = done()
+                except Exception as error:
+                    future.set_exception(error)
+                    continue
+                if finished:
+                    future.set_result(None)
+                    resumed = True
+                else:
+                    pending.append(waiter)
+            waiters[:] = pending
+            if resumed or not pending:
+                continue
+            ends = [end for _, end, _ in pending if end is not None]
+            stalled = not ends and self._stalled()
+            if limit_ticks is not None:
+                ends.append(limit_ticks)
+            if limit is not None and self.time >= limit:
+                error = RuntimeError('simulation time limit of {} s reached'.format(limit))
+            elif stalled or not self._advance(min(ends) if ends else None):
+                error = RuntimeError('nothing is scheduled in the simulation, the wait would never end')
+            else:
+                continue
+            for _, _, future in pending:
+                future.set_exception(error)
+            waiters[:] = []
+
+
+class SimulatedMotor:
+    """
+    The simulated state of the motor on one port.
+
+    The motor accelerates towards its target speed with a fixed acceleration and integrates its
+    angle on every tick. Set `blocked` to True to hold the motor shaft, which lets stall
+    detection interrupt the running command after two seconds.
+    """
+
+    def __init__(self, sim, port):
+        self.sim = sim
+        self.port = port
+        self.angle = 0.0
+        self.speed = 0.0
+        self.blocked = False
+        self.busy = False
+        self.default_speed = 100
+        self.stop_action = 'coast'
+        self.stall_detection = True
+        self._offset = 0.0
+        self._target_speed = 0.0
+        self._acceleration = ACCELERATION
+        self._goal = None
+        self._remaining = None
+        self._command_stop_action = None
+        self._blocked_time = 0.0
+        self._stalled = False
+        self._interrupted = False
+
+    def is_idle(self):
+        """
+        Returns:
+            bool: True if no blocking command is running on the motor.
+        """
+        return not self.busy
+
+    # Commands
+
+    def _run(self, speed, acceleration=ACCELERATION):
+        self._goal = None
+        self._remaining = None
+        self.busy = False
+        self._target_speed = _clamp(speed) * MAX_SPEED / 100
+        self._acceleration = acceleration
+
+    def _move_to(self, goal, speed, stop_action=None, acceleration=ACCELERATION):
+        direction = _sign(goal - self.angle)
+        if direction == 0 or speed == 0:
+            return
+        self._run(direction * abs(speed), acceleration)
+        self._goal = goal
+        self._command_stop_action = stop_action
+        self.busy = True
+
+    def _run_timed(self, seconds, speed, stop_action=None, acceleration=ACCELERATION):
+        if seconds <= 0:
+            return
+        self._run(speed, acceleration)
+        self._remaining = seconds
+        self._command_stop_action = stop_action
+        self.busy = True
+
+    def _halt(self, stop_action=None):
+        self._goal = None
+        self._remaining = None
+        self.busy = False
+        self._target_speed = 0.0
+        if (stop_action or self.stop_action) == 'coast':
+            self._acceleration = COAST_DECELERATION
+        else:
+            self._acceleration = ACCELERATION
+            self.speed = 0.0
+
+    def _finish(self):
+        self._halt(self._command_stop_action)
+        self._command_stop_action = None
+
+    def _command_to_position(self, degrees, direction, speed):
+        if direction not in DIRECTIONS:
+            raise ValueError('direction must be one of {}'.format(DIRECTIONS))
+        if not 0 <= degrees <= 359:
+            raise ValueError('degrees must be within 0-359')
+        clockwise = (degrees - self.get_position()) % 360
+        counterclockwise = clockwise - 360 if clockwise else 0
+        if direction == 'clockwise':
+            delta = clockwise
+        elif direction == 'counterclockwise':
+            delta = counterclockwise
+        else:
+            delta = clockwise if clockwise <= 180 else counterclockwise
+        self._move_to(round(self.angle) + delta, self._speed(speed))
+
+    def _command_for_degrees(self, degrees, speed):
+        speed = self._speed(speed)
+        self._move_to(self.angle + abs(degrees) * _sign(degrees) * _sign(speed), speed)
+
+    def _step(self, dt):
+        if self.blocked:
+            self.speed = 0.0
+            if self._target_speed:
+                self._blocked_time += dt
+                if self.stall_detection and self._blocked_time >= STALL_TIME:
+                    interrupted = self.busy
+                    self._stalled = True
+                    if interrupted:
+                        self._interrupted = True
+                    self._blocked_time = 0.0
+                    self._halt('brake')
+                    self.sim._emit('stalled', self.port, True)
+                    if interrupted:
+                        self.sim._emit('interrupted', self.port, True)
+            return
+        self._blocked_time = 0.0
+        speed = self.speed
+        target = self._target_speed
+        if speed != target:
+            limit = self._acceleration * dt
+            if target - speed > limit:
+                speed += limit
+            elif speed - target > limit:
+                speed -= limit
+            else:
+                speed = target
+            self.speed = speed
+        if speed:
+            angle = self.angle + speed * dt
+            goal = self._goal
+            if goal is not None and (angle - goal) * self._target_speed >= 0:
+                # Positioned moves end on their goal, held there whatever the stop action.
+                self.angle = goal
+                self.speed = 0.0
+                self._finish()
+                return
+            self.angle = angle
+        if self._remaining is not None:
+            self._remaining -= dt
+            if self._remaining <= 1e-9:
+                self._finish()
+
+    # Actions
+
+    def run_to_position(self, degrees, direction='shortest path', speed=None):
+        self._command_to_position(degrees, direction, speed)
+        self.sim.wait(self.is_idle)
+
+    def run_to_degrees_counted(self, degrees, speed=None):
+        self._move_to(degrees + self._offset, self._speed(speed))
+        self.sim.wait(self.is_idle)
+
+    def run_for_degrees(self, degrees, speed=None):
+        self._command_for_degrees(degrees, speed)
+        self.sim.wait(self.is_idle)
+
+    def run_for_rotations(self, rotations, speed=None):
+        self.run_for_degrees(rotations * 360, speed)
+
+    def run_for_seconds(self, seconds, speed=None):
+        self._run_timed(seconds, self._speed(speed))
+        self.sim.wait(self.is_idle)
+
+    def start(self, speed=None):
+        self._run(self._speed(speed))
+
+    def stop(self):
+        self._halt()
+
+    def start_at_power(self, power):
+        self._run(power)
+
+    # Measurements
+
+    def get_speed(self):
+        return int(round(self.speed * 100 / MAX_SPEED))
+
+    def get_position(self):
+        return int(round(self.angle)) % 360
+
+    def get_degrees_counted(self):
+        return int(round(self.angle - self._offset))
+
+    def get_default_speed(self):
+        return self.default_speed
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: The speed, position and degrees counted, as returned by their getters.
+        """
+        return (self.get_speed(), self.get_position(), self.get_degrees_counted())
+
+    # Events
+
+    def was_interrupted(self):
+        interrupted, self._interrupted = self._interrupted, False
+        return interrupted
+
+    def was_stalled(self):
+        stalled, self._stalled = self._stalled, False
+        return stalled
+
+    # Settings
+
+    def set_degrees_counted(self, degrees_counted):
+        self._offset = self.angle - degrees_counted
+
+    def set_default_speed(self, default_speed):
+        self.default_speed = _clamp(default_speed)
+
+    def set_stop_action(self, action):
+        if action not in STOP_ACTIONS:
+            raise ValueError('action must be one of {}'.format(STOP_ACTIONS))
+        self.stop_action = action
+
+    def set_stall_detection(self, stop_when_stalled):
+        self.stall_detection = bool(stop_when_stalled)
+
+    # Awaitables
+
+    async def run_to_position_async(self, degrees, direction='shortest path', speed=None):
+        self._command_to_position(degrees, direction, speed)
+        await self.sim.wait_async(self.is_idle)
+
+    async def run_to_degrees_counted_async(self, degrees, speed=None):
+        self._move_to(degrees + self._offset, self._speed(speed))
+        await self.sim.wait_async(self.is_idle)
+
+    async def run_for_degrees_async(self, degrees, speed=None):
+        self._command_for_degrees(degrees, speed)
+        await self.sim.wait_async(self.is_idle)
+
+    async def run_for_rotations_async(self, rotations, speed=None):
+        await self.run_for_degrees_async(rotations * 360, speed)
+
+    async def run_for_seconds_async(self, seconds, speed=None):
+        self._run_timed(seconds, self._speed(speed))
+        await self.sim.wait_async(self.is_idle)
+
+    def _speed(self, speed):
+        return _clamp(self.default_speed if speed is None else speed)
+
+
+class SimulatedMotorPair:
+    """
+    The simulated state of a driving base made of two simulated motors.
+
+    As on the hub, the left motor is mirrored: driving forward turns it counterclockwise, so its
+    degrees counted decrease while the right motor's increase.
+
+    The base keeps track of where its wheels have taken it: `x` and `y` in cm from where it started,
+    with x pointing forward at the start, and `heading` in radians, counterclockwise. Set
+    `axle_track`, the distance between the wheels in cm, to match the robot.
+    """
+
+    def __init__(self, sim, port_left, port_right):
+        self.sim = sim
+        self.left = sim.motor(port_left)
+        self.right = sim.motor(port_right)
+        self.motor_rotation = DEFAULT_MOTOR_ROTATION
+        self.axle_track = DEFAULT_AXLE_TRACK
+        self.default_speed = 100
+        self.stop_action = 'brake'
+        self.x = 0.0
+        self.y = 0.0
+        self.heading = 0.0
+        self._left_angle = self.left.angle
+        self._right_angle = self.right.angle
+
+    def is_idle(self):
+        """
+        Returns:
+            bool: True if neither motor is running a blocking command.
+        """
+        return not (self.left.busy or self.right.busy)
+
+    def _step(self):
+        # Moves the base on the floor by the distance its wheels turned since the last tick.
+        left = self.left.angle
+        right = self.right.angle
+        if left == self._left_angle and right == self._right_angle:
+            return
+        scale = self.motor_rotation / 360
+        left_distance = (self._left_angle - left) * scale
+        right_distance = (right - self._right_angle) * scale
+        self._left_angle = left
+        self._right_angle = right
+        turn = (right_distance - left_distance) / self.axle_track
+        direction = self.heading + turn / 2
+        distance = (left_distance + right_distance) / 2
+        self.x += distance * math.cos(direction)
+        self.y += distance * math.sin(direction)
+        self.heading += turn
+        if self.sim._bases[0] is self:
+            # The yaw angle grows when the hub turns clockwise.
+            self.sim.motion_sensor().yaw -= math.degrees(turn)
+
+    def _command_tank(self, amount, unit, left_speed, right_speed):
+        if unit not in UNITS:
+            raise ValueError('unit must be one of {}'.format(UNITS))
+        left_speed = -_clamp(left_speed)
+        right_speed = _clamp(right_speed)
+        lead = max(abs(left_speed), abs(right_speed))
+        if lead == 0:
+            return
+        if unit == 'seconds':
+            for motor, speed in ((self.left, left_speed), (self.right, right_speed)):
+                motor._run_timed(amount, speed, self.stop_action, ACCELERATION * abs(speed) / lead)
+            return
+        if unit == 'cm':
+            degrees = amount / self.motor_rotation * 360
+        elif unit == 'in':
+            degrees = amount * 2.54 / self.motor_rotation * 360
+        elif unit == 'rotations':
+            degrees = amount * 360
+        else:
+            degrees = amount
+        for motor, speed in ((self.left, left_speed), (self.right, right_speed)):
+            # Scaling the travel and the acceleration keeps both wheels on the same timeline.
+            share = abs(speed) / lead
+            motor._move_to(motor.angle + degrees * share * _sign(speed), speed,
+                           self.stop_action, ACCELERATION * share)
+
+    def _tank_speeds(self, steering, speed):
+        speed = self._speed(speed)
+        steering = _clamp(steering)
+        if steering >= 0:
+            return speed, speed * (100 - 2 * steering) / 100
+        return speed * (100 + 2 * steering) / 100, speed
+
+    # Actions
+
+    def move(self, amount, unit='cm', steering=0, speed=None):
+        self._command_tank(amount, unit, *self._tank_speeds(steering, speed))
+        self.sim.wait(self.is_idle)
+
+    def start(self, steering=0, speed=None):
+        self.start_tank(*self._tank_speeds(steering, speed))
+
+    def stop(self):
+        self.left._halt(self.stop_action)
+        self.right._halt(self.stop_action)
+
+    def move_tank(self, amount, unit='cm', left_speed=None, right_speed=None):
+        self._command_tank(amount, unit, self._speed(left_speed), self._speed(right_speed))
+        self.sim.wait(self.is_idle)
+
+    def start_tank(self, left_speed, right_speed):
+        self.left._run(-_clamp(left_speed))
+        self.right._run(_clamp(right_speed))
+
+    def start_at_power(self, power, steering=0):
+        self.start_tank_at_power(*self._tank_speeds(steering, power))
+
+    def start_tank_at_power(self, left_power, right_power):
+        self.left._run(-_clamp(left_power))
+        self.right._run(_clamp(right_power))
+
+    # Measurements
+
+    def get_default_speed(self):
+        return self.default_speed
+
+    # Settings
+
+    def set_motor_rotation(self, amount, unit='cm'):
+        if unit not in ('cm', 'in'):
+            raise ValueError("unit must be 'cm' or 'in'")
+        self.motor_rotation = amount * 2.54 if unit == 'in' else amount
+
+    def set_default_speed(self, speed):
+        self.default_speed = _clamp(speed)
+
+    def set_stop_action(self, action):
+        if action not in STOP_ACTIONS:
+            raise ValueError('action must be one of {}'.format(STOP_ACTIONS))
+        self.stop_action = action
+
+    # Awaitables
+
+    async def move_async(self, amount, unit='cm', steering=0, speed=None):
+        self._command_tank(amount, unit, *self._tank_speeds(steering, speed))
+        await self.sim.wait_async(self.is_idle)
+
+    async def move_tank_async(self, amount, unit='cm', left_speed=None, right_speed=None):
+        self._command_tank(amount, unit, self._speed(left_speed), self._speed(right_speed))
+        await self.sim.wait_async(self.is_idle)
+
+    def _speed(self, speed):
+        return _clamp(self.default_speed if speed is None else speed)
+
+
+class SimulatedColorSensor:
+    """
+    The simulated state of the color sensor on one port.
+
+    Use `set_color()` to place the sensor over a surface, for example from a scheduled event.
+    """
+
+    # Typical reflected light (%) and red, green and blue intensities (0 to 1024) over each color.
+    SURFACES = {
+        'black': (5, (40, 40, 40)),
+        'violet': (35, (300, 180, 420)),
+        'blue': (30, (80, 200, 520)),
+        'cyan': (60, (180, 560, 700)),
+        'green': (30, (120, 400, 200)),
+        'yellow': (85, (900, 800, 250)),
+        'red': (55, (700, 120, 100)),
+        'white': (100, (1000, 1000, 1000)),
+        None: (0, (0, 0, 0)),
+    }
+
+    def __init__(self, sim, port):
+        self.sim = sim
+        self.port = port
+        self.color = None
+        self.reflected_light = 0
+        self.ambient_light = 0
+        self.rgb = (0, 0, 0)
+        self.lights = (0, 0, 0)
+        self._reported_color = self
+
+    def set_color(self, color, reflected_light=None, rgb=None):
+        """
+        Places the sensor over a surface of the given color.
+
+        Args:
+            color (str or None): The detected color.
+            reflected_light (int, optional): The reflected light (0 to 100%). Defaults to a typical value for `color`.
+            rgb (tuple of int, optional): The red, green and blue intensities (0 to 1024).
+                Defaults to typical values for `color`.
+
+        Raises:
+            ValueError: If `color` is not one of the allowed values.
+        """
+        if color not in COLORS:
+            raise ValueError('color must be one of {}'.format(COLORS))
+        surface = self.SURFACES[color]
+        changed = color != self.color
+        self.color = color
+        self.reflected_light = surface[0] if reflected_light is None else reflected_light
+        self.rgb = surface[1] if rgb is None else tuple(rgb)
+        if changed:
+            self.sim._emit('color', self.port, color)
+
+    # Measurements
+
+    def get_color(self):
+        return self.color
+
+    def get_ambient_light(self):
+        return self.ambient_light
+
+    def get_reflected_light(self):
+        return self.reflected_light
+
+    def get_rgb_intensity(self):
+        red, green, blue = self.rgb
+        return (red, green, blue, (red + green + blue) // 3)
+
+    def get_red(self):
+        return self.rgb[0]
+
+    def get_green(self):
+        return self.rgb[1]
+
+    def get_blue(self):
+        return self.rgb[2]
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: The color, ambient light, reflected light, and the red, green and blue
+            intensities followed by their overall intensity, as returned by their getters.
+        """
+        return (self.color, self.ambient_light, self.reflected_light) + self.get_rgb_intensity()
+
+    # Events
+
+    def wait_until_color(self, color):
+        self.sim.wait(self._color_is(color))
+
+    def wait_for_new_color(self):
+        self.sim.wait(self._new_color)
+        return self._report_color()
+
+    def _color_is(self, color):
+        if color not in COLORS:
+            raise ValueError('color must be one of {}'.format(COLORS))
+        return lambda: self.color == color
+
+    def _new_color(self):
+        return self.color != self._reported_color
+
+    def _report_color(self):
+        self._reported_color = self.color
+        return self.color
+
+    # Actions
+
+    def light_up_all(self, brightness=100):
+        self.light_up(brightness, brightness, brightness)
+
+    def light_up(self, light_1=100, light_2=100, light_3=100):
+        for brightness in (light_1, light_2, light_3):
+            if not 0 <= brightness <= 100:
+                raise ValueError('brightness must be between 0 and 100')
+        self.lights = (light_1, light_2, light_3)
+
+    # Awaitables
+
+    async def wait_until_color_async(self, color):
+        await self.sim.wait_async(self._color_is(color))
+
+    async def wait_for_new_color_async(self):
+        await self.sim.wait_async(self._new_color)
+        return self._report_color()
+
+
+class SimulatedButton:
+    """
+    The simulated state of one of the hub buttons.
+
+    Use `press()`, `release()` and `click()` to operate the button, for example from a scheduled event.
+    """
+
+    def __init__(self, sim, side):
+        self.sim = sim
+        self.side = side
+        self.pressed = False
+        self._was_pressed = False
+
+    def press(self):
+        """
+        Presses the button.
+        """
+        if not self.pressed:
+            self.pressed = True
+            self._was_pressed = True
+            self.sim._emit('pressed', self.side, True)
+
+    def release(self):
+        """
+        Releases the button.
+        """
+        if self.pressed:
+            self.pressed = False
+            self.sim._emit('released', self.side, False)
+
+    def click(self, seconds=0.1):
+        """
+        Presses the button and schedules its release.
+
+        Args:
+            seconds (float, optional): How long the button is held down, in seconds. Defaults to 0.1.
+        """
+        self.press()
+        self.sim.after(seconds, self.release)
+
+    # Events
+
+    def wait_until_pressed(self):
+        self.sim.wait(lambda: self.pressed)
+
+    def wait_until_released(self):
+        self.sim.wait(lambda: not self.pressed)
+
+    def was_pressed(self):
+        was_pressed, self._was_pressed = self._was_pressed, False
+        return was_pressed
+
+    # Measurements
+
+    def is_pressed(self):
+        return self.pressed
+
+    # Awaitables
+
+    async def wait_until_pressed_async(self):
+        await self.sim.wait_async(lambda: self.pressed)
+
+    async def wait_until_released_async(self):
+        await self.sim.wait_async(lambda: not self.pressed)
+
+
+class SimulatedSpeaker:
+    """
+    The simulated state of the hub speaker. `note` holds the note being played, or None.
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.volume = 100
+        self.note = None
+
+    # Actions
+
+    def beep(self, note=60, seconds=0.2):
+        self.start_beep(note)
+        self.sim.sleep(seconds)
+        self.note = None
+
+    def start_beep(self, note=60):
+        if not 44 <= note <= 123:
+            raise ValueError('note must be within 44-123')
+        self.note = note
+
+    def stop(self):
+        self.note = None
+
+    # Measurements
+
+    def get_volume(self):
+        return self.volume
+
+    # Settings
+
+    def set_volume(self, volume):
+        self.volume = _clamp(volume, 0, 100)
+
+    # Awaitables
+
+    async def beep_async(self, note=60, seconds=0.2):
+        self.start_beep(note)
+        await self.sim.sleep_async(seconds)
+        self.note = None
+
+
+class SimulatedLightMatrix:
+    """
+    The simulated state of the Light Matrix: the brightness of the 25 pixels, row by row,
+    and the image or text shown last.
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.pixels = bytearray(25)
+        self.image = None
+        self.text = None
+
+    # Actions
+
+    def show_image(self, image, brightness=100):
+        self.image = image
+        self.text = None
+
+    def set_pixel(self, x, y, brightness=100):
+        if not (0 <= x <= 4 and 0 <= y <= 4):
+            raise ValueError('x and y must be within 0-4')
+        self.pixels[y * 5 + x] = _clamp(brightness, 0, 100)
+
+    def show(self, pixels):
+        if len(pixels) != 25:
+            raise ValueError('pixels must hold 25 values')
+        self.pixels[:] = bytes(min(value, 100) for value in pixels)
+        self.image = None
+        self.text = None
+
+    def write(self, text):
+        self.image = None
+        self.text = str(text)
+
+    def off(self):
+        self.pixels[:] = bytes(25)
+        self.image = None
+        self.text = None
+
+
+class SimulatedStatusLight:
+    """
+    The simulated state of the Brick Status Light. `color` is None while the light is off.
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.color = None
+
+    # Actions
+
+    def on(self, color='white'):
+        if color not in STATUS_LIGHT_COLORS:
+            raise ValueError('color must be one of {}'.format(STATUS_LIGHT_COLORS))
+        self.color = color
+
+    def off(self):
+        self.color = None
+
+
+class SimulatedMotionSensor:
+    """
+    The simulated state of the Motion Sensor.
+
+    Use `make_gesture()`, `set_orientation()` and `set_angles()` to move the hub,
+    for example from a scheduled event.
+
+    Set `drift` to make the measured yaw angle drift away from `yaw` by that many degrees per second
+    of simulated time, as the gyro of a real hub does.
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.yaw = 0.0
+        self.drift = 0.0
+        self.pitch = 0.0
+        self.roll = 0.0
+        self.orientation = 'front'
+        self.gesture = None
+        self._yaw_offset = 0.0
+        self._gestures = set()
+        self._reported_gesture = self
+        self._reported_orientation = self
+
+    def make_gesture(self, gesture):
+        """
+        Makes the hub detect a gesture.
+
+        Args:
+            gesture (str): 'shaken', 'tapped', 'doubletapped' or 'falling'.
+
+        Raises:
+            ValueError: If `gesture` is not one of the allowed values.
+        """
+        if gesture not in GESTURES:
+            raise ValueError('gesture must be one of {}'.format(GESTURES))
+        self.gesture = gesture
+        self._gestures.add(gesture)
+        self.sim._emit('gesture', gesture, gesture)
+
+    def set_orientation(self, orientation):
+        """
+        Turns the hub to an orientation.
+
+        Args:
+            orientation (str): 'front', 'back', 'up', 'down', 'leftside' or 'rightside'.
+
+        Raises:
+            ValueError: If `orientation` is not one of the allowed values.
+        """
+        if orientation not in ORIENTATIONS:
+            raise ValueError('orientation must be one of {}'.format(ORIENTATIONS))
+        if orientation != self.orientation:
+            self.orientation = orientation
+            self.sim._emit('orientation', 'motion_sensor', orientation)
+
+    def set_angles(self, yaw=None, pitch=None, roll=None):
+        """
+        Sets the angles of the hub in degrees. Angles that are None keep their value.
+        """
+        if yaw is not None:
+            self.yaw = yaw
+        if pitch is not None:
+            self.pitch = pitch
+        if roll is not None:
+            self.roll = roll
+
+    # Events
+
+    def was_gesture(self, gesture):
+        if gesture not in GESTURES + (None,):
+            raise ValueError('gesture must be one of {}'.format(GESTURES + (None,)))
+        if gesture is None:
+            occurred = not self._gestures
+        else:
+            occurred = gesture in self._gestures
+        self._gestures.discard(gesture)
+        return occurred
+
+    def wait_for_new_gesture(self):
+        self.sim.wait(self._new_gesture)
+        return self._report_gesture()
+
+    def wait_for_new_orientation(self):
+        self.sim.wait(self._new_orientation)
+        return self._report_orientation()
+
+    def _new_gesture(self):
+        return self.gesture is not None and self.gesture != self._reported_gesture
+
+    def _report_gesture(self):
+        self._reported_gesture = self.gesture
+        return self.gesture
+
+    def _new_orientation(self):
+        return self.orientation != self._reported_orientation
+
+    def _report_orientation(self):
+        self._reported_orientation = self.orientation
+        return self.orientation
+
+    # Measurements
+
+    def get_orientation(self):
+        return self.orientation
+
+    def get_gesture(self):
+        return self.gesture
+
+    def get_roll_angle(self):
+        return _wrap_angle(self.roll)
+
+    def get_pitch_angle(self):
+        return _wrap_angle(self.pitch)
+
+    def _measured_yaw(self):
+        return self.yaw + self.drift * self.sim.time
+
+    def get_yaw_angle(self):
+        return _wrap_angle(self._measured_yaw() - self._yaw_offset)
+
+    def snapshot(self):
+        """
+        Returns:
+            tuple: The yaw, pitch and roll angles and the orientation, as returned by their getters.
+        """
+        return (self.get_yaw_angle(), self.get_pitch_angle(), self.get_roll_angle(), self.orientation)
+
+    # Settings
+
+    def reset_yaw_angle(self):
+        self._yaw_offset = self._measured_yaw()
+
+    # Awaitables
+
+    async def wait_for_new_gesture_async(self):
+        await self.sim.wait_async(self._new_gesture)
+        return self._report_gesture()
+
+    async def wait_for_new_orientation_async(self):
+        await self.sim.wait_async(self._new_orientation)
+        return self._report_orientation()
+
+
+class SimulatedApp:
+    """
+    The simulated SPIKE App. `sound_durations` maps sound names to their length in seconds;
+    other sounds last one second.
+    """
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.sound = None
+        self.sound_durations = {}
+
+    def play_sound(self, name, volume=100):
+        self.sound = name
+        self.sim.sleep(self.sound_durations.get(name, DEFAULT_SOUND_DURATION))
+        self.sound = None
+
+    def start_sound(self, name, volume=100):
+        self.sound = name
+
+    # Awaitables
+
+    async def play_sound_async(self, name, volume=100):
+        self.sound = name
+        await self.sim.sleep_async(self.sound_durations.get(name, DEFAULT_SOUND_DURATION))
+        self.sound = None
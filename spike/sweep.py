@@ -0,0 +1,71 @@
+import multiprocessing
+import traceback
+from collections import namedtuple
+
+from .primehub import PrimeHub
+from .simulation import DEFAULT_TICK, Simulation
+
+SweepResult = namedtuple('SweepResult', ['index', 'params', 'value', 'time', 'error'])
+SweepResult.__doc__ = """
+The outcome of one simulated run of a sweep.
+
+Attributes:
+    index (int): The position of the run's parameters in the sweep.
+    params (object): The parameters the program was called with.
+    value (object): The value returned by the program, or None if it raised an exception.
+    time (float): The simulated time the run took, in seconds.
+    error (str or None): The formatted traceback if the program raised an exception, otherwise None.
+"""
+
+
+def _run(job):
+    program, index, params, tick, time_limit = job
+    with Simulation(tick, time_limit) as sim:
+        try:
+            value = program(PrimeHub(), params)
+        except Exception:
+            return SweepResult(index, params, None, sim.time, traceback.format_exc())
+    return SweepResult(index, params, value, sim.time, None)
+
+
+def sweep(program, params, processes=None, tick=DEFAULT_TICK, time_limit=None):
+    """
+    Runs a program once per parameter set, each time in a fresh simulation, spread over a process pool.
+
+    The program is called as `program(hub, params)` with a new `PrimeHub` inside a new `Simulation`,
+    so the `Motor`, `MotorPair` and `ColorSensor` objects it creates start from a clean state in
+    every run. Runs are independent, so they are handed to the worker processes one by one and the
+    results are yielded as soon as each run finishes, not in the order of `params`.
+
+    The program must be picklable, i.e. defined at the top level of a module.
+
+    Args:
+        program (callable): The program to run, taking the hub and one parameter set.
+        params (iterable): The parameter sets, one per run.
+        processes (int, optional): The number of worker processes. Defaults to the number of CPUs.
+            With 1, the runs happen in the calling process.
+        tick (float, optional): The length of one simulation step in seconds. Defaults to 0.005.
+        time_limit (float, optional): The simulated time after which a run fails. Defaults to no limit.
+
+    Yields:
+        SweepResult: The result of each run, in order of completion.
+
+    Example:
+        from spike import MotorPair
+        from spike.sweep import sweep
+
+        def program(hub, speed):
+            MotorPair('B', 'C').move(50, 'cm', speed=speed)
+
+        if __name__ == '__main__':
+            for result in sweep(program, range(10, 101, 10)):
+                print(f"speed {result.params}: {result.time:.2f} s")
+    """
+    jobs = ((program, index, item, tick, time_limit) for index, item in enumerate(params))
+    if processes == 1:
+        for job in jobs:
+            yield _run(job)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap_unordered(_run, jobs):
+            yield result
@@ -0,0 +1,194 @@
+from array import array
+
+from ._backend import get_time
+from .runlog import write_run_log
+
+
+class Telemetry:
+    """
+    Records readings of motors and sensors into fixed-size ring buffers.
+
+    Every channel is stored in a preallocated `array` of its own type code, next to a shared
+    column of timestamps, so recording never allocates and the memory use is fixed by `capacity`.
+    Once the buffers are full, the oldest samples are overwritten.
+
+    Inside a simulation the timestamps are simulated time, otherwise they come from a monotonic clock.
+
+    Example:
+        from spike import ColorSensor, Motor, PrimeHub
+        from spike.telemetry import Telemetry
+
+        hub = PrimeHub()
+        telemetry = Telemetry(capacity=10000)
+        telemetry.add_motor(Motor('A'))
+        telemetry.add_color_sensor(ColorSensor('E'))
+        telemetry.add_motion_sensor(hub.motion_sensor)
+
+        for _ in range(1000):
+            telemetry.sample()
+
+        telemetry.save('run.log')
+    """
+
+    def __init__(self, capacity=4096):
+        """
+        Initializes the Telemetry.
+
+        Args:
+            capacity (int, optional): The number of samples kept per channel. Defaults to 4096.
+
+        Raises:
+            ValueError: If `capacity` is not positive.
+        """
+        if capacity <= 0:
+            raise ValueError('capacity must be positive')
+        self.capacity = capacity
+        self.channels = []
+        self._times = array('d', bytes(8 * capacity))
+        self._buffers = {}
+        self._sources = ()
+        self._index = 0
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    # Channels
+
+    def add_channel(self, name, getter, typecode='d'):
+        """
+        Adds a channel that records the values returned by a function.
+
+        Args:
+            name (str): The name of the channel.
+            getter (callable): A function without arguments that returns the current value.
+            typecode (str, optional): The `array` type code of the values. Defaults to 'd'.
+
+        Raises:
+            ValueError: If a channel with the same name exists.
+            RuntimeError: If samples have already been recorded.
+        """
+        if name in self._buffers:
+            raise ValueError('channel {} already exists'.format(name))
+        if self._count:
+            raise RuntimeError('channels must be added before the first sample')
+        buffer = array(typecode, bytes(array(typecode).itemsize * self.capacity))
+        self.channels.append(name)
+        self._buffers[name] = buffer
+        self._sources += ((buffer, getter),)
+
+    def add_motor(self, motor):
+        """
+        Adds the speed and degrees counted of a motor as channels '<port>.speed' and '<port>.degrees_counted'.
+
+        Args:
+            motor (Motor): The motor to record.
+        """
+        self.add_channel(motor.port + '.speed', motor.get_speed, 'b')
+        self.add_channel(motor.port + '.degrees_counted', motor.get_degrees_counted, 'i')
+
+    def add_color_sensor(self, color_sensor):
+        """
+        Adds the reflected light of a color sensor as channel '<port>.reflected_light'.
+
+        Args:
+            color_sensor (ColorSensor): The color sensor to record.
+        """
+        self.add_channel(color_sensor.port + '.reflected_light', color_sensor.get_reflected_light, 'B')
+
+    def add_motion_sensor(self, motion_sensor):
+        """
+        Adds the yaw angle of the Motion Sensor as channel 'yaw_angle'.
+
+        Args:
+            motion_sensor (MotionSensor): The motion sensor to record.
+        """
+        self.add_channel('yaw_angle', motion_sensor.get_yaw_angle, 'h')
+
+    # Recording
+
+    def sample(self, timestamp=None):
+        """
+        Records the current value of every channel.
+
+        Args:
+            timestamp (float, optional): The time of the sample in seconds. Defaults to the current time.
+        """
+        index = self._index
+        self._times[index] = get_time() if timestamp is None else timestamp
+        for buffer, getter in self._sources:
+            buffer[index] = getter()
+        index += 1
+        self._index = 0 if index == self.capacity else index
+        self._count += 1
+
+    def clear(self):
+        """
+        Discards all recorded samples.
+        """
+        self._index = 0
+        self._count = 0
+
+    # Reading
+
+    def times(self):
+        """
+        Retrieves the timestamps of the recorded samples, oldest first.
+
+        Returns:
+            array: The timestamps in seconds.
+        """
+        return self._ordered(self._times)
+
+    def channel(self, name):
+        """
+        Retrieves the recorded values of a channel, oldest first.
+
+        Args:
+            name (str): The name of the channel.
+
+        Returns:
+            array: The recorded values.
+
+        Raises:
+            KeyError: If there is no channel with that name.
+        """
+        return self._ordered(self._buffers[name])
+
+    def dump(self, file):
+        """
+        Writes the recorded samples to a binary file, oldest first, without copying the buffers.
+
+        The timestamps are written first, followed by each channel in the order they were added,
+        all in native byte order. Every column holds `len(self)` values.
+
+        Args:
+            file (file object): A file opened in binary write mode.
+        """
+        for buffer in (self._times,) + tuple(self._buffers[name] for name in self.channels):
+            for view in self._views(buffer):
+                file.write(view)
+
+    def save(self, path):
+        """
+        Writes the recorded samples to a run log file, oldest first, without copying the buffers.
+
+        Open the file with `spike.runlog.RunLog` to read single channels through a memory map.
+
+        Args:
+            path (str): The path of the file to write.
+        """
+        write_run_log(path, self._views(self._times),
+                      [(name, self._views(self._buffers[name])) for name in self.channels])
+
+    def _views(self, buffer):
+        view = memoryview(buffer)
+        if self._count <= self.capacity:
+            return (view[:self._count],)
+        return (view[self._index:], view[:self._index])
+
+    def _ordered(self, buffer):
+        ordered = array(buffer.typecode)
+        for view in self._views(buffer):
+            ordered.frombytes(view.cast('B'))
+        return ordered
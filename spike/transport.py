@@ -0,0 +1,613 @@
+import asyncio
+import socket
+import struct
+import threading
+
+from ._backend import activate, deactivate
+
+# How often `Connection.wait()` evaluates its condition, in hub time.
+POLL_INTERVAL = 0.01
+
+# The devices and their methods, in the order of their numbers on the wire. Both ends of a
+# connection must use the same table, so new methods are only ever added at the end of their kind.
+KINDS = ('hub', 'motor', 'motor_pair', 'color_sensor', 'button', 'speaker', 'light_matrix', 'status_light',
+         'motion_sensor', 'app')
+METHODS = {
+    'hub': ('get_time', 'sleep', 'snapshot'),
+    'motor': ('get_default_speed', 'get_degrees_counted', 'get_position', 'get_speed', 'run_for_degrees',
+              'run_for_rotations', 'run_for_seconds', 'run_to_degrees_counted', 'run_to_position',
+              'set_default_speed', 'set_degrees_counted', 'set_stall_detection', 'set_stop_action', 'start',
+              'start_at_power', 'stop', 'was_interrupted', 'was_stalled', 'snapshot'),
+    'motor_pair': ('get_default_speed', 'move', 'move_tank', 'set_default_speed', 'set_motor_rotation',
+                   'set_stop_action', 'start', 'start_at_power', 'start_tank', 'start_tank_at_power', 'stop'),
+    'color_sensor': ('get_ambient_light', 'get_blue', 'get_color', 'get_green', 'get_red', 'get_reflected_light',
+                     'get_rgb_intensity', 'light_up', 'light_up_all', 'wait_for_new_color', 'wait_until_color',
+                     'snapshot'),
+    'button': ('is_pressed', 'wait_until_pressed', 'wait_until_released', 'was_pressed'),
+    'speaker': ('beep', 'get_volume', 'set_volume', 'start_beep', 'stop'),
+    'light_matrix': ('off', 'set_pixel', 'show_image', 'write', 'show'),
+    'status_light': ('off', 'on'),
+    'motion_sensor': ('get_gesture', 'get_orientation', 'get_pitch_angle', 'get_roll_angle', 'get_yaw_angle',
+                      'reset_yaw_angle', 'wait_for_new_gesture', 'wait_for_new_orientation', 'was_gesture',
+                      'snapshot'),
+    'app': ('play_sound', 'start_sound'),
+}
+_KIND_NUMBERS = {kind: number for number, kind in enumerate(KINDS)}
+
+
+def method_numbers(methods):
+    """
+    Numbers the methods of a table such as `METHODS`.
+
+    Returns:
+        dict: The number of each method, per kind of device.
+    """
+    return {kind: {method: number for number, method in enumerate(names)} for kind, names in methods.items()}
+
+
+_METHOD_NUMBERS = method_numbers(METHODS)
+
+# A frame is the length of its payload followed by the payload.
+_LENGTH = struct.Struct('<I')
+# Request and response payloads start with the request id and the operation or status.
+_HEAD = struct.Struct('<IB')
+# A call names the kind of device and the method, followed by the address and the arguments as tuples.
+_CALL = struct.Struct('<BB')
+_COUNT = struct.Struct('<H')
+
+CALL = 0
+BATCH = 1
+OK = 0
+ERROR = 1
+
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+_SIZE = struct.Struct('<H')
+_ITEMS = struct.Struct('<B')
+# The longest string or bytes value and the most items of a tuple the length prefixes can hold.
+_MAX_SIZE = 0xFFFF
+_MAX_ITEMS = 0xFF
+
+# The exceptions that are raised again on the other end; any other error becomes RuntimeError.
+_ERRORS = {error.__name__: error for error in (ValueError, TypeError, RuntimeError, KeyError, IndexError)}
+
+
+def encode(value, parts):
+    """
+    Appends the binary encoding of a value to a list of byte strings.
+
+    None, booleans, integers, floats, strings, bytes and tuples of them are supported.
+
+    Args:
+        value (object): The value to encode.
+        parts (list of bytes): The list to append to.
+
+    Raises:
+        TypeError: If the value cannot be encoded.
+        ValueError: If an integer does not fit in 64 bits, a string or bytes value is longer than
+            65535 bytes, or a tuple holds more than 255 items.
+    """
+    if value is None:
+        parts.append(b'N')
+    elif value is True:
+        parts.append(b'T')
+    elif value is False:
+        parts.append(b'F')
+    elif isinstance(value, int):
+        if not -2 ** 63 <= value < 2 ** 63:
+            raise ValueError('integers sent to the hub must fit in 64 bits')
+        parts.append(b'i' + _INT.pack(value))
+    elif isinstance(value, float):
+        parts.append(b'd' + _FLOAT.pack(value))
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        if len(data) > _MAX_SIZE:
+            raise ValueError('strings sent to the hub must not be longer than {} bytes'.format(_MAX_SIZE))
+        parts.append(b's' + _SIZE.pack(len(data)) + data)
+    elif isinstance(value, (bytes, bytearray)):
+        if len(value) > _MAX_SIZE:
+            raise ValueError('bytes sent to the hub must not be longer than {} bytes'.format(_MAX_SIZE))
+        parts.append(b'b' + _SIZE.pack(len(value)) + bytes(value))
+    elif isinstance(value, (tuple, list)):
+        if len(value) > _MAX_ITEMS:
+            raise ValueError('tuples sent to the hub must not hold more than {} items'.format(_MAX_ITEMS))
+        parts.append(b't' + _ITEMS.pack(len(value)))
+        for item in value:
+            encode(item, parts)
+    else:
+        raise TypeError('cannot send {} to the hub'.format(type(value).__name__))
+
+
+def decode(data, offset=0):
+    """
+    Decodes a value written by `encode()`.
+
+    Args:
+        data (bytes): The encoded data.
+        offset (int, optional): The position of the value in `data`. Defaults to 0.
+
+    Returns:
+        tuple: The value and the position after it.
+    """
+    tag = data[offset:offset + 1]
+    offset += 1
+    if tag == b'N':
+        return None, offset
+    if tag == b'T':
+        return True, offset
+    if tag == b'F':
+        return False, offset
+    if tag == b'i':
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    if tag == b'd':
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    if tag == b's':
+        size, = _SIZE.unpack_from(data, offset)
+        offset += _SIZE.size
+        return data[offset:offset + size].decode('utf-8'), offset + size
+    if tag == b'b':
+        size, = _SIZE.unpack_from(data, offset)
+        offset += _SIZE.size
+        return bytes(data[offset:offset + size]), offset + size
+    if tag == b't':
+        count, = _ITEMS.unpack_from(data, offset)
+        offset += _ITEMS.size
+        items = []
+        for _ in range(count):
+            item, offset = decode(data, offset)
+            items.append(item)
+        return tuple(items), offset
+    raise ValueError('invalid value tag {!r}'.format(tag))
+
+
+def call_prefix(kind, address, method, numbers=_METHOD_NUMBERS):
+    """
+    Encodes the part of a call that names the device and the method.
+
+    Args:
+        numbers (dict, optional): The method numbers, as returned by `method_numbers()`. Defaults to
+            those of `METHODS`.
+
+    Returns:
+        bytes: The encoded kind, method and address.
+
+    Raises:
+        AttributeError: If the device has no such method.
+    """
+    try:
+        number = numbers[kind][method]
+    except KeyError:
+        raise AttributeError('{} has no method {}'.format(kind, method)) from None
+    parts = [_CALL.pack(_KIND_NUMBERS[kind], number)]
+    encode(address, parts)
+    return b''.join(parts)
+
+
+def encode_call(kind, address, method, args, parts, numbers=_METHOD_NUMBERS):
+    """
+    Appends the binary encoding of a call to a list of byte strings.
+
+    Raises:
+        AttributeError: If the device has no such method.
+    """
+    parts.append(call_prefix(kind, address, method, numbers))
+    encode(args, parts)
+
+
+def decode_call(data, offset, methods=METHODS):
+    """
+    Decodes a call written by `encode_call()`.
+
+    Args:
+        methods (dict, optional): The table the call was numbered with. Defaults to `METHODS`.
+
+    Returns:
+        tuple: The kind of device, its address, the method, the arguments and the position after the call.
+    """
+    kind, method = _CALL.unpack_from(data, offset)
+    kind = KINDS[kind]
+    address, offset = decode(data, offset + _CALL.size)
+    args, offset = decode(data, offset)
+    return kind, address, methods[kind][method], args, offset
+
+
+def decode_request(payload, methods=METHODS):
+    """
+    Decodes the payload of a request frame.
+
+    Args:
+        methods (dict, optional): The table the calls were numbered with. Defaults to `METHODS`.
+
+    Returns:
+        tuple: The request id and a list with the `(kind, address, method, args)` of each call.
+    """
+    request_id, operation = _HEAD.unpack_from(payload)
+    offset = _HEAD.size
+    count = 1
+    if operation == BATCH:
+        count, = _COUNT.unpack_from(payload, offset)
+        offset += _COUNT.size
+    calls = []
+    for _ in range(count):
+        *call, offset = decode_call(payload, offset, methods)
+        calls.append(tuple(call))
+    return request_id, calls
+
+
+def request_id(payload):
+    """
+    Reads the request id at the start of a request or response payload.
+
+    Returns:
+        int: The request id, or 0 if the payload is too short to hold one.
+    """
+    if len(payload) < _HEAD.size:
+        return 0
+    return _HEAD.unpack_from(payload)[0]
+
+
+def frame(parts):
+    """
+    Joins encoded parts into one frame.
+
+    Returns:
+        bytes: The length of the payload followed by the payload.
+    """
+    payload = b''.join(parts)
+    return _LENGTH.pack(len(payload)) + payload
+
+
+class Transport:
+    """
+    A byte stream to a hub, made of a reader and a writer.
+
+    Any pair of binary file objects works, such as the two ends of a pipe or the files of a socket.
+
+    Example:
+        from spike.transport import Connection, Transport
+
+        transport = Transport.unix('/tmp/hub.sock')
+        with Connection(transport):
+            run_program()
+    """
+
+    def __init__(self, reader, writer, closing=()):
+        """
+        Initializes the Transport.
+
+        Args:
+            reader (file object): A binary file to read from.
+            writer (file object): A binary file to write to.
+            closing (tuple, optional): Further objects with a `close()` method to close with the transport.
+        """
+        self.reader = reader
+        self.writer = writer
+        self._closing = (reader, writer) + tuple(closing)
+
+    @classmethod
+    def socket(cls, sock):
+        """
+        Creates a transport over a connected socket.
+
+        Args:
+            sock (socket.socket): The socket.
+
+        Returns:
+            Transport: The transport.
+        """
+        return cls(sock.makefile('rb'), sock.makefile('wb'), (sock,))
+
+    @classmethod
+    def unix(cls, path):
+        """
+        Connects to a hub or emulator listening on a Unix socket.
+
+        Args:
+            path (str): The path of the socket.
+
+        Returns:
+            Transport: The transport.
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+        except OSError:
+            sock.close()
+            raise
+        return cls.socket(sock)
+
+    def write(self, data):
+        """
+        Writes data and flushes it to the other end.
+        """
+        self.writer.write(data)
+        self.writer.flush()
+
+    def read_frame(self):
+        """
+        Reads one frame.
+
+        Returns:
+            bytes or None: The payload of the frame, or None if the other end closed the stream.
+
+        Raises:
+            ConnectionError: If the stream ends in the middle of a frame.
+        """
+        header = self.reader.read(_LENGTH.size)
+        if not header:
+            return None
+        if len(header) < _LENGTH.size:
+            raise ConnectionError('the stream ended in the middle of a frame')
+        size, = _LENGTH.unpack(header)
+        payload = self.reader.read(size)
+        if len(payload) < size:
+            raise ConnectionError('the stream ended in the middle of a frame')
+        return payload
+
+    def close(self):
+        """
+        Closes the stream.
+        """
+        for closing in self._closing:
+            if isinstance(closing, socket.socket):
+                try:
+                    # Wakes up a thread that is blocked reading from the socket.
+                    closing.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        # The writer first, so that the other end stops and a blocked reader sees the end of the stream.
+        for closing in reversed(self._closing):
+            try:
+                closing.close()
+            except OSError:
+                pass
+
+
+def request(request_id, operation, parts):
+    """
+    Builds a request frame.
+
+    Args:
+        request_id (int): The id of the request.
+        operation (int): `CALL` or `BATCH`.
+        parts (list of bytes): The encoded calls.
+
+    Returns:
+        bytes: The frame.
+    """
+    return frame([_HEAD.pack(request_id, operation)] + parts)
+
+
+def response(request_id, parts, error=None):
+    """
+    Builds the response frame to a request.
+
+    Args:
+        request_id (int): The id of the request.
+        parts (list of bytes): The encoded return value, ignored if `error` is given.
+        error (Exception, optional): The error raised by the request.
+
+    Returns:
+        bytes: The frame.
+    """
+    if error is not None:
+        parts = []
+        encode((type(error).__name__, str(error)), parts)
+        return frame([_HEAD.pack(request_id, ERROR)] + parts)
+    return frame([_HEAD.pack(request_id, OK)] + parts)
+
+
+def result(payload):
+    """
+    Extracts the return value from a response payload.
+
+    Returns:
+        tuple: The request id and the return value.
+
+    Raises:
+        Exception: The error raised on the hub, as ValueError, TypeError, RuntimeError, KeyError,
+            IndexError, or RuntimeError for any other type.
+    """
+    request_id, status = _HEAD.unpack_from(payload)
+    value, _ = decode(payload, _HEAD.size)
+    if status == ERROR:
+        name, message = value
+        raise _ERRORS.get(name, RuntimeError)(message)
+    return request_id, value
+
+
+class Connection:
+    """
+    A backend that sends every device call to a hub over a transport.
+
+    While the connection is active, `Motor`, `MotorPair`, `ColorSensor`, `PrimeHub` and `App` send
+    their calls to the hub and return its answers. Calls are sent as compact binary frames and
+    answered one at a time. Time is the hub's clock: waits are run on the hub, and
+    `wait_until()` polls its condition every `POLL_INTERVAL` seconds of hub time.
+
+    Example:
+        from spike import Motor
+        from spike.emulator import LoopbackHub
+
+        with LoopbackHub() as connection:
+            Motor('A').run_for_degrees(90)
+            print(Motor('A').get_degrees_counted(), connection.time)
+    """
+
+    def __init__(self, transport, methods=METHODS):
+        """
+        Initializes the Connection.
+
+        Args:
+            transport (Transport): The stream to the hub.
+            methods (dict, optional): The methods the hub answers, per kind of device. Defaults to
+                `METHODS`.
+        """
+        self.transport = transport
+        self.methods = methods
+        self.calls = 0
+        self._numbers = _METHOD_NUMBERS if methods is METHODS else method_numbers(methods)
+        self._devices = {}
+        self._request_id = 0
+        self._lock = threading.Lock()
+        self._token = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """
+        Makes this connection the backend of all device objects.
+
+        Returns:
+            Connection: The connection itself.
+        """
+        self._token = activate(self)
+        return self
+
+    def stop(self):
+        """
+        Deactivates the connection and restores the previously active backend.
+        """
+        deactivate(self, self._token)
+        self._token = None
+
+    def close(self):
+        """
+        Closes the transport.
+        """
+        self.transport.close()
+
+    def _request(self, operation, parts):
+        with self._lock:
+            self._request_id = request_id = (self._request_id + 1) & 0xFFFFFFFF
+            self.transport.write(request(request_id, operation, parts))
+            payload = self.transport.read_frame()
+            self.calls += 1
+        if payload is None:
+            raise ConnectionError('the hub closed the connection')
+        answered, value = result(payload)
+        if answered != request_id:
+            raise ConnectionError('the hub answered request {} instead of {}'.format(answered, request_id))
+        return value
+
+    def call(self, kind, address, method, args):
+        """
+        Calls a method of a device on the hub.
+
+        Args:
+            kind (str): The kind of device, one of `KINDS`.
+            address (tuple): The port or ports, or the side of a button.
+            method (str): The method.
+            args (tuple): The arguments.
+
+        Returns:
+            object: The return value.
+        """
+        parts = []
+        encode_call(kind, address, method, args, parts, self._numbers)
+        return self._request(CALL, parts)
+
+    def apply_batch(self, commands):
+        """
+        Sends several calls in one frame, as used by `spike.batch.CommandBatch`.
+
+        Args:
+            commands (list of tuple): The `(kind, address, method, args)` of each call.
+        """
+        parts = [_COUNT.pack(len(commands))]
+        for kind, address, method, args in commands:
+            encode_call(kind, address, method, args, parts, self._numbers)
+        self._request(BATCH, parts)
+
+    def _device(self, kind, address):
+        device = self._devices.get((kind, address))
+        if device is None:
+            device = self._devices[(kind, address)] = _RemoteDevice(self, kind, address)
+        return device
+
+    # Devices
+
+    def motor(self, port):
+        return self._device('motor', (port,))
+
+    def motor_pair(self, port_left, port_right):
+        return self._device('motor_pair', (port_left, port_right))
+
+    def color_sensor(self, port):
+        return self._device('color_sensor', (port,))
+
+    def button(self, side):
+        return self._device('button', (side,))
+
+    def speaker(self):
+        return self._device('speaker', ())
+
+    def light_matrix(self):
+        return self._device('light_matrix', ())
+
+    def status_light(self):
+        return self._device('status_light', ())
+
+    def motion_sensor(self):
+        return self._device('motion_sensor', ())
+
+    def app(self):
+        return self._device('app', ())
+
+    # Time
+
+    @property
+    def time(self):
+        return self.call('hub', (), 'get_time', ())
+
+    def sleep(self, seconds):
+        self.call('hub', (), 'sleep', (seconds,))
+
+    def snapshot(self):
+        return self.call('hub', (), 'snapshot', ())
+
+    def wait(self, done):
+        while not done():
+            self.sleep(POLL_INTERVAL)
+
+    async def sleep_async(self, seconds):
+        await asyncio.get_event_loop().run_in_executor(None, self.sleep, seconds)
+
+    async def wait_async(self, done):
+        while not done():
+            await self.sleep_async(POLL_INTERVAL)
+
+
+class _RemoteDevice:
+
+    def __init__(self, connection, kind, address):
+        self._connection = connection
+        self._kind = kind
+        self._address = address
+
+    def __getattr__(self, name):
+        method = name[:-len('_async')] if name.endswith('_async') else name
+        numbers = self._connection._numbers
+        if method not in numbers[self._kind]:
+            raise AttributeError(name)
+        prefix = call_prefix(self._kind, self._address, method, numbers)
+        request = self._connection._request
+
+        def call(args):
+            parts = [prefix]
+            encode(args, parts)
+            return request(CALL, parts)
+
+        if method == name:
+            def remote(*args):
+                return call(args)
+        else:
+            async def remote(*args):
+                return await asyncio.get_event_loop().run_in_executor(None, call, args)
+        # Cache the method, so later lookups skip __getattr__.
+        setattr(self, name, remote)
+        return remote
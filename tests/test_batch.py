@@ -0,0 +1,24 @@
+from spike import Motor, PrimeHub, Simulation
+from spike.batch import CommandBatch
+from spike.control import wait_for_seconds
+
+
+def test_commands_are_sent_before_a_blocking_device_call():
+    with Simulation() as sim:
+        hub = PrimeHub()
+        with CommandBatch() as batch:
+            Motor('A').start(50)
+            hub.speaker.beep(60, 1)
+            assert sim.motor('A').get_speed() == 50
+        assert batch.writes == 1
+
+
+def test_commands_are_sent_together_before_waiting():
+    with Simulation() as sim:
+        with CommandBatch() as batch:
+            for speed in (10, 20, 30):
+                Motor('A').start(speed)
+            assert sim.motor('A').get_speed() == 0
+            wait_for_seconds(0.1)
+            assert sim.motor('A').get_speed() == 30
+        assert (batch.commands, batch.writes) == (3, 1)
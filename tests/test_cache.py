@@ -0,0 +1,25 @@
+from spike import ColorSensor, Simulation
+from spike.cache import ReadCache
+from spike.emulator import LoopbackHub
+
+
+def test_hits_cost_no_round_trip():
+    with LoopbackHub() as connection:
+        sensor = ColorSensor('E')
+        with ReadCache(staleness=60) as cache:
+            for _ in range(100):
+                sensor.get_red(), sensor.get_green(), sensor.get_blue()
+        assert (cache.hits, cache.misses) == (299, 1)
+        assert connection.calls == 1
+
+
+def test_snapshots_age_on_the_simulated_clock():
+    with Simulation() as sim:
+        sensor = ColorSensor('E')
+        sim.color_sensor('E').set_color('red')
+        with ReadCache(staleness=1):
+            assert sensor.get_color() == 'red'
+            sim.color_sensor('E').set_color('blue')
+            assert sensor.get_color() == 'red'
+            sim.run_for(2)
+            assert sensor.get_color() == 'blue'
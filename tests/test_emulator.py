@@ -0,0 +1,26 @@
+import pytest
+
+from spike import ColorSensor, Simulation
+from spike.emulator import LoopbackHub, handle
+from spike.transport import METHODS, encode, result
+
+
+def test_malformed_requests_are_answered_with_errors():
+    with Simulation() as sim:
+        for payload in (b'', b'\x07\x00\x00\x00\x00', b'\x07\x00\x00\x00\x00\x01\xff'):
+            with pytest.raises(Exception):
+                result(handle(sim, payload)[4:])
+        assert sim.time == 0
+
+
+def test_harness_methods_are_not_on_the_public_protocol():
+    assert 'set_color' not in METHODS['color_sensor']
+    with LoopbackHub() as connection:
+        connection.call('color_sensor', ('E',), 'set_color', ('red',))
+        assert ColorSensor('E').get_color() == 'red'
+
+
+@pytest.mark.parametrize('value', ['x' * 65536, b'x' * 65536, (0,) * 256, 2 ** 63])
+def test_values_beyond_the_length_prefixes_are_rejected(value):
+    with pytest.raises(ValueError):
+        encode(value, [])
@@ -0,0 +1,16 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from spike.fleet import Fleet
+
+
+@pytest.mark.parametrize('action', ['coast', 'brake', 'hold'])
+def test_positioned_moves_end_on_their_goal(action):
+    fleet = Fleet(3)
+    fleet.set_stop_action(action)
+    fleet.move(10)
+    fleet.run_for(1)
+    left, right = fleet.get_degrees_counted()
+    assert list(left) == [-205] * 3 and list(right) == [205] * 3
+    assert not fleet.speed.any()
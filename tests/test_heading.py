@@ -0,0 +1,22 @@
+import pytest
+
+from spike import PrimeHub, Simulation
+from spike.control import wait_for_seconds, wait_until
+from spike.heading import HeadingService
+
+
+def test_samples_follow_the_simulated_clock():
+    with Simulation() as sim:
+        with HeadingService(PrimeHub().motion_sensor) as heading:
+            wait_for_seconds(1)
+        assert heading.samples == 100
+        wait_for_seconds(1)
+        assert heading.samples == 100
+
+
+def test_a_wait_nothing_can_end_fails_while_sampling():
+    with Simulation(time_limit=60) as sim:
+        with HeadingService(PrimeHub().motion_sensor) as heading:
+            with pytest.raises(RuntimeError, match='nothing is scheduled'):
+                wait_until(lambda: heading.heading >= 720)
+        assert sim.time < 1
@@ -0,0 +1,9 @@
+from spike.emulator import HubServer
+from spike.pool import ConnectionPool
+
+
+def test_pipeline_larger_than_pipe_buffer(tmp_path):
+    path = str(tmp_path / 'hub.sock')
+    calls = [('motor', ('A',), 'get_speed', ())] * 100000
+    with HubServer(path), ConnectionPool() as pool:
+        assert pool.connect(path).pipeline(calls) == [0] * len(calls)
@@ -0,0 +1,23 @@
+import pytest
+
+from spike import Motor, Simulation
+from spike.profile import plan, run_for_degrees
+
+
+@pytest.mark.parametrize('jerk', [None, 40000])
+def test_plans_cover_the_distance_within_the_limits(jerk):
+    profile = plan(720, 800, 3000, jerk)
+    assert profile.position(profile.duration) == pytest.approx(720)
+    speeds = [profile.velocity(profile.duration * step / 1000) for step in range(1001)]
+    assert max(speeds) == pytest.approx(800)
+    assert speeds[-1] == 0
+
+
+@pytest.mark.parametrize('jerk', [None, 40000])
+def test_planned_moves_end_on_their_goal(jerk):
+    with Simulation():
+        motor = Motor('A')
+        run_for_degrees(motor, 720, speed=80, acceleration=3000, jerk=jerk)
+        assert motor.get_degrees_counted() == 720
+        run_for_degrees(motor, -360, speed=80, acceleration=3000, jerk=jerk)
+        assert motor.get_degrees_counted() == 360
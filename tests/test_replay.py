@@ -0,0 +1,24 @@
+from spike import ColorSensor, Motor, PrimeHub, Simulation
+from spike.control import Timer, wait_until
+from spike.replay import Recorder, Recording, Replayer
+
+
+def mission():
+    motor = Motor('A')
+    timer = Timer()
+    wait_until(lambda: timer.now() >= 1)
+    wait_until(lambda: ColorSensor('E').get_color() == 'red')
+    motor.run_for_degrees(90)
+    return motor.get_degrees_counted(), PrimeHub().snapshot()
+
+
+def test_replay_gives_the_recorded_results(tmp_path):
+    path = str(tmp_path / 'mission.json')
+    with Simulation() as sim, Recorder() as recorder:
+        sim.at(2, sim.color_sensor('E').set_color, 'red')
+        recorded = mission()
+    recorder.recording.save(path)
+    with Replayer(Recording.load(path)) as replayer:
+        assert mission() == recorded
+    assert replayer.remaining == 0
+    assert replayer.time == recorded[1].time
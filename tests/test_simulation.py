@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+
+from spike import Motor, MotorPair, Simulation
+from spike.control import wait_for_seconds, wait_for_seconds_async
+from spike.simulation import STOP_ACTIONS
+
+
+@pytest.mark.parametrize('action', STOP_ACTIONS)
+def test_positioned_moves_end_on_their_goal(action):
+    with Simulation():
+        motor = Motor('A')
+        motor.set_stop_action(action)
+        motor.run_for_degrees(90)
+        assert (motor.get_degrees_counted(), motor.get_speed()) == (90, 0)
+        wait_for_seconds(1)
+        assert motor.get_degrees_counted() == 90
+        motor.run_to_position(0)
+        assert motor.get_position() == 0
+        motor.run_for_rotations(-2)
+        assert motor.get_degrees_counted() == -720
+        pair = MotorPair('B', 'C')
+        pair.set_stop_action(action)
+        pair.move(10)
+        wait_for_seconds(1)
+        assert (Motor('B').get_degrees_counted(), Motor('C').get_degrees_counted()) == (-205, 205)
+
+
+def test_waits_cost_no_wall_time():
+    with Simulation() as sim:
+        begin = time.perf_counter()
+        wait_for_seconds(3600)
+        assert sim.time == 3600
+        assert time.perf_counter() - begin < 1
+
+
+def test_commands_after_a_task_wrapped_await_keep_the_clock():
+    started = []
+
+    async def first():
+        motor = Motor('A')
+        await asyncio.ensure_future(motor.run_for_degrees_async(90))
+        await asyncio.wait_for(motor.run_for_degrees_async(90), 5)
+        started.append(sim.time)
+        motor.start(50)
+
+    async def second():
+        await wait_for_seconds_async(10)
+
+    async def main():
+        await asyncio.gather(first(), second())
+
+    with Simulation() as sim:
+        asyncio.run(main())
+    assert started[0] < 1